@@ -1,19 +1,42 @@
-"""SmallAgents: Lightweight Python framework for building autonomous agents."""
+"""SmallAgents: Lightweight Python framework for building autonomous agents.
+
+Agent classes are imported on first attribute access, so ``import agents``
+(and importing one agent module) does not load every agent's dependencies.
+"""
+
+from typing import Any, List
 
 __version__ = "0.1.0"
 
-from .base_agent import BaseAgent
-from .search_agent import SearchAgent
-from .api_agent import APIAgent
-from .async_agent import AsyncBaseAgent
-from .async_search_agent import AsyncSearchAgent
-from .social_media_video_agent import SocialMediaVideoAgent
+_EXPORTS = {
+    "BaseAgent": "base_agent",
+    "SearchAgent": "search_agent",
+    "APIAgent": "api_agent",
+    "AsyncBaseAgent": "async_agent",
+    "AsyncSearchAgent": "async_search_agent",
+    "SocialMediaVideoAgent": "social_media_video_agent",
+}
 
 __all__ = [
     "BaseAgent",
-    "SearchAgent", 
+    "SearchAgent",
     "APIAgent",
     "AsyncBaseAgent",
     "AsyncSearchAgent",
-    "SocialMediaVideoAgent"
+    "SocialMediaVideoAgent",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import exported agent classes lazily (PEP 562)."""
+    if name in _EXPORTS:
+        import importlib
+
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
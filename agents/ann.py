@@ -0,0 +1,263 @@
+"""Approximate nearest-neighbour search: an IVF-PQ index on NumPy.
+
+Vectors are clustered with k-means into ``nlist`` inverted lists; each
+vector's residual from its list centroid is compressed by product
+quantisation into ``m`` one-byte codes. A query scores only the ``nprobe``
+lists whose centroids it matches best, using per-query lookup tables
+(asymmetric distance), and the best candidates can be re-ranked exactly
+against the full vectors. ``nprobe`` trades recall for latency::
+
+    index = IVFPQIndex.build(vectors, nlist=1024, m=16)
+    index.save("index.npz")
+    index = IVFPQIndex.load("index.npz")
+    scores, ids = index.search(queries, k=10, nprobe=16, exact=vectors)
+
+Scores are inner products, matching ``vector_search.DenseIndex``.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .vector_search import top_k
+
+# Rows per block when assigning or encoding, bounding (block, centroids) temporaries
+ASSIGN_BLOCK = 65_536
+
+
+def assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the nearest (L2) centroid for each row."""
+    half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), ASSIGN_BLOCK):
+        block = np.asarray(data[start : start + ASSIGN_BLOCK], dtype=np.float32)
+        labels[start : start + len(block)] = np.argmax(
+            block @ centroids.T - half_norms, axis=1
+        )
+    return labels
+
+
+def kmeans(data: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means; empty clusters are re-seeded from random rows."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=len(data) < k)].astype(
+        np.float32
+    )
+    for _ in range(iters):
+        labels = assign(data, centroids)
+        counts = np.bincount(labels, minlength=k)
+        order = np.argsort(labels, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        empty = counts == 0
+        # Segment sums of the rows sorted by cluster
+        sums = np.add.reduceat(data[order], starts[~empty], axis=0)
+        centroids[~empty] = sums / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+    return centroids
+
+
+class IVFPQIndex:
+    """Inverted-file index with product-quantised residuals.
+
+    ``order`` lists the vector ids grouped by inverted list, with list ``l``
+    at ``order[offsets[l]:offsets[l + 1]]``; ``codes`` holds their PQ codes
+    in the same order.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        codebooks: np.ndarray,
+        codes: np.ndarray,
+        order: np.ndarray,
+        offsets: np.ndarray,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.centroids = centroids
+        self.codebooks = codebooks
+        self.codes = codes
+        self.order = order
+        self.offsets = offsets
+        self.meta: Dict[str, Any] = dict(meta or {})
+        self.m, self.ksub, self.dsub = codebooks.shape
+        # Offsets of each sub-quantiser's table in a flattened (m * ksub) lookup table
+        self._table_offsets = (np.arange(self.m) * self.ksub).astype(np.intp)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def dim(self) -> int:
+        return int(self.centroids.shape[1])
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        m: int = 16,
+        train_size: int = 64,
+        iters: int = 10,
+        seed: int = 0,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> "IVFPQIndex":
+        """Train on a sample of ``vectors`` and encode them all.
+
+        ``nlist`` defaults to about ``sqrt(n)``; ``m`` must divide the vector
+        dimension. The coarse and PQ quantisers are each trained on
+        ``train_size`` sampled rows per centroid.
+        """
+        n, dim = vectors.shape
+        if n == 0:
+            raise ValueError("cannot build an index over no vectors")
+        if dim % m:
+            raise ValueError(f"m ({m}) must divide the vector dimension ({dim})")
+        nlist = min(n, nlist or max(1, int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        picked = np.sort(
+            rng.choice(n, size=min(n, train_size * max(nlist, 256)), replace=False)
+        )
+        sample = np.asarray(vectors[picked], dtype=np.float32)
+
+        centroids = kmeans(
+            sample[rng.permutation(len(sample))[: train_size * nlist]],
+            nlist,
+            iters,
+            seed,
+        )
+        sample = sample[rng.permutation(len(sample))[: train_size * 256]]
+        residuals = (sample - centroids[assign(sample, centroids)]).reshape(
+            len(sample), m, dim // m
+        )
+        ksub = min(256, len(sample))
+        codebooks = np.stack(
+            [kmeans(residuals[:, j], ksub, iters, seed + j) for j in range(m)]
+        )
+
+        labels = assign(vectors, centroids)
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(labels, minlength=nlist))]
+        ).astype(np.int64)
+        index = cls(
+            centroids, codebooks, np.empty((n, m), dtype=np.uint8), order, offsets, meta
+        )
+        for start in range(0, n, ASSIGN_BLOCK):
+            ids = order[start : start + ASSIGN_BLOCK]
+            block = np.asarray(vectors[ids], dtype=np.float32) - centroids[labels[ids]]
+            index.codes[start : start + len(ids)] = index._encode(block)
+        return index
+
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        """Quantise residual rows to ``(rows, m)`` uint8 codes."""
+        parts = residuals.reshape(len(residuals), self.m, self.dsub)
+        return np.stack(
+            [assign(parts[:, j], self.codebooks[j]) for j in range(self.m)], axis=1
+        ).astype(np.uint8)
+
+    def save(self, path: str) -> None:
+        """Write the index to an uncompressed ``.npz`` file, replacing it atomically.
+
+        ``path`` must end in ``.npz``, since NumPy would otherwise append it.
+        """
+        if not path.endswith(".npz"):
+            raise ValueError(f"index path must end in .npz, got {path!r}")
+        directory = os.path.dirname(os.path.abspath(path))
+        # Written beside the target, so readers only ever see a complete file
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".npz.tmp", delete=False
+        ) as tmp:
+            tmp_path = tmp.name
+        try:
+            # Given a file object, NumPy writes to it as is instead of appending ".npz"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    centroids=self.centroids,
+                    codebooks=self.codebooks,
+                    codes=self.codes,
+                    order=self.order,
+                    offsets=self.offsets,
+                    meta=np.array(json.dumps(self.meta)),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "IVFPQIndex":
+        """Read an index written by ``save()``."""
+        with np.load(path) as data:
+            return cls(
+                data["centroids"],
+                data["codebooks"],
+                data["codes"],
+                data["order"],
+                data["offsets"],
+                json.loads(str(data["meta"])),
+            )
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int = 8,
+        exact: Optional[np.ndarray] = None,
+        refine: int = 4,
+        bonus: Optional[Callable[[int, np.ndarray], np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``k`` best ``(scores, ids)`` per query row, best first.
+
+        Rows with fewer candidates are padded with ``-inf`` scores and id -1.
+        With ``exact`` (the full ``(n, dim)`` vectors), the best
+        ``k * refine`` approximate candidates are re-scored exactly.
+        ``bonus(row, ids)`` returns extra scores added to a query's
+        candidates before the final cut (hybrid keyword scores).
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        nprobe = max(1, min(nprobe, self.nlist))
+        coarse = queries @ self.centroids.T
+        _, probes = top_k(coarse, nprobe)
+        # (queries, m, ksub) inner products of each query slice with each code word
+        tables = np.einsum(
+            "bmd,mkd->bmk",
+            queries.reshape(len(queries), self.m, self.dsub),
+            self.codebooks,
+        )
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, lists in enumerate(probes):
+            spans = [(self.offsets[i], self.offsets[i + 1]) for i in lists]
+            positions = np.concatenate([np.arange(a, b) for a, b in spans])
+            if not len(positions):
+                continue
+            sizes = [b - a for a, b in spans]
+            approx = np.repeat(coarse[row, lists], sizes)
+            approx += np.take(
+                tables[row].ravel(), self.codes[positions] + self._table_offsets
+            ).sum(axis=1)
+            shortlist = k * refine if exact is not None and refine else k
+            approx, picked = top_k(approx[None, :], shortlist)
+            candidates = self.order[positions[picked[0]]]
+            found = approx[0]
+            if exact is not None and refine:
+                ranked = np.sort(candidates)
+                found, candidates = (
+                    np.asarray(exact[ranked], dtype=np.float32) @ queries[row],
+                    ranked,
+                )
+            if bonus is not None:
+                found = found + bonus(row, candidates)
+            best, picked = top_k(found[None, :], k)
+            scores[row, : best.shape[1]] = best[0]
+            ids[row, : best.shape[1]] = candidates[picked[0]]
+        return scores, ids
@@ -1,18 +1,42 @@
 """API Agent with HTTP requests, retry logic, and error handling."""
 
+import json
 import time
 from typing import Any, Dict, Optional
 from urllib.parse import urljoin
 
 import requests
-from requests.adapters import HTTPAdapter
+from requests.adapters import BaseAdapter, HTTPAdapter
 from urllib3.util.retry import Retry
 
+from . import deadline
 from .base_agent import BaseAgent
+from .cassette import adapter_from_config
+from .log import get_logger
+from .resources import registry
+from .tracing import inject
+
+logger = get_logger(__name__)
+
+
+class _DeadlineRetry(Retry):
+    """urllib3 retry policy that gives up once the current deadline can't be met."""
+
+    def sleep(self, response: Any = None) -> None:
+        current = deadline.current_deadline()
+        if current is not None:
+            current.ensure(self.get_backoff_time())
+        super().sleep(response)
 
 
 class APIAgent(BaseAgent):
-    """Agent that makes HTTP requests with retry logic and error handling."""
+    """Agent that makes HTTP requests with retry logic and error handling.
+
+    Agents with the same base URL and retry settings share one session, and
+    so one connection pool, through the resource registry; the session is
+    closed when the last of them is closed. A closed agent acquires it again
+    on ``start()`` or its next request.
+    """
 
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the API agent with configuration."""
@@ -21,23 +45,48 @@ class APIAgent(BaseAgent):
         self.timeout = self.config.get("timeout", 30)
         self.max_retries = self.config.get("max_retries", 3)
         self.backoff_factor = self.config.get("backoff_factor", 0.3)
-        self.session = self._create_session()
+        self.pool_maxsize = self.config.get("pool_maxsize", 10)
+        # Record/replay HTTP exchanges instead of (or on top of) the network
+        self.cassette = self.config.get("cassette")
+        self._session_key: tuple = (
+            "requests.Session",
+            self.base_url,
+            self.max_retries,
+            self.backoff_factor,
+            self.pool_maxsize,
+            json.dumps(self.cassette, sort_keys=True) if self.cassette else None,
+        )
+        self.session: Optional[requests.Session] = None
+        self._get_session()
+
+    def _get_session(self) -> requests.Session:
+        """Return the shared session, acquiring it again after ``close()``."""
+        if self.session is None:
+            self.session = registry.acquire(self._session_key, self._create_session)
+        return self.session
 
     def _create_session(self) -> requests.Session:
         """Create a requests session with retry strategy."""
         session = requests.Session()
 
         # Configure retry strategy
-        retry_strategy = Retry(
+        retry_strategy = _DeadlineRetry(
             total=self.max_retries,
             backoff_factor=self.backoff_factor,
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST"],
         )
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.pool_maxsize,
+            pool_maxsize=self.pool_maxsize,
+        )
+        transport: BaseAdapter = (
+            adapter_from_config(self.cassette, real=adapter) or adapter
+        )
+        session.mount("http://", transport)
+        session.mount("https://", transport)
 
         # Set default headers
         session.headers.update(
@@ -57,7 +106,14 @@ class APIAgent(BaseAgent):
         url = urljoin(self.base_url, endpoint) if self.base_url else endpoint
 
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            with self.step("http_get") as step:
+                step.set_attribute("http.method", "GET")
+                step.set_attribute("http.url", url)
+                timeout = deadline.remaining_timeout(self.timeout)
+                response = self._get_session().get(
+                    url, params=params, timeout=timeout, headers=inject({})
+                )
+                step.set_attribute("http.status_code", response.status_code)
             response.raise_for_status()
 
             return {
@@ -67,7 +123,15 @@ class APIAgent(BaseAgent):
                 "headers": dict(response.headers),
             }
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, deadline.Cancelled) as e:
+            self.count("http_errors")
+            logger.warning(
+                "HTTP request failed",
+                method="GET",
+                url=url,
+                error_type=type(e).__name__,
+                sampled=True,
+            )
             return {"success": False, "error": str(e), "error_type": type(e).__name__}
 
     def post(
@@ -77,7 +141,14 @@ class APIAgent(BaseAgent):
         url = urljoin(self.base_url, endpoint) if self.base_url else endpoint
 
         try:
-            response = self.session.post(url, json=data, timeout=self.timeout)
+            with self.step("http_post") as step:
+                step.set_attribute("http.method", "POST")
+                step.set_attribute("http.url", url)
+                timeout = deadline.remaining_timeout(self.timeout)
+                response = self._get_session().post(
+                    url, json=data, timeout=timeout, headers=inject({})
+                )
+                step.set_attribute("http.status_code", response.status_code)
             response.raise_for_status()
 
             return {
@@ -87,7 +158,15 @@ class APIAgent(BaseAgent):
                 "headers": dict(response.headers),
             }
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, deadline.Cancelled) as e:
+            self.count("http_errors")
+            logger.warning(
+                "HTTP request failed",
+                method="POST",
+                url=url,
+                error_type=type(e).__name__,
+                sampled=True,
+            )
             return {"success": False, "error": str(e), "error_type": type(e).__name__}
 
     def run(
@@ -101,7 +180,7 @@ class APIAgent(BaseAgent):
 
         method = method.upper()
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         if method == "GET":
             result = self.get(endpoint, kwargs.get("params"))
@@ -110,13 +189,24 @@ class APIAgent(BaseAgent):
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
 
-        result["execution_time"] = time.time() - start_time
+        result["execution_time"] = time.perf_counter() - start_time
         result["method"] = method
         result["endpoint"] = endpoint
 
         return result
 
+    def warmup(self) -> None:
+        """Open a pooled connection to ``base_url`` so the first call skips the handshake."""
+        if not self.base_url:
+            return
+        try:
+            self._get_session().head(self.base_url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self.count("warmup_errors")
+
     def close(self) -> None:
-        """Close the HTTP session."""
-        if self.session:
-            self.session.close()
+        """Release the shared HTTP session, closing it if no other agent uses it."""
+        if self.session is not None:
+            self.session = None
+            registry.release(self._session_key)
+        super().close()
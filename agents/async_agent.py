@@ -1,25 +1,127 @@
 """Async base agent interface for SmallAgents."""
 
-from typing import Any, Dict, Optional
+from typing import Any, AsyncGenerator, Awaitable, Dict, Generator, Optional, TypeVar
 
+from .bridge import get_background_loop
+from .instrumentation import (
+    InstrumentedMixin,
+    instrument_async_run,
+    instrument_async_stream,
+)
 
-class AsyncBaseAgent:
+T = TypeVar("T")
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    """Wrap an awaitable (e.g. an async generator step) as a coroutine."""
+    return await awaitable
+
+
+class AsyncBaseAgent(InstrumentedMixin):
     """Async version of the minimal agent interface.
 
     Contract:
     - input: a dict-like `config` and arbitrary kwargs
     - output: a dict with at least a "result" key on success
     - error modes: raise exceptions on invalid input
+
+    Every subclass's ``run()`` is timed automatically; use ``self.step(name)``
+    to time sub-steps and ``self.count(name)`` for event counters.
+
+    Lifecycle: ``start()``, ``warmup()`` and ``close()`` are coroutines; use
+    ``async with`` on an event loop, or ``with`` from sync code (the hooks
+    then run on the shared background loop, like ``run_sync()``).
     """
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Wrap the subclass's ``run()`` and ``run_stream()`` with the instrumentation timer."""
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get("run")
+        if run is not None and not getattr(run, "__instrumented__", False):
+            cls.run = instrument_async_run(run)  # type: ignore[method-assign]
+        run_stream = cls.__dict__.get("run_stream")
+        if run_stream is not None and not getattr(
+            run_stream, "__instrumented__", False
+        ):
+            cls.run_stream = instrument_async_stream(run_stream)  # type: ignore[method-assign]
+
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the agent with optional configuration."""
         self.config = config or {}
+        self.started = False
+        self._init_metrics(self.config)
 
     async def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
         """Run the agent asynchronously. Must be implemented by subclasses."""
         raise NotImplementedError("Async agents must implement run()")
 
+    def run_sync(
+        self, *args: Any, timeout: Optional[float] = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Run the agent from synchronous code.
+
+        The coroutine runs on the shared background event loop, so repeated
+        calls reuse one loop (and any loop-bound sessions) instead of paying
+        for ``asyncio.run`` each time.
+        """
+        return get_background_loop().run(self.run(*args, **kwargs), timeout=timeout)
+
+    @instrument_async_stream
+    async def run_stream(
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield results incrementally, ending with ``{"event": "done", "result": ...}``.
+
+        Agents that can report progress override this; by default the only
+        event is the ``done`` one wrapping ``run()``'s result. Streams are
+        instrumented like ``run()`` and accept the same ``deadline`` keyword.
+        """
+        yield {"event": "done", "result": await self.run(*args, **kwargs)}
+
+    def run_stream_sync(
+        self, *args: Any, **kwargs: Any
+    ) -> Generator[Dict[str, Any], None, None]:
+        """Iterate ``run_stream()`` from synchronous code via the background loop."""
+        loop = get_background_loop()
+        stream = self.run_stream(*args, **kwargs)
+        try:
+            while True:
+                try:
+                    yield loop.run(_await(stream.__anext__()))
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run(_await(stream.aclose()))
+
+    async def start(self) -> "AsyncBaseAgent":
+        """Warm the agent up once; later calls are no-ops until ``close()``."""
+        if not self.started:
+            await self.warmup()
+            self.started = True
+        return self
+
+    async def warmup(self) -> None:
+        """Pay cold-start costs before the first ``run()``. Override as needed."""
+
+    async def close(self) -> None:
+        """Release resources held by the agent. Subclasses call ``super().close()``."""
+        self.started = False
+
+    async def __aenter__(self) -> "AsyncBaseAgent":
+        return await self.start()
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        await self.close()
+
+    def __enter__(self) -> "AsyncBaseAgent":
+        return get_background_loop().run(self.start())
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        get_background_loop().run(self.close())
+
     def info(self) -> Dict[str, Any]:
         """Return metadata about the agent."""
-        return {"name": self.__class__.__name__, "config": self.config, "async": True}
+        info = {"name": self.__class__.__name__, "config": self.config, "async": True}
+        if self.metrics is not None:
+            info["metrics"] = self.metrics.snapshot()
+        return info
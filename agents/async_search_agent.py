@@ -1,7 +1,8 @@
 """Async SearchAgent implementation."""
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
 from .async_agent import AsyncBaseAgent
 
@@ -24,6 +25,7 @@ class AsyncSearchAgent(AsyncBaseAgent):
         """Initialize the AsyncSearchAgent."""
         super().__init__(config)
         self.concurrent_searches = self.config.get("concurrent_searches", 3)
+        self.corpus: List[str] = list(self.config.get("corpus", self.CORPUS))
 
     async def _async_search_item(self, item: str, tokens: List[str]) -> Optional[str]:
         """Async helper to search a single item."""
@@ -34,6 +36,25 @@ class AsyncSearchAgent(AsyncBaseAgent):
             return item
         return None
 
+    def _start_lookups(
+        self, tokens: List[str]
+    ) -> List["asyncio.Future[Optional[int]]"]:
+        """Start one concurrent lookup per corpus item; each returns its index on a match."""
+        semaphore = asyncio.Semaphore(self.concurrent_searches)
+
+        async def search_with_semaphore(index: int, item: str) -> Optional[int]:
+            async with semaphore:
+                return (
+                    index
+                    if await self._async_search_item(item, tokens) is not None
+                    else None
+                )
+
+        return [
+            asyncio.ensure_future(search_with_semaphore(i, item))
+            for i, item in enumerate(self.corpus)
+        ]
+
     async def _search(self, query: str) -> List[str]:
         """Perform async search over corpus with concurrent processing."""
         tokens = [t.lower() for t in query.split() if t.strip()]
@@ -41,27 +62,20 @@ class AsyncSearchAgent(AsyncBaseAgent):
             return []
 
         # Process corpus items concurrently
-        semaphore = asyncio.Semaphore(self.concurrent_searches)
-
-        async def search_with_semaphore(item: str) -> Optional[str]:
-            async with semaphore:
-                return await self._async_search_item(item, tokens)
-
-        # Create tasks for all corpus items
-        tasks = [search_with_semaphore(item) for item in self.CORPUS]
-        results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*self._start_lookups(tokens))
 
         # Filter out None results
-        return [result for result in results if result is not None]
+        return [self.corpus[i] for i in results if i is not None]
 
     async def run(self, query: str = "") -> Dict[str, Any]:
         """Run the async search agent with the given query."""
         if not isinstance(query, str):
             raise TypeError("query must be a string")
 
-        start_time = asyncio.get_event_loop().time()
-        results = await self._search(query)
-        execution_time = asyncio.get_event_loop().time() - start_time
+        start_time = time.perf_counter()
+        with self.step("search"):
+            results = await self._search(query)
+        execution_time = time.perf_counter() - start_time
 
         return {
             "query": query,
@@ -70,3 +84,31 @@ class AsyncSearchAgent(AsyncBaseAgent):
             "execution_time": execution_time,
             "concurrent_searches": self.concurrent_searches,
         }
+
+    async def run_stream(self, query: str = "") -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield ``{"event": "hit", "index": ..., "text": ...}`` as lookups match, then ``done``.
+
+        Hits arrive in completion order; lookups still pending when the
+        consumer stops iterating are cancelled. The ``done`` event carries the
+        query and ``result_count``.
+        """
+        if not isinstance(query, str):
+            raise TypeError("query must be a string")
+        tokens = [t.lower() for t in query.split() if t.strip()]
+        count = 0
+        if tokens:
+            lookups = self._start_lookups(tokens)
+            try:
+                for lookup in asyncio.as_completed(lookups):
+                    index = await lookup
+                    if index is not None:
+                        count += 1
+                        yield {
+                            "event": "hit",
+                            "index": index,
+                            "text": self.corpus[index],
+                        }
+            finally:
+                for pending in lookups:
+                    pending.cancel()
+        yield {"event": "done", "result": {"query": query, "result_count": count}}
@@ -3,26 +3,160 @@
 This file contains a minimal BaseAgent class to be extended by concrete agents.
 """
 
-from typing import Any, Dict, Optional
+import contextvars
+import functools
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    Optional,
+)
 
+from .instrumentation import InstrumentedMixin, instrument_run, instrument_stream
+from .profiling import PROFILING
 
-class BaseAgent:
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+async def _offload(fn: Callable[[], Any], executor: Optional["Executor"] = None) -> Any:
+    """Run ``fn`` on ``executor`` (default: the shared one) without blocking the event loop."""
+    # Imported here so sync-only processes (CLI runs) never load asyncio
+    import asyncio
+
+    from .bridge import get_executor
+
+    return await asyncio.get_running_loop().run_in_executor(
+        executor or get_executor(), fn
+    )
+
+
+class BaseAgent(InstrumentedMixin):
     """Minimal agent interface.
 
     Contract:
     - input: a dict-like `config` and arbitrary kwargs
     - output: a dict with at least a "result" key on success
     - error modes: raise exceptions on invalid input
+
+    Every subclass's ``run()`` is timed automatically; use ``self.step(name)``
+    to time sub-steps and ``self.count(name)`` for event counters.
+
+    Lifecycle: ``start()`` runs ``warmup()`` once, ``close()`` releases
+    resources, and the agent works as a sync or async context manager::
+
+        with APIAgent(config) as agent:
+            agent.run(endpoint="/posts/1")
     """
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Wrap the subclass's ``run()`` and ``run_stream()`` with the instrumentation timer."""
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get("run")
+        if run is not None and not getattr(run, "__instrumented__", False):
+            cls.run = instrument_run(run)  # type: ignore[method-assign]
+        run_stream = cls.__dict__.get("run_stream")
+        if run_stream is not None and not getattr(
+            run_stream, "__instrumented__", False
+        ):
+            cls.run_stream = instrument_stream(run_stream)  # type: ignore[method-assign]
+
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the agent with optional configuration."""
         self.config = config or {}
+        self.started = False
+        self._init_metrics(self.config)
 
     def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
         """Run the agent. Must be implemented by subclasses."""
         raise NotImplementedError("Agents must implement run()")
 
+    async def arun(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Run the agent from asyncio without blocking the event loop.
+
+        The call is offloaded to the shared executor with the caller's
+        context variables.
+        """
+        call = functools.partial(self.run, *args, **kwargs)
+        context = contextvars.copy_context()
+        result: Dict[str, Any] = await _offload(functools.partial(context.run, call))
+        return result
+
+    @instrument_stream
+    def run_stream(
+        self, *args: Any, **kwargs: Any
+    ) -> Generator[Dict[str, Any], None, None]:
+        """Yield results incrementally, ending with ``{"event": "done", "result": ...}``.
+
+        Agents that can report progress override this; by default the only
+        event is the ``done`` one wrapping ``run()``'s result. Streams are
+        instrumented like ``run()`` and accept the same ``deadline`` keyword.
+        """
+        yield {"event": "done", "result": self.run(*args, **kwargs)}
+
+    async def arun_stream(
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Iterate ``run_stream()`` from asyncio without blocking the event loop.
+
+        Each event is produced on the shared executor, always inside the same
+        copy of the caller's context variables. While profiling is on, a
+        thread of its own produces every event, so one profile covers them.
+        """
+        stream = self.run_stream(*args, **kwargs)
+        context = contextvars.copy_context()
+        executor = None
+        if PROFILING.active:
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(1, thread_name_prefix="smallagents-stream")
+        end = object()
+        try:
+            while True:
+                event = await _offload(
+                    functools.partial(context.run, next, stream, end), executor
+                )
+                if event is end:
+                    return
+                yield event
+        finally:
+            await _offload(functools.partial(context.run, stream.close), executor)
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def start(self) -> "BaseAgent":
+        """Warm the agent up once; later calls are no-ops until ``close()``."""
+        if not self.started:
+            self.warmup()
+            self.started = True
+        return self
+
+    def warmup(self) -> None:
+        """Pay cold-start costs before the first ``run()``. Override as needed."""
+
+    def close(self) -> None:
+        """Release resources held by the agent. Subclasses call ``super().close()``."""
+        self.started = False
+
+    def __enter__(self) -> "BaseAgent":
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "BaseAgent":
+        await _offload(self.start)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        await _offload(self.close)
+
     def info(self) -> Dict[str, Any]:
         """Return metadata about the agent."""
-        return {"name": self.__class__.__name__, "config": self.config}
+        info = {"name": self.__class__.__name__, "config": self.config}
+        if self.metrics is not None:
+            info["metrics"] = self.metrics.snapshot()
+        return info
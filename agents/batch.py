@@ -0,0 +1,145 @@
+"""Stream many inputs through one warm agent and write JSONL results.
+
+Each input line is either a JSON object of ``run()`` keyword arguments or
+plain text used as the agent's main argument (``query`` by default). Every
+result is written as one JSON line::
+
+    {"line": 1, "input": {"query": "agents"}, "result": {...}}
+    {"line": 2, "input": {"query": 42}, "error": "TypeError: query must be a string"}
+
+At most ``workers * 4`` inputs are in flight, so memory stays bounded no
+matter how long the input is.
+"""
+
+import json
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+
+def parse_line(line: str, field: str = "query") -> Optional[Dict[str, Any]]:
+    """Turn one input line into ``run()`` kwargs; blank lines give ``None``."""
+    text = line.strip()
+    if not text:
+        return None
+    if text.startswith("{"):
+        kwargs = json.loads(text)
+        if not isinstance(kwargs, dict):
+            raise ValueError("JSON input lines must be objects")
+        return kwargs
+    return {field: text}
+
+
+def _runner(agent: Any) -> Callable[..., Any]:
+    """Return a blocking callable for sync or async agents."""
+    run: Callable[..., Any] = getattr(agent, "run_sync", agent.run)
+    return run
+
+
+def _execute(
+    run: Callable[..., Any], number: int, kwargs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run one input and build its output record."""
+    record: Dict[str, Any] = {"line": number, "input": kwargs}
+    try:
+        record["result"] = run(**kwargs)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def _inputs(
+    lines: Iterable[str], field: str
+) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """Yield ``(line_number, kwargs, parse_error)`` for non-blank lines."""
+    for number, line in enumerate(lines, 1):
+        try:
+            kwargs = parse_line(line, field)
+        except ValueError as e:
+            yield number, line.rstrip("\n"), f"{type(e).__name__}: {e}"
+            continue
+        if kwargs is not None:
+            yield number, kwargs, None
+
+
+def run_batch(
+    agent: Any,
+    lines: Iterable[str],
+    output: TextIO,
+    workers: int = 1,
+    ordered: bool = True,
+    field: str = "query",
+) -> Dict[str, Any]:
+    """Run every input line through ``agent`` and write JSONL to ``output``.
+
+    With ``ordered=False`` results are written as soon as they finish.
+    Returns the number of processed and failed inputs and the elapsed time.
+    """
+    run = _runner(agent)
+    stats: Dict[str, Any] = {"processed": 0, "errors": 0}
+    start = time.perf_counter()
+
+    def emit(record: Dict[str, Any]) -> None:
+        output.write(json.dumps(record, default=str) + "\n")
+        stats["processed"] += 1
+        if "error" in record:
+            stats["errors"] += 1
+
+    if workers <= 1:
+        for number, kwargs, error in _inputs(lines, field):
+            emit(
+                {"line": number, "input": kwargs, "error": error}
+                if error
+                else _execute(run, number, kwargs)
+            )
+    else:
+        max_in_flight = workers * 4
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="smallagents-batch"
+        ) as executor:
+            in_order: Deque[Future[Dict[str, Any]]] = deque()
+            pending: Set[Future[Dict[str, Any]]] = set()
+            for number, kwargs, error in _inputs(lines, field):
+                if error:
+                    future: Future[Dict[str, Any]] = Future()
+                    future.set_result({"line": number, "input": kwargs, "error": error})
+                else:
+                    future = executor.submit(_execute, run, number, kwargs)
+                if ordered:
+                    in_order.append(future)
+                    while in_order and (
+                        in_order[0].done() or len(in_order) >= max_in_flight
+                    ):
+                        emit(in_order.popleft().result())
+                else:
+                    pending.add(future)
+                    if len(pending) >= max_in_flight:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for f in finished:
+                            emit(f.result())
+            while in_order:
+                emit(in_order.popleft().result())
+            for f in as_completed(pending):
+                emit(f.result())
+
+    output.flush()
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,106 @@
+"""Shared executor and background event loop for sync/async bridging.
+
+``BaseAgent.arun`` offloads blocking ``run()`` calls to one process-wide
+thread pool, and ``AsyncBaseAgent.run_sync`` submits coroutines to one
+persistent background event loop, so neither side pays for creating a
+pool or an event loop per call.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_background: Optional["BackgroundLoop"] = None
+
+
+def default_max_workers() -> int:
+    """Return the shared pool size: ``SMALLAGENTS_MAX_WORKERS`` or CPUs + 4 (max 32)."""
+    configured = os.environ.get("SMALLAGENTS_MAX_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool used to run sync agents from asyncio."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=default_max_workers(), thread_name_prefix="smallagents"
+            )
+        return _executor
+
+
+class BackgroundLoop:
+    """An event loop running forever in a daemon thread."""
+
+    def __init__(self) -> None:
+        """Start the loop thread and wait until the loop is running."""
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve() -> None:
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(
+            target=serve, name="smallagents-loop", daemon=True
+        )
+        self.thread.start()
+        ready.wait()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """Schedule ``coro`` on the loop and return a concurrent future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run ``coro`` on the loop and block until it finishes."""
+        if threading.current_thread() is self.thread:
+            coro.close()
+            raise RuntimeError(
+                "Cannot block on the background loop from its own thread"
+            )
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and join its thread."""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide background loop, starting it on first use."""
+    global _background
+    with _lock:
+        if _background is None:
+            _background = BackgroundLoop()
+        return _background
+
+
+@atexit.register
+def shutdown() -> None:
+    """Stop the shared background loop and executor."""
+    global _executor, _background
+    with _lock:
+        executor, background = _executor, _background
+        _executor = _background = None
+    if background is not None:
+        background.stop()
+    if executor is not None:
+        executor.shutdown(wait=False)
@@ -0,0 +1,304 @@
+"""Record/replay HTTP transport for offline, deterministic runs.
+
+A cassette is a JSON file of HTTP exchanges. ``CassetteAdapter`` is a
+``requests`` transport adapter that, depending on the mode, forwards
+requests to the network and records them (``record``), answers them from
+the cassette (``replay``), or replays known requests and records the rest
+(``auto``). Replayed responses can be delayed to model provider latency::
+
+    agent = APIAgent({
+        "base_url": "https://jsonplaceholder.typicode.com",
+        "cassette": {"path": "cassettes/api.json", "mode": "replay",
+                     "latency": {"distribution": "lognormal", "median": 0.08, "sigma": 0.4}},
+    })
+
+``latency`` is a number of seconds (fixed), ``"recorded"`` (the timing
+captured with each exchange, optionally scaled with ``latency_scale``), or a
+``{"distribution": ...}`` dict (``uniform``, ``normal`` or ``lognormal``,
+seeded with ``seed`` for repeatable runs). ``APIAgent`` and
+``SocialMediaVideoAgent`` accept the same ``cassette`` config.
+"""
+
+import datetime
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+MODES = ("record", "replay", "auto")
+
+Latency = Callable[[float], float]
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """A replayed request has no recorded exchange."""
+
+
+def _no_latency(recorded: float) -> float:
+    return 0.0
+
+
+def latency_model(
+    spec: Any = None, scale: float = 1.0, seed: Optional[int] = None
+) -> Latency:
+    """Build a function mapping a recorded duration to the delay to inject."""
+    if not spec:
+        return _no_latency
+    if spec == "recorded":
+        return lambda recorded: recorded * scale
+    if isinstance(spec, (int, float)):
+        fixed = float(spec)
+        return lambda recorded: fixed
+    if isinstance(spec, dict):
+        params = dict(spec)
+        kind = params.pop("distribution", None)
+        rng = random.Random(params.pop("seed", seed))
+        if kind == "uniform":
+            low, high = params["low"], params["high"]
+            return lambda recorded: rng.uniform(low, high)
+        if kind == "normal":
+            mean, stddev = params["mean"], params.get("stddev", 0.0)
+            return lambda recorded: max(0.0, rng.gauss(mean, stddev))
+        if kind == "lognormal":
+            import math
+
+            mu, sigma = math.log(params["median"]), params.get("sigma", 0.5)
+            return lambda recorded: rng.lognormvariate(mu, sigma)
+        raise ValueError(f"Unknown latency distribution: {kind!r}")
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def _body_text(body: Union[bytes, str, None]) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        return body.decode("utf-8", errors="replace")
+    return body
+
+
+class Cassette:
+    """HTTP exchanges recorded to and replayed from one JSON file.
+
+    Exchanges are matched on method and full URL (and the request body with
+    ``match_body``). Repeated requests replay their recordings in order and
+    then start over, so a polling loop sees the same sequence on every run.
+    Each thread keeps its own position, so concurrent runs replay
+    independently.
+    """
+
+    def __init__(self, path: str, match_body: bool = False) -> None:
+        """Load ``path`` if it exists; a missing file is an empty cassette."""
+        self.path = path
+        self.match_body = match_body
+        self.interactions: List[Dict[str, Any]] = []
+        self._index: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for interaction in json.load(f).get("interactions", []):
+                    self._add(interaction)
+
+    def _key(self, request: Dict[str, Any]) -> Tuple[str, ...]:
+        key: Tuple[str, ...] = (request["method"].upper(), request["url"])
+        if self.match_body:
+            key += (request.get("body") or "",)
+        return key
+
+    def _add(self, interaction: Dict[str, Any]) -> None:
+        self.interactions.append(interaction)
+        self._index.setdefault(self._key(interaction["request"]), []).append(
+            interaction
+        )
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def find(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the next recorded exchange for ``request``, or ``None``."""
+        key = self._key(request)
+        with self._lock:
+            matches = self._index.get(key)
+        if not matches:
+            return None
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = {}
+        position = cursor.get(key, 0)
+        cursor[key] = position + 1
+        match: Dict[str, Any] = matches[position % len(matches)]
+        return match
+
+    def record(
+        self, request: Dict[str, Any], response: Dict[str, Any], elapsed: float
+    ) -> None:
+        """Append one exchange and rewrite the file."""
+        with self._lock:
+            self._add(
+                {"request": request, "response": response, "elapsed": round(elapsed, 6)}
+            )
+            self._save()
+
+    def _save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # A unique temp file per write, so concurrent recorders never share one
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"version": 1, "interactions": self.interactions}, f, indent=2)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+
+
+_cassettes: Dict[Tuple[str, bool], Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def open_cassette(path: str, match_body: bool = False) -> Cassette:
+    """Return the process-wide ``Cassette`` for ``path``, so agents share recordings."""
+    key = (os.path.abspath(path), match_body)
+    with _cassettes_lock:
+        cassette = _cassettes.get(key)
+        if cassette is None:
+            cassette = _cassettes[key] = Cassette(path, match_body)
+        return cassette
+
+
+class CassetteAdapter(BaseAdapter):
+    """``requests`` transport adapter that records or replays a cassette."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str = "replay",
+        latency: Latency = _no_latency,
+        real: Optional[BaseAdapter] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """``real`` sends requests in record/auto mode (a plain ``HTTPAdapter`` by default)."""
+        super().__init__()
+        if mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {MODES}, got {mode!r}")
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self.real = (
+            real if real is not None else (HTTPAdapter() if mode != "replay" else None)
+        )
+        self.sleep = sleep
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """Answer ``request`` from the cassette or the network."""
+        recorded_request = {
+            "method": request.method or "GET",
+            "url": request.url or "",
+            "body": _body_text(request.body),
+        }
+        if self.mode != "record":
+            interaction = self.cassette.find(recorded_request)
+            if interaction is not None:
+                delay = self.latency(interaction.get("elapsed", 0.0))
+                if delay > 0:
+                    self.sleep(delay)
+                return self._build_response(request, interaction)
+            if self.mode == "replay":
+                raise CassetteMiss(
+                    f"No recorded response for {recorded_request['method']} {recorded_request['url']} "
+                    f"in {self.cassette.path}",
+                    request=request,
+                )
+
+        assert self.real is not None
+        start = time.perf_counter()
+        response = self.real.send(
+            request,
+            stream=stream,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+        elapsed = time.perf_counter() - start
+        self.cassette.record(
+            recorded_request,
+            {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": dict(response.headers),
+                "body": response.content.decode("utf-8", errors="replace"),
+            },
+            elapsed,
+        )
+        return response
+
+    @staticmethod
+    def _build_response(
+        request: requests.PreparedRequest, interaction: Dict[str, Any]
+    ) -> requests.Response:
+        recorded = interaction["response"]
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded.get("reason") or ""
+        response.headers = CaseInsensitiveDict(recorded.get("headers") or {})
+        response._content = (recorded.get("body") or "").encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=interaction.get("elapsed", 0.0))
+        return response
+
+    def close(self) -> None:
+        if self.real is not None:
+            self.real.close()
+
+
+def adapter_from_config(
+    config: Optional[Dict[str, Any]], real: Optional[BaseAdapter] = None
+) -> Optional[CassetteAdapter]:
+    """Build an adapter from an agent's ``cassette`` config, or ``None`` if unset.
+
+    Keys: ``path`` (required), ``mode`` (``replay``), ``latency``,
+    ``latency_scale``, ``seed`` and ``match_body``.
+    """
+    if not config:
+        return None
+    if "path" not in config:
+        raise ValueError("cassette config needs a 'path'")
+    return CassetteAdapter(
+        open_cassette(config["path"], config.get("match_body", False)),
+        mode=config.get("mode", "replay"),
+        latency=latency_model(
+            config.get("latency"), config.get("latency_scale", 1.0), config.get("seed")
+        ),
+        real=real,
+    )
+
+
+def session_from_config(config: Optional[Dict[str, Any]]) -> Optional[requests.Session]:
+    """Return a ``requests.Session`` routed through a cassette, or ``None`` if unset."""
+    adapter = adapter_from_config(config)
+    if adapter is None:
+        return None
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,90 @@
+"""SQLite-backed checkpoint store for resumable agent workflows."""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class CheckpointStore:
+    """Persist per-run step outputs so an interrupted workflow can resume.
+
+    Each run is identified by a ``run_id``. Pipeline steps and per-platform
+    post results are stored as JSON values keyed by ``(run_id, kind, key)``,
+    where ``kind`` is either ``"step"`` or ``"post"``.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open (or create) the checkpoint database at ``path``."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, kind, key)
+                )
+                """
+            )
+
+    def _put(self, run_id: str, kind: str, key: str, value: Any) -> None:
+        """Insert or replace a single checkpoint entry."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                (run_id, kind, key, json.dumps(value), time.time()),
+            )
+
+    def save_step(self, run_id: str, step: str, value: Any) -> None:
+        """Record the output of a completed pipeline step."""
+        self._put(run_id, "step", step, value)
+
+    def save_post(self, run_id: str, platform: str, result: Dict[str, Any]) -> None:
+        """Record the result of posting to a single platform."""
+        self._put(run_id, "post", platform, result)
+
+    def discard_step(self, run_id: str, step: str) -> None:
+        """Forget a previously recorded step so it is recomputed on resume."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE run_id = ? AND kind = 'step' AND key = ?",
+                (run_id, step),
+            )
+
+    def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """Return ``{"steps": {...}, "social_posts": {...}}`` for a run."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, key, value FROM checkpoints WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+
+        state: Dict[str, Dict[str, Any]] = {"steps": {}, "social_posts": {}}
+        for kind, key, value in rows:
+            bucket = "steps" if kind == "step" else "social_posts"
+            state[bucket][key] = json.loads(value)
+        return state
+
+    def clear(self, run_id: str) -> None:
+        """Delete all checkpoint entries for a run."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_checkpoint_store(path: Optional[str]) -> Optional[CheckpointStore]:
+    """Return a store for ``path``, or ``None`` when checkpointing is disabled."""
+    if not path:
+        return None
+    return CheckpointStore(path)
@@ -0,0 +1,263 @@
+"""Per-call deadlines and cooperative cancellation.
+
+Every agent's ``run()`` accepts a ``deadline`` keyword: a number of seconds
+or a ``Deadline`` shared with other calls::
+
+    agent.run(topic="robots", deadline=30)
+
+    deadline = Deadline(30)
+    threading.Timer(5, deadline.cancel).start()
+    agent.run(topic="robots", deadline=deadline)
+
+For the duration of the call the deadline is the *current* deadline (a
+context variable, so it follows the call onto executor threads and asyncio
+tasks). Blocking work checks it: HTTP timeouts are capped at the time left,
+retries and polling waits that cannot finish in time raise
+``DeadlineExceeded`` straight away instead of sleeping, and async runs are
+guarded so their gathered tasks are cancelled. A deadline passed while
+another is current can only tighten it.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_current: "contextvars.ContextVar[Optional[Deadline]]" = contextvars.ContextVar(
+    "smallagents_deadline", default=None
+)
+
+
+class Cancelled(Exception):
+    """The call was cancelled through its ``Deadline``."""
+
+
+class DeadlineExceeded(Cancelled):
+    """The call ran out of time, or could not finish in the time left."""
+
+
+class Deadline:
+    """A point in time to give up by, plus a thread-safe cancel switch.
+
+    ``timeout=None`` never expires but can still be cancelled. A deadline
+    created with ``parents`` expires no later than any of them and is
+    cancelled along with them.
+    """
+
+    def __init__(
+        self, timeout: Optional[float] = None, parents: Tuple["Deadline", ...] = ()
+    ) -> None:
+        """Expire ``timeout`` seconds from now (``None``: only on ``cancel()``)."""
+        if timeout is not None and timeout < 0:
+            raise ValueError("timeout must be >= 0")
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._unlink: List[Callable[[], None]] = []
+        for parent in parents:
+            if parent.expires_at is not None and (
+                self.expires_at is None or parent.expires_at < self.expires_at
+            ):
+                self.expires_at = parent.expires_at
+            self._unlink.append(
+                parent.add_callback(functools.partial(self._cancel_from, parent))
+            )
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        state = (
+            "cancelled"
+            if self.cancelled
+            else ("no expiry" if remaining is None else f"{remaining:.3f}s left")
+        )
+        return f"Deadline({state})"
+
+    def _cancel_from(self, parent: "Deadline") -> None:
+        self.cancel(parent.reason or "cancelled")
+
+    def child(self, timeout: Optional[float] = None) -> "Deadline":
+        """Return a deadline at most ``timeout`` seconds away, cancelled with this one."""
+        return Deadline(timeout, parents=(self,))
+
+    def detach(self) -> None:
+        """Stop following the parents' cancellation."""
+        for unlink in self._unlink:
+            unlink()
+        self._unlink = []
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel every call using this deadline; safe from any thread."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call ``callback()`` on ``cancel()`` (now, if already cancelled); return a remover."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return functools.partial(self._remove_callback, callback)
+        callback()
+        return _noop
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def cancelled(self) -> bool:
+        """True once ``cancel()`` was called."""
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        """True once the deadline has passed."""
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or ``None`` without an expiry time."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self) -> None:
+        """Raise ``Cancelled``/``DeadlineExceeded`` if the call should stop now."""
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+        if self.expired:
+            raise DeadlineExceeded("deadline exceeded")
+
+    def ensure(self, seconds: float) -> None:
+        """Raise unless ``seconds`` more of work fit before the deadline."""
+        self.check()
+        remaining = self.remaining()
+        if remaining is not None and seconds > remaining:
+            raise DeadlineExceeded(
+                f"needs {seconds:.3g}s but only {remaining:.3g}s left before the deadline"
+            )
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Return ``default`` capped at the time left, for use as an I/O timeout."""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep, waking early on ``cancel()``; waits that cannot fit raise at once."""
+        self.ensure(seconds)
+        if self._event.wait(seconds):
+            raise Cancelled(self.reason)
+
+    async def guard(self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable``, cancelling it on expiry or ``cancel()``."""
+        # Imported here so sync-only processes (CLI runs) never load asyncio
+        import asyncio
+
+        try:
+            self.check()
+        except Cancelled:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(awaitable)
+
+        def cancel_task() -> None:
+            loop.call_soon_threadsafe(task.cancel)
+
+        remove = self.add_callback(cancel_task)
+        try:
+            return await asyncio.wait_for(task, self.remaining())
+        except asyncio.TimeoutError:
+            if self.expired:
+                raise DeadlineExceeded("deadline exceeded") from None
+            raise
+        except asyncio.CancelledError:
+            if self.cancelled and task.cancelled():
+                raise Cancelled(self.reason) from None
+            raise
+        finally:
+            remove()
+
+
+def _noop() -> None:
+    return None
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the ``run()`` call in progress, if any."""
+    return _current.get()
+
+
+class scope:
+    """Make a deadline current for a block; ``run(deadline=...)`` uses this.
+
+    ``value`` is a ``Deadline``, a number of seconds or ``None`` (no change).
+    Nested inside another deadline the result is bounded by both. Entering
+    raises if the deadline is already cancelled or past.
+    """
+
+    def __init__(self, value: Any) -> None:
+        outer = _current.get()
+        if value is None or value is outer:
+            self.deadline = outer
+        elif isinstance(value, Deadline):
+            self.deadline = (
+                Deadline(parents=(value, outer)) if outer is not None else value
+            )
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.deadline = Deadline(
+                value, parents=(outer,) if outer is not None else ()
+            )
+        else:
+            raise TypeError("deadline must be a Deadline or a number of seconds")
+        self._linked = self.deadline is not value and self.deadline is not outer
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Optional[Deadline]:
+        if self.deadline is not None:
+            self.deadline.check()
+        self._token = _current.set(self.deadline)
+        return self.deadline
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        if self._linked and self.deadline is not None:
+            self.deadline.detach()
+
+
+def check() -> None:
+    """Raise if the current deadline is cancelled or past; no-op without one."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def remaining_timeout(default: Optional[float]) -> Optional[float]:
+    """Return ``default`` capped at the current deadline's time left."""
+    deadline = _current.get()
+    return default if deadline is None else deadline.timeout(default)
+
+
+def sleep(seconds: float) -> None:
+    """``time.sleep`` that respects the current deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
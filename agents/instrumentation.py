@@ -0,0 +1,601 @@
+"""Low-overhead timing, counters and Prometheus export for agents."""
+
+import bisect
+import functools
+import threading
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from . import deadline as _deadline
+from .profiling import PROFILING, ProfileSettings
+from .tracing import TRACER, Span, use_span
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Exponential bucket bounds from 1 microsecond to ~134 seconds
+BUCKET_BOUNDS = tuple(1e-6 * 2**i for i in range(28))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with percentile estimates.
+
+    Buckets are exponential (factor 2), so recording is a binary search and
+    percentiles are interpolated within the bucket that holds them.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        """Record one duration; the caller is responsible for locking."""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0-1) in seconds."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= target:
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                fraction = (target - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Return count, error rate, mean, max and p50/p95/p99 in seconds."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class _StepTimer:
+    """Context manager timing one step into a ``Metrics`` registry.
+
+    When tracing is enabled the step is also recorded as a child span.
+    """
+
+    __slots__ = ("_metrics", "_name", "_start", "_scope", "span")
+
+    def __init__(self, metrics: Optional["Metrics"], name: str) -> None:
+        self._metrics = metrics
+        self._name = name
+        self._start = 0.0
+        self._scope: Any = None
+        self.span: Any = None
+
+    def __enter__(self) -> "_StepTimer":
+        if TRACER.enabled:
+            self._scope = TRACER.start_span(self._name)
+            self.span = self._scope.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._metrics is not None:
+            self._metrics.observe(
+                self._name, time.perf_counter() - self._start, exc_type is not None
+            )
+        if self._scope is not None:
+            self._scope.__exit__(exc_type, exc, tb)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the step's span, if tracing is on."""
+        if self.span is not None:
+            self.span.set_attribute(key, value)
+
+
+class _NullTimer:
+    """Shared no-op context manager used when instrumentation is disabled."""
+
+    __slots__ = ()
+    span = None
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Thread-safe per-agent registry of step histograms and event counters."""
+
+    def __init__(self, agent: str) -> None:
+        """Create an empty registry labelled with the agent name."""
+        self.agent = agent
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop the lock so agents can be pickled into worker processes."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore state with a fresh lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def observe(self, step: str, seconds: float, error: bool = False) -> None:
+        """Record the duration of one ``step`` call."""
+        with self._lock:
+            histogram = self.histograms.get(step)
+            if histogram is None:
+                histogram = self.histograms[step] = LatencyHistogram()
+            histogram.observe(seconds, error)
+
+    def timer(self, step: str) -> _StepTimer:
+        """Return a context manager that times a block as ``step``."""
+        return _StepTimer(self, step)
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        """Increment the event counter ``name``."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return per-step latency summaries and counters."""
+        with self._lock:
+            return {
+                "steps": {name: h.summary() for name, h in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def reset(self) -> None:
+        """Drop all recorded data."""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def to_prometheus(self) -> str:
+        """Render this registry in the Prometheus text exposition format."""
+        return render_prometheus([self])
+
+
+def _labels(**labels: str) -> str:
+    """Format a Prometheus label set."""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels.items()
+    )
+    return "{" + body + "}"
+
+
+def render_prometheus(
+    registries: Iterable[Metrics], prefix: str = "smallagents"
+) -> str:
+    """Render several agents' metrics as one Prometheus text payload."""
+    registries = list(registries)
+    duration: List[str] = []
+    errors: List[str] = []
+    events: List[str] = []
+    for metrics in registries:
+        with metrics._lock:
+            histograms = {
+                name: (list(h.counts), h.count, h.total, h.errors)
+                for name, h in metrics.histograms.items()
+            }
+            counters = dict(metrics.counters)
+        for step, (counts, count, total, errs) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, counts):
+                cumulative += bucket_count
+                duration.append(
+                    f"{prefix}_step_duration_seconds_bucket"
+                    f"{_labels(agent=metrics.agent, step=step, le=repr(bound))} {cumulative}"
+                )
+            duration.append(
+                f"{prefix}_step_duration_seconds_bucket"
+                f"{_labels(agent=metrics.agent, step=step, le='+Inf')} {count}"
+            )
+            duration.append(
+                f"{prefix}_step_duration_seconds_sum{_labels(agent=metrics.agent, step=step)} {total}"
+            )
+            duration.append(
+                f"{prefix}_step_duration_seconds_count{_labels(agent=metrics.agent, step=step)} {count}"
+            )
+            errors.append(
+                f"{prefix}_step_errors_total{_labels(agent=metrics.agent, step=step)} {errs}"
+            )
+        for name, value in sorted(counters.items()):
+            events.append(
+                f"{prefix}_events_total{_labels(agent=metrics.agent, name=name)} {value}"
+            )
+
+    lines = [
+        f"# HELP {prefix}_step_duration_seconds Duration of agent run() calls and named steps.",
+        f"# TYPE {prefix}_step_duration_seconds histogram",
+        *duration,
+        f"# HELP {prefix}_step_errors_total Agent run() calls and steps that failed.",
+        f"# TYPE {prefix}_step_errors_total counter",
+        *errors,
+        f"# HELP {prefix}_events_total Agent-specific event counters.",
+        f"# TYPE {prefix}_events_total counter",
+        *events,
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _is_failure(result: Any) -> bool:
+    """Treat ``{"success": False, ...}`` results as errors."""
+    return isinstance(result, dict) and result.get("success") is False
+
+
+def _run_span(agent: Any) -> Any:
+    """Open the span covering one ``run()`` call."""
+    return TRACER.start_span(
+        f"{type(agent).__name__}.run", {"agent": type(agent).__name__}
+    )
+
+
+def _end_run_span(scope: Any, span: Any, result: Any) -> None:
+    """Close a run span, marking ``{"success": False}`` results as errors."""
+    if span is not None and _is_failure(result):
+        span.set_error(str(result.get("error", "run returned success=False")))
+    scope.__exit__(None, None, None)
+
+
+def _overridden(agent: Any, wrapper: Callable[..., Any]) -> bool:
+    """True when ``wrapper`` is reached through ``super()`` from a subclass's wrapped method."""
+    return getattr(type(agent), wrapper.__name__, wrapper) is not wrapper
+
+
+def instrument_run(run: F) -> F:
+    """Wrap a synchronous ``run`` so each call is timed as step ``"run"``.
+
+    With tracing enabled each call is also a span (a root span unless the
+    caller is already inside one); with profiling switched on for the agent
+    the whole call runs inside a ``ProfileSession``. A ``deadline`` keyword
+    (seconds or a ``Deadline``) is consumed here and made current for the call.
+    Only the most-derived ``run`` is timed, so an override that calls
+    ``super().run()`` still records one observation and one span.
+    """
+
+    @functools.wraps(run)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if "deadline" in kwargs:
+            with _deadline.scope(kwargs.pop("deadline")):
+                return wrapper(self, *args, **kwargs)
+        metrics = self.metrics
+        if (
+            metrics is None and not TRACER.enabled and not PROFILING.active
+        ) or _overridden(self, wrapper):
+            return run(self, *args, **kwargs)
+        if PROFILING.active:
+            session = PROFILING.session_for(self, kwargs)
+            if session is not None:
+                with session:
+                    return _timed(self, metrics, *args, **kwargs)
+        return _timed(self, metrics, *args, **kwargs)
+
+    def _timed(self: Any, metrics: Optional[Metrics], *args: Any, **kwargs: Any) -> Any:
+        scope = _run_span(self)
+        span = scope.__enter__()
+        start = time.perf_counter()
+        try:
+            result = run(self, *args, **kwargs)
+        except BaseException as e:
+            if metrics is not None:
+                metrics.observe("run", time.perf_counter() - start, True)
+            scope.__exit__(type(e), e, e.__traceback__)
+            raise
+        if metrics is not None:
+            metrics.observe("run", time.perf_counter() - start, _is_failure(result))
+        _end_run_span(scope, span, result)
+        return result
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+def instrument_async_run(run: F) -> F:
+    """Wrap an async ``run`` so each call is timed as step ``"run"``.
+
+    With a ``deadline`` keyword the call is also cancelled, gathered tasks
+    included, once the deadline passes or is cancelled. As for
+    ``instrument_run``, only the most-derived ``run`` is timed.
+    """
+
+    @functools.wraps(run)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if "deadline" in kwargs:
+            with _deadline.scope(kwargs.pop("deadline")) as deadline:
+                call = wrapper(self, *args, **kwargs)
+                return await (call if deadline is None else deadline.guard(call))
+        metrics = self.metrics
+        if (
+            metrics is None and not TRACER.enabled and not PROFILING.active
+        ) or _overridden(self, wrapper):
+            return await run(self, *args, **kwargs)
+        if PROFILING.active:
+            session = PROFILING.session_for(self, kwargs)
+            if session is not None:
+                with session:
+                    return await _timed(self, metrics, *args, **kwargs)
+        return await _timed(self, metrics, *args, **kwargs)
+
+    async def _timed(
+        self: Any, metrics: Optional[Metrics], *args: Any, **kwargs: Any
+    ) -> Any:
+        scope = _run_span(self)
+        span = scope.__enter__()
+        start = time.perf_counter()
+        try:
+            result = await run(self, *args, **kwargs)
+        except BaseException as e:
+            if metrics is not None:
+                metrics.observe("run", time.perf_counter() - start, True)
+            scope.__exit__(type(e), e, e.__traceback__)
+            raise
+        if metrics is not None:
+            metrics.observe("run", time.perf_counter() - start, _is_failure(result))
+        _end_run_span(scope, span, result)
+        return result
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+Event = Dict[str, Any]
+
+# Marks the end of a wrapped synchronous stream
+_END: Any = object()
+
+
+def _stream_deadline(value: Any) -> Optional[_deadline.Deadline]:
+    """Turn a stream's ``deadline`` keyword into one ``Deadline`` for its whole life."""
+    if value is None or isinstance(value, _deadline.Deadline):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _deadline.Deadline(value)
+    raise TypeError("deadline must be a Deadline or a number of seconds")
+
+
+def _open_stream(agent: Any, kwargs: Dict[str, Any]) -> Any:
+    """Return ``(span, profile session)`` for a stream starting now; either may be None."""
+    span = TRACER.open_span(
+        f"{type(agent).__name__}.run_stream", {"agent": type(agent).__name__}
+    )
+    session = PROFILING.session_for(agent, kwargs) if PROFILING.active else None
+    if session is not None:
+        session.__enter__()
+    return span, session
+
+
+def _close_stream(
+    metrics: Optional[Metrics],
+    start: float,
+    span: Optional[Span],
+    session: Any,
+    error: Optional[BaseException],
+    last: Optional[Event],
+) -> None:
+    """Record a finished stream; ``last`` is its final event, if any."""
+    failed = error is not None or (last is not None and _is_failure(last.get("result")))
+    if metrics is not None:
+        metrics.observe("run_stream", time.perf_counter() - start, failed)
+    if span is not None:
+        if error is not None:
+            span.record_exception(error)
+        elif failed and last is not None:
+            span.set_error(
+                str(last["result"].get("error", "run returned success=False"))
+            )
+        TRACER.end(span)
+    if session is not None:
+        session.__exit__(None, None, None)
+
+
+def _skip_stream(
+    agent: Any, wrapper: Callable[..., Any], limit: Optional[_deadline.Deadline]
+) -> bool:
+    """True when a stream needs no instrumentation (disabled, or reached via ``super()``)."""
+    if (
+        limit is None
+        and agent.metrics is None
+        and not TRACER.enabled
+        and not PROFILING.active
+    ):
+        return True
+    return _overridden(agent, wrapper)
+
+
+def instrument_stream(run_stream: F) -> F:
+    """Wrap a generator ``run_stream`` as ``instrument_run`` wraps ``run``.
+
+    The stream is timed as step ``"run_stream"``, traced as one span and
+    profiled as one session from its first event until it is exhausted or
+    closed; a failed ``done`` result counts as an error. A ``deadline``
+    keyword bounds the whole stream, but it and the span are current only
+    while an event is being produced, never in the caller between events.
+    """
+
+    @functools.wraps(run_stream)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Generator[Event, None, None]:
+        limit = _stream_deadline(kwargs.pop("deadline", None))
+        stream = run_stream(self, *args, **kwargs)
+        if _skip_stream(self, wrapper, limit):
+            return stream  # type: ignore[no-any-return]
+        return _timed_stream(self, stream, limit, kwargs)
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+def _timed_stream(
+    agent: Any,
+    stream: Generator[Event, None, None],
+    limit: Optional[_deadline.Deadline],
+    kwargs: Dict[str, Any],
+) -> Generator[Event, None, None]:
+    metrics = agent.metrics
+    start = time.perf_counter()
+    span, session = _open_stream(agent, kwargs)
+    error: Optional[BaseException] = None
+    last: Optional[Event] = None
+    try:
+        while True:
+            with _deadline.scope(limit), use_span(span):
+                event = next(stream, _END)
+            if event is _END:
+                return
+            last = event
+            yield event
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        stream.close()
+        _close_stream(metrics, start, span, session, error, last)
+
+
+def instrument_async_stream(run_stream: F) -> F:
+    """Wrap an async generator ``run_stream`` like ``instrument_stream``.
+
+    As for ``instrument_async_run``, producing each event is cancelled once
+    the ``deadline`` passes or is cancelled.
+    """
+
+    @functools.wraps(run_stream)
+    async def wrapper(
+        self: Any, *args: Any, **kwargs: Any
+    ) -> AsyncGenerator[Event, None]:
+        limit = _stream_deadline(kwargs.pop("deadline", None))
+        stream = run_stream(self, *args, **kwargs)
+        try:
+            if _skip_stream(self, wrapper, limit):
+                async for event in stream:
+                    yield event
+                return
+            metrics = self.metrics
+            start = time.perf_counter()
+            span, session = _open_stream(self, kwargs)
+            error: Optional[BaseException] = None
+            last: Optional[Event] = None
+            try:
+                while True:
+                    with _deadline.scope(limit) as current, use_span(span):
+                        step = stream.__anext__()
+                        try:
+                            event = await (
+                                step if current is None else current.guard(step)
+                            )
+                        except StopAsyncIteration:
+                            return
+                    last = event
+                    yield event
+            except GeneratorExit:
+                raise
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                _close_stream(metrics, start, span, session, error, last)
+        finally:
+            await stream.aclose()
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+
+class InstrumentedMixin:
+    """Instrumentation surface shared by ``BaseAgent`` and ``AsyncBaseAgent``.
+
+    Set ``instrumentation: false`` in the agent config to disable it; the
+    ``run`` wrapper and ``step``/``count`` helpers then reduce to a ``None``
+    check.
+    """
+
+    metrics: Optional[Metrics]
+
+    def _init_metrics(self, config: Dict[str, Any]) -> None:
+        """Create the metrics registry unless disabled in ``config``."""
+        enabled = config.get("instrumentation", True)
+        self.metrics = Metrics(self.__class__.__name__) if enabled else None
+        self.profile_settings: Optional[ProfileSettings] = None
+        profile = ProfileSettings.from_config(config.get("profile"))
+        if profile is not None:
+            self.enable_profiling(profile)
+
+    def enable_profiling(self, settings: Any = None, **options: Any) -> ProfileSettings:
+        """Profile every ``run()`` of this agent.
+
+        ``settings`` is a ``ProfileSettings`` or a mode string such as
+        ``"cprofile,sample"``; ``options`` are passed to ``ProfileSettings``.
+        """
+        if isinstance(settings, ProfileSettings):
+            profile = settings
+        else:
+            profile = ProfileSettings(settings or ("cprofile",), **options)
+        if self.profile_settings is None:
+            PROFILING.adjust(agents=1)
+        self.profile_settings = profile
+        return profile
+
+    def disable_profiling(self) -> None:
+        """Stop profiling this agent's runs."""
+        if self.profile_settings is not None:
+            self.profile_settings = None
+            PROFILING.adjust(agents=-1)
+
+    def step(self, name: str) -> Any:
+        """Return a context manager timing a named sub-step of ``run``.
+
+        With tracing enabled the step is also a child span; call
+        ``set_attribute`` on the returned object to annotate it.
+        """
+        metrics = self.metrics
+        if metrics is None and not TRACER.enabled:
+            return NULL_TIMER
+        return _StepTimer(metrics, name)
+
+    def count(self, name: str, amount: float = 1) -> None:
+        """Increment an agent event counter."""
+        if self.metrics is not None:
+            self.metrics.incr(name, amount)
+
+    def metrics_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Return latency summaries and counters, or ``None`` when disabled."""
+        return self.metrics.snapshot() if self.metrics is not None else None
@@ -0,0 +1,456 @@
+"""Durable SQLite-backed job queue and multi-stage worker runner."""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+StageHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _dumps(payload: Optional[Dict[str, Any]]) -> Optional[str]:
+    return None if payload is None else json.dumps(payload)
+
+
+class RetryLater(Exception):
+    """Raised by a stage handler to re-queue its job after ``delay`` seconds.
+
+    Unlike other exceptions this does not use up one of the job's attempts.
+    """
+
+    def __init__(self, delay: float, message: str = "") -> None:
+        """Record how long to wait before the job becomes claimable again."""
+        super().__init__(message or f"retry in {delay:.1f}s")
+        self.delay = delay
+
+
+class JobQueue:
+    """Priority job queue with visibility timeouts, safe across threads and processes.
+
+    A claimed job is leased to one worker until its visibility timeout
+    expires; if the worker dies the job becomes claimable again. Every claim
+    issues a fresh lease token, and ``complete``/``fail`` are ignored for
+    stale tokens so a slow worker cannot clobber a job that was reassigned.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open (or create) the queue database at ``path``."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                stage TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                available_at REAL NOT NULL,
+                lease_token TEXT,
+                lease_expires_at REAL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_claim
+                ON jobs (stage, status, priority DESC, id);
+            """
+        )
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a single write statement under the lock; return the row count."""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Run a query under the lock and return all rows."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _insert(
+        self,
+        stage: str,
+        payload: Dict[str, Any],
+        priority: int,
+        max_attempts: int,
+        available_at: float,
+    ) -> int:
+        """Insert a job row; the caller must hold the lock."""
+        now = time.time()
+        cursor = self._conn.execute(
+            """
+            INSERT INTO jobs (stage, payload, priority, max_attempts,
+                              available_at, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                stage,
+                json.dumps(payload),
+                priority,
+                max_attempts,
+                available_at,
+                now,
+                now,
+            ),
+        )
+        return int(cursor.lastrowid or 0)
+
+    def enqueue(
+        self,
+        stage: str,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        max_attempts: int = 3,
+        delay: float = 0.0,
+    ) -> int:
+        """Add a job for ``stage`` and return its ID. Higher priority runs first."""
+        with self._lock:
+            return self._insert(
+                stage, payload, priority, max_attempts, time.time() + delay
+            )
+
+    def claim(
+        self, stage: str, visibility_timeout: float = 60.0
+    ) -> Optional[Dict[str, Any]]:
+        """Lease the next runnable job for ``stage``, or return ``None``.
+
+        Jobs whose lease expired count the lost attempt; once they have used
+        up ``max_attempts`` they are marked failed instead of being handed out.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    now = time.time()
+                    row = self._conn.execute(
+                        """
+                        SELECT id, payload, priority, attempts, max_attempts
+                        FROM jobs
+                        WHERE stage = ?
+                          AND ((status = 'queued' AND available_at <= ?)
+                               OR (status = 'running' AND lease_expires_at <= ?))
+                        ORDER BY priority DESC, id
+                        LIMIT 1
+                        """,
+                        (stage, now, now),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    job_id, payload, priority, attempts, max_attempts = row
+                    if attempts >= max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                            ("visibility timeout exceeded", now, job_id),
+                        )
+                        continue
+
+                    token = uuid.uuid4().hex
+                    self._conn.execute(
+                        """
+                        UPDATE jobs
+                        SET status = 'running', attempts = attempts + 1,
+                            lease_token = ?, lease_expires_at = ?, updated_at = ?
+                        WHERE id = ?
+                        """,
+                        (token, now + visibility_timeout, now, job_id),
+                    )
+                    self._conn.execute("COMMIT")
+                    return {
+                        "id": job_id,
+                        "stage": stage,
+                        "payload": json.loads(payload),
+                        "priority": priority,
+                        "attempts": attempts + 1,
+                        "max_attempts": max_attempts,
+                        "lease_token": token,
+                    }
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job: Dict[str, Any], visibility_timeout: float = 60.0) -> bool:
+        """Extend the lease on a running job; False if the lease was lost."""
+        updated = self._execute(
+            "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND lease_token = ? AND status = 'running'",
+            (time.time() + visibility_timeout, job["id"], job["lease_token"]),
+        )
+        return updated == 1
+
+    def complete(
+        self,
+        job: Dict[str, Any],
+        result: Dict[str, Any],
+        next_stage: Optional[str] = None,
+    ) -> bool:
+        """Mark a job done, optionally handing ``result`` on to ``next_stage``.
+
+        Returns False (and does nothing) if the lease was lost meanwhile.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    """
+                    UPDATE jobs SET status = 'done', result = ?, lease_token = NULL,
+                                    updated_at = ?
+                    WHERE id = ? AND lease_token = ? AND status = 'running'
+                    """,
+                    (json.dumps(result), time.time(), job["id"], job["lease_token"]),
+                )
+                if cursor.rowcount != 1:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                if next_stage is not None:
+                    self._insert(
+                        next_stage,
+                        result,
+                        job["priority"],
+                        job["max_attempts"],
+                        time.time(),
+                    )
+                self._conn.execute("COMMIT")
+                return True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def fail(
+        self,
+        job: Dict[str, Any],
+        error: str,
+        backoff: float = 5.0,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Record a failed attempt and schedule a retry with exponential backoff.
+
+        The retry is delayed by ``backoff * 2 ** (attempts - 1)`` seconds; once
+        ``max_attempts`` is reached the job is marked failed for good. A
+        ``payload`` replaces the stored one, so the retry sees progress made.
+        """
+        now = time.time()
+        if job["attempts"] >= job["max_attempts"]:
+            status, available_at = "failed", now
+        else:
+            status, available_at = "queued", now + backoff * 2 ** (job["attempts"] - 1)
+        updated = self._execute(
+            """
+            UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_token = NULL,
+                            payload = COALESCE(?, payload), updated_at = ?
+            WHERE id = ? AND lease_token = ? AND status = 'running'
+            """,
+            (
+                status,
+                error,
+                available_at,
+                _dumps(payload),
+                now,
+                job["id"],
+                job["lease_token"],
+            ),
+        )
+        return updated == 1
+
+    def release(
+        self,
+        job: Dict[str, Any],
+        delay: float = 0.0,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Return a running job to the queue without counting the attempt.
+
+        A ``payload`` replaces the stored one, as for ``fail``.
+        """
+        now = time.time()
+        updated = self._execute(
+            """
+            UPDATE jobs SET status = 'queued', attempts = attempts - 1, available_at = ?,
+                            lease_token = NULL, payload = COALESCE(?, payload), updated_at = ?
+            WHERE id = ? AND lease_token = ? AND status = 'running'
+            """,
+            (now + delay, _dumps(payload), now, job["id"], job["lease_token"]),
+        )
+        return updated == 1
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Return a job's current state, or ``None`` if it does not exist."""
+        rows = self._fetchall(
+            "SELECT id, stage, status, priority, attempts, payload, result, error FROM jobs WHERE id = ?",
+            (job_id,),
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "id": row[0],
+            "stage": row[1],
+            "status": row[2],
+            "priority": row[3],
+            "attempts": row[4],
+            "payload": json.loads(row[5]),
+            "result": json.loads(row[6]) if row[6] else None,
+            "error": row[7],
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return job counts as ``{stage: {status: count}}``."""
+        rows = self._fetchall(
+            "SELECT stage, status, COUNT(*) FROM jobs GROUP BY stage, status"
+        )
+        counts: Dict[str, Dict[str, int]] = {}
+        for stage, status, count in rows:
+            counts.setdefault(stage, {})[status] = count
+        return counts
+
+    def outstanding(self) -> int:
+        """Return the number of jobs still queued or running."""
+        rows = self._fetchall(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+        )
+        return int(rows[0][0])
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """Run an ordered list of stages, each with its own pool of worker threads.
+
+    Each handler receives a job payload and returns the payload for the next
+    stage (or the final result for the last one). A handler that raises is
+    retried with exponential backoff up to the job's ``max_attempts``; one
+    that raises ``RetryLater`` (e.g. when rate limited) is simply re-queued.
+    Either way the payload is saved as the handler left it, so a handler can
+    record side effects in it (posts made, say) that the retry must not repeat.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        stages: List[Tuple[str, StageHandler]],
+        pools: Optional[Dict[str, int]] = None,
+        visibility_timeouts: Optional[Dict[str, float]] = None,
+        retry_backoff: float = 5.0,
+        poll_interval: float = 0.5,
+    ) -> None:
+        """Configure the runner; ``pools`` maps stage name to worker count."""
+        if not stages:
+            raise ValueError("JobRunner needs at least one stage")
+        self.queue = queue
+        self.stages = stages
+        self.pools = pools or {}
+        self.visibility_timeouts = visibility_timeouts or {}
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self._next_stage = {
+            name: stages[i + 1][0] if i + 1 < len(stages) else None
+            for i, (name, _) in enumerate(stages)
+        }
+        self._handlers = dict(stages)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def process_one(self, stage: str) -> bool:
+        """Claim and run a single job for ``stage``; False if none was ready."""
+        visibility_timeout = self.visibility_timeouts.get(stage, 60.0)
+        job = self.queue.claim(stage, visibility_timeout)
+        if job is None:
+            return False
+        done = threading.Event()
+        keepalive = threading.Thread(
+            target=self._heartbeat,
+            args=(job, visibility_timeout, done),
+            name=f"{stage}-heartbeat",
+            daemon=True,
+        )
+        keepalive.start()
+        try:
+            try:
+                result = self._handlers[stage](job["payload"])
+            finally:
+                done.set()
+                keepalive.join()
+        except RetryLater as e:
+            self.queue.release(job, e.delay, payload=job["payload"])
+        except Exception as e:
+            self.queue.fail(
+                job,
+                f"{type(e).__name__}: {e}",
+                backoff=self.retry_backoff,
+                payload=job["payload"],
+            )
+        else:
+            self.queue.complete(job, result, next_stage=self._next_stage[stage])
+        return True
+
+    def _heartbeat(
+        self, job: Dict[str, Any], visibility_timeout: float, done: threading.Event
+    ) -> None:
+        """Extend ``job``'s lease every third of its timeout until ``done`` is set."""
+        while not done.wait(visibility_timeout / 3):
+            if not self.queue.heartbeat(job, visibility_timeout):
+                return
+
+    def _worker(self, stage: str) -> None:
+        """Worker thread loop: process jobs until stopped, idling when empty."""
+        while not self._stop.is_set():
+            if not self.process_one(stage):
+                self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """Start the worker threads for every stage."""
+        self._stop.clear()
+        for stage, _ in self.stages:
+            for i in range(max(1, self.pools.get(stage, 1))):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage,),
+                    name=f"{stage}-worker-{i}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Signal the workers to stop and wait for in-flight jobs to finish."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def run_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Run workers until no job is queued or running; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.start()
+        try:
+            while self.queue.outstanding():
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(self.poll_interval)
+            return True
+        finally:
+            self.stop()
+
+    def run_forever(self) -> None:
+        """Run workers until interrupted with Ctrl-C."""
+        self.start()
+        try:
+            while True:
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
@@ -0,0 +1,254 @@
+"""Structured, non-blocking logging for agents.
+
+Agents log through ``get_logger(__name__)``, which accepts keyword fields::
+
+    logger = get_logger(__name__)
+    logger.info("Posted", platform="tiktok", sampled=True)
+
+``configure()`` routes the ``smallagents`` logger hierarchy through a
+``QueueHandler``: worker threads only enqueue records and a
+``QueueListener`` thread formats them as JSON lines and writes them, so
+agents never block on stdout/stderr. Records logged with ``sampled=True``
+(per-item messages such as one line per post) are kept once every
+``1 / sample_rate`` occurrences of the same message.
+
+Until ``configure()`` is called nothing is installed and the standard
+``logging`` defaults apply (warnings and errors go to stderr).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from typing import IO, Any, Dict, Optional, Union
+
+from .tracing import current_span
+
+ROOT_LOGGER = "smallagents"
+
+# Attributes every LogRecord has; anything else came from ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Keys are ``ts``, ``level``, ``logger``, ``msg``, ``thread``, the record's
+    structured fields, ``trace_id``/``span_id`` inside a span, and ``exc``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in (
+                "fields",
+                "sampled",
+                "trace_id",
+                "span_id",
+            ):
+                entry[key] = value
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+            entry["span_id"] = record.span_id  # type: ignore[attr-defined]
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every n-th record of each message logged with ``sampled=True``."""
+
+    def __init__(self, rate: float = 1.0) -> None:
+        """``rate`` is the fraction of sampled records kept (0-1)."""
+        super().__init__()
+        if not 0 <= rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.every = int(round(1 / rate)) if rate else 0
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        if not self.every:
+            return False
+        with self._lock:
+            seen = self._seen.get(record.msg, 0)
+            self._seen[record.msg] = seen + 1
+        return seen % self.every == 0
+
+
+def _prepare(record: logging.LogRecord) -> logging.LogRecord:
+    """Resolve a record on the logging thread before it is queued.
+
+    Formatting is left to the listener; only the message and exception text
+    are resolved here, since args and tracebacks may not outlive the call,
+    and the current trace context is captured.
+    """
+    record.message = record.getMessage()
+    record.msg = record.message
+    record.args = None
+    if record.exc_info:
+        record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+    span = current_span()
+    if span is not None:
+        record.trace_id = span.trace_id
+        record.span_id = span.span_id
+    return record
+
+
+class StructuredLogger:
+    """Thin wrapper over ``logging.Logger`` taking keyword fields."""
+
+    __slots__ = ("logger",)
+
+    def __init__(self, logger: logging.Logger) -> None:
+        self.logger = logger
+
+    def log(
+        self,
+        level: int,
+        msg: str,
+        *args: Any,
+        sampled: bool = False,
+        exc_info: Any = None,
+        **fields: Any,
+    ) -> None:
+        """Log ``msg % args`` with structured ``fields``; skipped cheaply when the level is off."""
+        if self.logger.isEnabledFor(level):
+            self.logger.log(
+                level,
+                msg,
+                *args,
+                exc_info=exc_info,
+                stacklevel=3,
+                extra={"fields": fields, "sampled": sampled},
+            )
+
+    def debug(self, msg: str, *args: Any, **fields: Any) -> None:
+        self.log(logging.DEBUG, msg, *args, **fields)
+
+    def info(self, msg: str, *args: Any, **fields: Any) -> None:
+        self.log(logging.INFO, msg, *args, **fields)
+
+    def warning(self, msg: str, *args: Any, **fields: Any) -> None:
+        self.log(logging.WARNING, msg, *args, **fields)
+
+    def error(self, msg: str, *args: Any, **fields: Any) -> None:
+        self.log(logging.ERROR, msg, *args, **fields)
+
+    def isEnabledFor(self, level: int) -> bool:  # noqa: N802 - mirrors logging.Logger
+        return self.logger.isEnabledFor(level)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Return a structured logger under the ``smallagents`` hierarchy."""
+    if name.startswith("agents."):
+        name = name[len("agents.") :]
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+class _LoggingState:
+    """The installed queue handler and listener, if any."""
+
+    def __init__(self) -> None:
+        self.handler: Optional[logging.Handler] = None
+        self.listener: Any = None
+        self.lock = threading.Lock()
+
+
+_STATE = _LoggingState()
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Stream handler writing to whatever ``sys.stderr`` is when it emits."""
+
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self) -> IO[str]:
+        return sys.stderr
+
+
+def configure(
+    level: Union[int, str, None] = None,
+    stream: Optional[IO[str]] = None,
+    sample_rate: Optional[float] = None,
+    handler: Optional[logging.Handler] = None,
+) -> None:
+    """Send ``smallagents`` logs through a background queue listener.
+
+    ``level`` and ``sample_rate`` default to ``SMALLAGENTS_LOG_LEVEL`` (INFO)
+    and ``SMALLAGENTS_LOG_SAMPLE_RATE`` (1.0). Output goes to ``handler`` or
+    a JSON-lines stream handler on ``stream`` (stderr). Calling again
+    replaces the previous setup.
+    """
+    if level is None:
+        level = os.environ.get("SMALLAGENTS_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {level}")
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("SMALLAGENTS_LOG_SAMPLE_RATE", "1.0"))
+    if handler is None:
+        handler = (
+            logging.StreamHandler(stream) if stream is not None else _StderrHandler()
+        )
+        handler.setFormatter(JSONFormatter())
+    # logging.handlers pulls in socket and pickle; only needed once configured
+    from logging.handlers import QueueHandler, QueueListener
+
+    with _STATE.lock:
+        _stop()
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        queue_handler = QueueHandler(records)
+        queue_handler.prepare = _prepare  # type: ignore[method-assign]
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+        listener = QueueListener(records, handler, respect_handler_level=True)
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        root.propagate = False
+        listener.start()
+        _STATE.handler, _STATE.listener = queue_handler, listener
+
+
+def _stop() -> None:
+    """Detach the queue handler and drain the listener; caller holds the lock."""
+    root = logging.getLogger(ROOT_LOGGER)
+    if _STATE.handler is not None:
+        root.removeHandler(_STATE.handler)
+        root.propagate = True
+    if _STATE.listener is not None:
+        _STATE.listener.stop()  # writes everything already queued
+    _STATE.handler = _STATE.listener = None
+
+
+def shutdown() -> None:
+    """Flush pending records and restore the default logging setup."""
+    with _STATE.lock:
+        _stop()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,366 @@
+"""Run graphs and pipelines of agents concurrently.
+
+``Orchestrator`` executes a DAG of agent invocations: independent nodes run
+in parallel, async agents on the event loop and sync agents on a thread or
+process pool. ``StagePipeline`` streams many items through a chain of agents
+connected by bounded queues, so a slow stage applies backpressure upstream.
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+from . import deadline as _deadline
+from .bridge import get_background_loop, get_executor
+from .tracing import propagate, start_span
+
+InputMapper = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+POOLS = ("thread", "process")
+
+
+def _call_run(agent: Any, kwargs: Dict[str, Any]) -> Any:
+    """Invoke ``agent.run`` in an executor (module level so it pickles)."""
+    return agent.run(**kwargs)
+
+
+def _is_async_agent(agent: Any) -> bool:
+    """Return True if ``agent.run`` is a coroutine function."""
+    return inspect.iscoroutinefunction(agent.run)
+
+
+class _Node:
+    """One agent invocation in an ``Orchestrator`` graph."""
+
+    def __init__(
+        self,
+        name: str,
+        agent: Any,
+        kwargs: Dict[str, Any],
+        depends_on: Sequence[str],
+        inputs: Optional[InputMapper],
+        pool: str,
+    ) -> None:
+        self.name = name
+        self.agent = agent
+        self.kwargs = kwargs
+        self.depends_on = list(depends_on)
+        self.inputs = inputs
+        self.pool = pool
+
+
+class _ExecutorPool:
+    """Lazily created thread and process executors shared by a runner.
+
+    Without ``max_workers`` the thread pool is the shared bridge executor,
+    which outlives the runner.
+    """
+
+    def __init__(self, max_workers: Optional[int]) -> None:
+        self.max_workers = max_workers
+        self._executors: Dict[str, Executor] = {}
+
+    def get(self, pool: str) -> Executor:
+        if pool == "thread" and self.max_workers is None:
+            return get_executor()
+        if pool not in self._executors:
+            factory = ThreadPoolExecutor if pool == "thread" else ProcessPoolExecutor
+            self._executors[pool] = factory(max_workers=self.max_workers)
+        return self._executors[pool]
+
+    async def invoke(self, agent: Any, kwargs: Dict[str, Any], pool: str) -> Any:
+        """Run ``agent`` with ``kwargs`` on the loop or the requested pool."""
+        if _is_async_agent(agent):
+            return await agent.run(**kwargs)
+        loop = asyncio.get_running_loop()
+        current = _deadline.current_deadline()
+        if current is not None and pool == "process":
+            # A Deadline can't cross processes; send the time left instead
+            kwargs = {**kwargs, "deadline": current.timeout()}
+        if pool == "thread":
+            # Carry the current trace context onto the worker thread
+            call = propagate(functools.partial(_call_run, agent, kwargs))
+            return await loop.run_in_executor(self.get(pool), call)
+        return await loop.run_in_executor(self.get(pool), _call_run, agent, kwargs)
+
+    async def shutdown(self) -> None:
+        """Wait for the executors to finish on a helper thread, off the event loop."""
+        executors = list(self._executors.values())
+        self._executors.clear()
+        loop = asyncio.get_running_loop()
+        for executor in executors:
+            await loop.run_in_executor(None, executor.shutdown)
+
+
+def _check_pool(pool: str) -> None:
+    if pool not in POOLS:
+        raise ValueError(f"pool must be one of {POOLS}, got {pool!r}")
+
+
+class Orchestrator:
+    """Execute a DAG of agent invocations with maximum parallelism.
+
+    Each node's keyword arguments are its static ``kwargs`` updated with
+    ``inputs(upstream)``, where ``upstream`` maps each dependency name to its
+    output. A failed node's dependents are skipped; independent branches
+    keep running.
+    """
+
+    def __init__(
+        self, max_concurrency: int = 16, max_workers: Optional[int] = None
+    ) -> None:
+        """Limit in-flight nodes to ``max_concurrency``; size pools by ``max_workers``."""
+        self.max_concurrency = max_concurrency
+        self.max_workers = max_workers
+        self.nodes: Dict[str, _Node] = {}
+
+    def add(
+        self,
+        name: str,
+        agent: Any,
+        kwargs: Optional[Dict[str, Any]] = None,
+        depends_on: Sequence[str] = (),
+        inputs: Optional[InputMapper] = None,
+        pool: str = "thread",
+    ) -> "Orchestrator":
+        """Add a node; ``pool`` picks the executor for sync agents."""
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node name: {name}")
+        _check_pool(pool)
+        self.nodes[name] = _Node(name, agent, kwargs or {}, depends_on, inputs, pool)
+        return self
+
+    def order(self) -> List[str]:
+        """Return node names in a topological order, validating the graph."""
+        for node in self.nodes.values():
+            for dep in node.depends_on:
+                if dep not in self.nodes:
+                    raise ValueError(
+                        f"Node {node.name!r} depends on unknown node {dep!r}"
+                    )
+
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle detected: {' -> '.join(path + [name])}")
+            state[name] = 1
+            for dep in self.nodes[name].depends_on:
+                visit(dep, path + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, [])
+        return order
+
+    async def arun(self, deadline: Any = None) -> Dict[str, Any]:
+        """Run the graph on the current event loop.
+
+        ``deadline`` (seconds or a ``Deadline``) applies to every node; nodes
+        still running when it passes are cancelled and reported in ``errors``.
+        """
+        with _deadline.scope(deadline) as current:
+            return await self._arun(current)
+
+    async def _arun(self, current: Optional[_deadline.Deadline]) -> Dict[str, Any]:
+        order = self.order()
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        executors = _ExecutorPool(self.max_workers)
+        outputs: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        skipped: List[str] = []
+        tasks: Dict[str, asyncio.Task[bool]] = {}
+
+        async def run_node(node: _Node) -> bool:
+            deps_ok = [await tasks[dep] for dep in node.depends_on]
+            if not all(deps_ok):
+                skipped.append(node.name)
+                return False
+            try:
+                kwargs = dict(node.kwargs)
+                if node.inputs is not None:
+                    kwargs.update(
+                        node.inputs({dep: outputs[dep] for dep in node.depends_on})
+                    )
+                async with semaphore:
+                    with start_span(
+                        f"node {node.name}", {"node": node.name, "pool": node.pool}
+                    ):
+                        outputs[node.name] = await executors.invoke(
+                            node.agent, kwargs, node.pool
+                        )
+                return True
+            except Exception as e:
+                errors[node.name] = f"{type(e).__name__}: {e}"
+                return False
+
+        try:
+            with start_span("Orchestrator.run", {"nodes": len(order)}) as span:
+                for name in order:
+                    tasks[name] = asyncio.ensure_future(run_node(self.nodes[name]))
+                gathered = asyncio.gather(*tasks.values())
+                try:
+                    await (gathered if current is None else current.guard(gathered))
+                except _deadline.Cancelled as e:
+                    for name in order:
+                        if (
+                            name not in outputs
+                            and name not in errors
+                            and name not in skipped
+                        ):
+                            errors[name] = f"{type(e).__name__}: {e}"
+                if span is not None and (errors or skipped):
+                    span.set_error(f"{len(errors)} failed, {len(skipped)} skipped")
+        finally:
+            await executors.shutdown()
+
+        return {
+            "success": not errors and not skipped,
+            "outputs": outputs,
+            "errors": errors,
+            "skipped": skipped,
+            "execution_time": time.perf_counter() - start,
+        }
+
+    def run(self, deadline: Any = None) -> Dict[str, Any]:
+        """Run the graph from synchronous code on the shared background loop."""
+        return get_background_loop().run(self.arun(deadline))
+
+
+class Stage:
+    """One step of a ``StagePipeline``."""
+
+    def __init__(
+        self,
+        name: str,
+        agent: Any,
+        to_kwargs: Optional[Callable[[Any], Dict[str, Any]]] = None,
+        concurrency: int = 1,
+        pool: str = "thread",
+    ) -> None:
+        """``to_kwargs`` maps the previous stage's output (or the input item) to kwargs."""
+        _check_pool(pool)
+        self.name = name
+        self.agent = agent
+        self.to_kwargs = to_kwargs or (lambda value: dict(value))
+        self.concurrency = max(1, concurrency)
+        self.pool = pool
+
+
+_DONE = object()
+
+
+class StagePipeline:
+    """Stream items through agents connected by bounded ``asyncio.Queue``s.
+
+    Each stage runs ``concurrency`` workers. Results are yielded as
+    ``{"item", "outputs", "error"}`` dicts in completion order; an item that
+    fails in one stage skips the remaining stages.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        queue_size: int = 64,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """Create the pipeline; ``queue_size`` bounds every inter-stage queue."""
+        if not stages:
+            raise ValueError("StagePipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.max_workers = max_workers
+
+    async def arun(self, items: Iterable[Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Feed ``items`` through the stages, yielding finished records."""
+        executors = _ExecutorPool(self.max_workers)
+        queues: List[asyncio.Queue[Any]] = [
+            asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)
+        ]
+
+        async def feed() -> None:
+            for item in items:
+                await queues[0].put(
+                    {"item": item, "value": item, "outputs": {}, "error": None}
+                )
+            for _ in range(self.stages[0].concurrency):
+                await queues[0].put(_DONE)
+
+        async def work(
+            stage: Stage, inbox: "asyncio.Queue[Any]", outbox: "asyncio.Queue[Any]"
+        ) -> None:
+            while True:
+                record = await inbox.get()
+                if record is _DONE:
+                    return
+                if record["error"] is None:
+                    try:
+                        output = await executors.invoke(
+                            stage.agent, stage.to_kwargs(record["value"]), stage.pool
+                        )
+                        record["outputs"][stage.name] = output
+                        record["value"] = output
+                    except Exception as e:
+                        record["error"] = f"{stage.name}: {type(e).__name__}: {e}"
+                await outbox.put(record)
+
+        async def run_stage(index: int) -> None:
+            stage = self.stages[index]
+            await asyncio.gather(
+                *(
+                    work(stage, queues[index], queues[index + 1])
+                    for _ in range(stage.concurrency)
+                )
+            )
+            downstream = (
+                self.stages[index + 1].concurrency
+                if index + 1 < len(self.stages)
+                else 1
+            )
+            for _ in range(downstream):
+                await queues[index + 1].put(_DONE)
+
+        runners = [asyncio.ensure_future(feed())]
+        runners += [
+            asyncio.ensure_future(run_stage(i)) for i in range(len(self.stages))
+        ]
+        try:
+            while True:
+                record = await queues[-1].get()
+                if record is _DONE:
+                    break
+                yield {
+                    "item": record["item"],
+                    "outputs": record["outputs"],
+                    "error": record["error"],
+                }
+            await asyncio.gather(*runners)
+        finally:
+            for runner in runners:
+                runner.cancel()
+            await executors.shutdown()
+
+    def run(self, items: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Run the pipeline from synchronous code and collect every record."""
+
+        async def collect() -> List[Dict[str, Any]]:
+            return [record async for record in self.arun(items)]
+
+        return get_background_loop().run(collect())
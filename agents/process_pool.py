@@ -0,0 +1,163 @@
+"""Warm process pools for CPU-bound agents.
+
+Each worker builds its state (for example a search corpus) once, in the
+pool initializer, and keeps it for the lifetime of the pool. Tasks then
+carry only small arguments such as a query and a shard range, and return
+compact results such as row indices, so per-call serialization stays small
+no matter how large the state is. On platforms that fork, the initializer
+arguments are inherited rather than pickled.
+"""
+
+import os
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from . import deadline
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+_STATE: Any = None
+
+MODES = ("inline", "process")
+
+
+def _init_worker(factory: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+    """Build the worker's state once."""
+    global _STATE
+    _STATE = factory(*args)
+
+
+def _call_with_state(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+    """Run ``fn(state, *args)`` inside a worker."""
+    return fn(_STATE, *args)
+
+
+def shard_ranges(total: int, shards: int) -> List[Tuple[int, int]]:
+    """Split ``range(total)`` into at most ``shards`` contiguous ``(start, stop)`` ranges."""
+    shards = max(1, min(shards, total))
+    size, extra = divmod(total, shards)
+    ranges = []
+    start = 0
+    for i in range(shards):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+class WarmProcessPool:
+    """A ``ProcessPoolExecutor`` whose workers hold pre-built state.
+
+    ``factory(*args)`` runs once in every worker; tasks submitted with
+    ``map`` receive that state as their first argument. The pool starts
+    lazily and every worker is warmed before the first task returns.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., Any],
+        args: Sequence[Any] = (),
+        workers: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ) -> None:
+        """Create the pool; ``workers`` defaults to the CPU count."""
+        self.factory = factory
+        self.args = tuple(args)
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get(self) -> "ProcessPoolExecutor":
+        if self._executor is None:
+            # Deferred so inline-mode agents never import multiprocessing
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            context = (
+                multiprocessing.get_context(self.start_method)
+                if self.start_method
+                else None
+            )
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.factory, self.args),
+            )
+        return self._executor
+
+    def warm(self) -> None:
+        """Start every worker and build its state now rather than on first use."""
+        list(self.map(_noop, [()] * self.workers))
+
+    def map(
+        self, fn: Callable[..., Any], tasks: Iterable[Tuple[Any, ...]]
+    ) -> List[Any]:
+        """Run ``fn(state, *task)`` for each task across the pool, in order."""
+        return list(self.imap(fn, tasks))
+
+    def imap(
+        self, fn: Callable[..., Any], tasks: Iterable[Tuple[Any, ...]]
+    ) -> Iterator[Any]:
+        """Like ``map`` but yield each result, in order, as soon as it is ready.
+
+        All tasks are submitted up front; tasks not yet started are cancelled
+        if the caller stops iterating. Under a deadline, results are awaited
+        only for the time left and ``DeadlineExceeded`` is raised on expiry.
+        """
+        executor = self._get()
+        futures = [executor.submit(_call_with_state, fn, tuple(task)) for task in tasks]
+        current = deadline.current_deadline()
+        try:
+            for future in futures:
+                if current is None:
+                    yield future.result()
+                    continue
+                from concurrent.futures import TimeoutError as FuturesTimeout
+
+                try:
+                    result = future.result(current.timeout())
+                except FuturesTimeout:
+                    raise deadline.DeadlineExceeded(
+                        "deadline exceeded waiting for worker processes"
+                    ) from None
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self) -> None:
+        """Shut the workers down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _noop(state: Any) -> None:
+    """Task used to warm workers."""
+    return None
+
+
+def execution_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize an agent's ``execution`` config block.
+
+    ``mode`` is ``"inline"`` (default) or ``"process"``; ``workers``,
+    ``min_shard_size`` and ``start_method`` tune the process pool.
+    """
+    execution = dict(config.get("execution") or {})
+    mode = execution.get("mode", "inline")
+    if mode not in MODES:
+        raise ValueError(f"execution.mode must be one of {MODES}, got {mode!r}")
+    execution["mode"] = mode
+    return execution
@@ -0,0 +1,363 @@
+"""On-demand profiling of agent ``run()`` calls.
+
+Three modes can be combined:
+
+- ``cprofile``: deterministic profile, written as ``.prof`` (``pstats``,
+  snakeviz)
+- ``tracemalloc``: allocation snapshot (``.tracemalloc``, loadable with
+  ``tracemalloc.Snapshot.load``) plus a top-allocations ``.tracemalloc.txt``
+  diff against the start of the run
+- ``sample``: a background thread samples the running thread's stack every
+  ``interval`` seconds and writes collapsed stacks (``.collapsed``) for
+  flamegraph.pl or speedscope
+
+Files are named ``<Agent>-<run id>.<ext>`` in ``output_dir``. Profiling can
+be switched on per call (``with profiling.profile(): agent.run()``), per
+agent (``agent.enable_profiling()`` or ``profile:`` in its config), for the
+whole process (``profiling.enable_all()``) or by signal
+(``profiling.install_signal_handler()``, ``kill -USR1 <pid>`` to toggle).
+
+For async agents the profile covers the event loop thread while ``run()``
+is awaited, so concurrently running tasks show up too.
+"""
+
+import contextvars
+import os
+import sys
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Union
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+MODES = ("cprofile", "tracemalloc", "sample")
+
+
+class ProfileSettings:
+    """Which profilers to run and where to write their output."""
+
+    def __init__(
+        self,
+        modes: Union[str, Iterable[str]] = ("cprofile",),
+        output_dir: str = "profiles",
+        interval: float = 0.005,
+        top: int = 25,
+    ) -> None:
+        """``modes`` may be a comma-separated string; ``interval`` is the sampling period."""
+        if isinstance(modes, str):
+            modes = [m.strip() for m in modes.split(",") if m.strip()]
+        self.modes = tuple(modes)
+        unknown = [m for m in self.modes if m not in MODES]
+        if unknown or not self.modes:
+            raise ValueError(
+                f"Profiling modes must be a non-empty subset of {MODES}, got {self.modes}"
+            )
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top = top
+
+    @classmethod
+    def from_config(cls, value: Any) -> Optional["ProfileSettings"]:
+        """Build settings from an agent's ``profile`` config (``True``, a mode string or a dict)."""
+        if not value:
+            return None
+        if value is True:
+            return cls()
+        if isinstance(value, (str, list, tuple)):
+            return cls(value)
+        if isinstance(value, dict):
+            return cls(**value)
+        raise ValueError(f"Invalid profile config: {value!r}")
+
+
+class _StackSampler:
+    """Samples one thread's Python stack on a timer thread."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="smallagents-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.counts.items())
+        )
+
+
+class _TracemallocUsers:
+    """Counts sessions tracing allocations, so overlapping runs share tracemalloc.
+
+    Tracing started by a session is stopped when the last session using it
+    exits; tracing started elsewhere is left running.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.started = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        import tracemalloc
+
+        with self._lock:
+            if self.count == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.started = True
+            self.count += 1
+
+    def release(self) -> None:
+        import tracemalloc
+
+        with self._lock:
+            self.count -= 1
+            if self.count == 0 and self.started:
+                tracemalloc.stop()
+                self.started = False
+
+
+_TRACEMALLOC = _TracemallocUsers()
+
+
+class ProfileSession:
+    """Runs the configured profilers around one ``run()`` call."""
+
+    def __init__(
+        self, settings: ProfileSettings, agent_name: str, run_id: Optional[str] = None
+    ) -> None:
+        self.settings = settings
+        self.agent_name = agent_name
+        if run_id is None:
+            import uuid
+
+            run_id = uuid.uuid4().hex[:12]
+        self.run_id = run_id
+        self.files: Dict[str, str] = {}
+        self._cprofile: Any = None
+        self._tracing = False
+        self._start_snapshot: Any = None
+        self._sampler: Optional[_StackSampler] = None
+
+    @property
+    def base_path(self) -> str:
+        return os.path.join(
+            self.settings.output_dir, f"{self.agent_name}-{self.run_id}"
+        )
+
+    def __enter__(self) -> "ProfileSession":
+        _local.active = True
+        modes = self.settings.modes
+        if "tracemalloc" in modes:
+            import tracemalloc
+
+            _TRACEMALLOC.acquire()
+            self._tracing = True
+            self._start_snapshot = tracemalloc.take_snapshot()
+        if "sample" in modes:
+            self._sampler = _StackSampler(threading.get_ident(), self.settings.interval)
+            self._sampler.start()
+        if "cprofile" in modes:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self._cprofile = profiler
+            except ValueError:  # another profiler is active on this thread
+                self._cprofile = None
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        _local.active = False
+        # A profile that cannot be written must never fail the run it covers
+        try:
+            self._dump()
+        except Exception as e:
+            logger.warning(
+                "Failed to write profile",
+                agent=self.agent_name,
+                run_id=self.run_id,
+                error=f"{type(e).__name__}: {e}",
+            )
+        finally:
+            if self._tracing:
+                _TRACEMALLOC.release()
+        PROFILING.written.extend(self.files.values())
+
+    def _dump(self) -> None:
+        os.makedirs(self.settings.output_dir, exist_ok=True)
+        if self._cprofile is not None:
+            self.files["cprofile"] = self.base_path + ".prof"
+            self._cprofile.dump_stats(self.files["cprofile"])
+        if self._sampler is not None:
+            self.files["sample"] = self.base_path + ".collapsed"
+            with open(self.files["sample"], "w", encoding="utf-8") as f:
+                f.write(self._sampler.collapsed())
+        if self._start_snapshot is not None:
+            self._dump_tracemalloc()
+
+    def _dump_tracemalloc(self) -> None:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        self.files["tracemalloc"] = self.base_path + ".tracemalloc"
+        snapshot.dump(self.files["tracemalloc"])
+        stats = snapshot.compare_to(self._start_snapshot, "lineno")[: self.settings.top]
+        with open(self.files["tracemalloc"] + ".txt", "w", encoding="utf-8") as f:
+            f.write(
+                f"Top {len(stats)} allocation changes during {self.agent_name} run {self.run_id}\n"
+            )
+            for stat in stats:
+                f.write(f"{stat}\n")
+
+
+# Set while a session runs on this thread; nested runs are covered by it
+_local = threading.local()
+
+_call_settings: "contextvars.ContextVar[Optional[ProfileSettings]]" = (
+    contextvars.ContextVar("smallagents_profile", default=None)
+)
+
+
+class _ProfilingState:
+    """Process-wide switches checked by the ``run()`` wrappers.
+
+    ``active`` is a plain attribute so the wrappers' fast path stays a
+    single lookup while nothing is being profiled.
+    """
+
+    def __init__(self) -> None:
+        self.active = False
+        self.global_settings: Optional[ProfileSettings] = None
+        self.written: Deque[str] = deque(maxlen=1000)
+        self._agents = 0
+        self._scopes = 0
+        self._lock = threading.Lock()
+
+    def _update(self) -> None:
+        self.active = bool(self._agents or self._scopes or self.global_settings)
+
+    def adjust(self, agents: int = 0, scopes: int = 0) -> None:
+        with self._lock:
+            self._agents += agents
+            self._scopes += scopes
+            self._update()
+
+    def set_global(self, settings: Optional[ProfileSettings]) -> None:
+        with self._lock:
+            self.global_settings = settings
+            self._update()
+
+    def session_for(
+        self, agent: Any, kwargs: Dict[str, Any]
+    ) -> Optional[ProfileSession]:
+        """Return a session if ``agent``'s next run should be profiled."""
+        if getattr(_local, "active", False):
+            return None
+        settings = (
+            _call_settings.get()
+            or getattr(agent, "profile_settings", None)
+            or self.global_settings
+        )
+        if settings is None:
+            return None
+        run_id = kwargs.get("run_id")
+        return ProfileSession(
+            settings, type(agent).__name__, str(run_id) if run_id else None
+        )
+
+
+PROFILING = _ProfilingState()
+
+
+class profile:  # noqa: N801 - used like a function
+    """Profile every ``run()`` started in this context (thread or task)::
+
+    with profiling.profile("cprofile,sample", output_dir="/tmp/prof"):
+        agent.run(query="agents")
+    """
+
+    def __init__(
+        self,
+        modes: Union[str, Iterable[str]] = ("cprofile",),
+        output_dir: str = "profiles",
+        interval: float = 0.005,
+    ) -> None:
+        self.settings = ProfileSettings(modes, output_dir, interval)
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> ProfileSettings:
+        self._token = _call_settings.set(self.settings)
+        PROFILING.adjust(scopes=1)
+        return self.settings
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._token is not None:
+            _call_settings.reset(self._token)
+        PROFILING.adjust(scopes=-1)
+
+
+def enable_all(settings: Optional[ProfileSettings] = None) -> ProfileSettings:
+    """Profile every agent run in the process until ``disable_all()``."""
+    settings = settings or ProfileSettings()
+    PROFILING.set_global(settings)
+    return settings
+
+
+def disable_all() -> None:
+    """Stop process-wide profiling."""
+    PROFILING.set_global(None)
+
+
+def install_signal_handler(
+    signum: Optional[int] = None, settings: Optional[ProfileSettings] = None
+) -> None:
+    """Toggle process-wide profiling whenever ``signum`` (default SIGUSR1) arrives."""
+    import signal
+
+    if signum is None:
+        signum = signal.SIGUSR1
+    chosen = settings or ProfileSettings()
+
+    def toggle(received: int, frame: Any) -> None:
+        if PROFILING.global_settings is None:
+            enable_all(chosen)
+            print(f"Profiling enabled; writing to {chosen.output_dir}", file=sys.stderr)
+        else:
+            disable_all()
+            print("Profiling disabled", file=sys.stderr)
+
+    signal.signal(signum, toggle)
+
+
+def written_files() -> List[str]:
+    """Return profile files written so far (most recent last)."""
+    return list(PROFILING.written)
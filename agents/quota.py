@@ -0,0 +1,213 @@
+"""Per-provider rate limiting and quota accounting."""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from agents import deadline
+from agents.job_queue import RetryLater
+
+
+class QuotaError(Exception):
+    """Base class for provider quota errors."""
+
+
+class RateLimitedError(QuotaError, RetryLater):
+    """The provider kept answering 429; the work should be retried later."""
+
+    def __init__(self, provider: str, retry_after: float) -> None:
+        """Record which provider throttled us and for how long."""
+        RetryLater.__init__(
+            self,
+            retry_after,
+            f"{provider} rate limit hit, retry after {retry_after:.1f}s",
+        )
+        self.provider = provider
+
+
+class QuotaExceededError(QuotaError):
+    """A configured spend budget for the provider has been used up."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations.
+
+    ``reserve`` always takes the tokens, letting the bucket go into debt, and
+    returns how long the caller must wait. Callers therefore queue up in
+    arrival order at the configured rate instead of failing.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """Refill at ``rate`` tokens per second up to ``capacity`` tokens."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens earned since the last update; caller holds the lock."""
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            debt_wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(debt_wait, self._paused_until - now, 0.0)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the time spent waiting.
+
+        The wait respects the current deadline. If it cannot fit, or the
+        deadline is cancelled meanwhile, the tokens are handed back and
+        ``deadline.Cancelled`` is raised.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            try:
+                deadline.sleep(wait)
+            except deadline.Cancelled:
+                with self._lock:
+                    self._tokens += tokens
+                raise
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all callers for ``seconds``, e.g. after a 429."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class ProviderQuota:
+    """Rate limits and usage counters for one external provider.
+
+    ``requests_per_second``/``burst`` limit request starts and
+    ``tokens_per_minute`` limits LLM tokens (debited after each response).
+    The ``max_*`` options are hard spend budgets that raise
+    ``QuotaExceededError`` once used up. Unset options are unlimited.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_requests: Optional[int] = None,
+        max_llm_tokens: Optional[int] = None,
+        max_render_seconds: Optional[float] = None,
+    ) -> None:
+        """Create the buckets and zeroed counters for provider ``name``."""
+        self.name = name
+        self.request_bucket = (
+            TokenBucket(requests_per_second, burst) if requests_per_second else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+            if tokens_per_minute
+            else None
+        )
+        self.limits = {
+            "requests": max_requests,
+            "llm_tokens": max_llm_tokens,
+            "render_seconds": max_render_seconds,
+        }
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {
+            "requests": 0,
+            "llm_tokens": 0,
+            "render_seconds": 0.0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _add(self, counter: str, amount: float) -> None:
+        """Increment a usage counter."""
+        with self._lock:
+            self.counters[counter] += amount
+
+    def check_budget(self) -> None:
+        """Raise ``QuotaExceededError`` if any spend budget is used up."""
+        for counter, limit in self.limits.items():
+            if limit is not None and self.counters[counter] >= limit:
+                raise QuotaExceededError(
+                    f"{self.name} {counter} budget of {limit} exhausted"
+                )
+
+    def acquire(self) -> None:
+        """Wait for permission to start one request, then count it."""
+        self.check_budget()
+        waited = 0.0
+        if self.request_bucket is not None:
+            waited += self.request_bucket.acquire()
+        if self.token_bucket is not None:
+            # Zero-token reservation: just wait out any LLM-token debt
+            waited += self.token_bucket.acquire(0)
+        self._add("requests", 1)
+        if waited:
+            self._add("wait_seconds", waited)
+
+    def record_llm_tokens(self, tokens: int) -> None:
+        """Count LLM tokens used by a response and debit the token bucket."""
+        self._add("llm_tokens", tokens)
+        if self.token_bucket is not None:
+            self.token_bucket.reserve(tokens)
+
+    def record_render_seconds(self, seconds: float) -> None:
+        """Count seconds of render time consumed."""
+        self._add("render_seconds", seconds)
+
+    def throttle(self, retry_after: float) -> None:
+        """Record a 429 and pause the provider's request bucket."""
+        self._add("throttled", 1)
+        if self.request_bucket is not None:
+            self.request_bucket.pause(retry_after)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return current usage counters and configured budgets."""
+        with self._lock:
+            return {"usage": dict(self.counters), "limits": dict(self.limits)}
+
+
+class QuotaManager:
+    """Registry of ``ProviderQuota`` objects built from a config mapping.
+
+    ``config`` maps provider name to ``ProviderQuota`` keyword arguments;
+    providers without an entry get an unlimited quota that only counts usage.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Store the per-provider settings; quotas are created on first use."""
+        self.config = config or {}
+        self._providers: Dict[str, ProviderQuota] = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name: str) -> ProviderQuota:
+        """Return the quota for provider ``name``, creating it if needed."""
+        with self._lock:
+            if name not in self._providers:
+                self._providers[name] = ProviderQuota(name, **self.config.get(name, {}))
+            return self._providers[name]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return usage for every provider seen so far."""
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: quota.snapshot() for name, quota in providers.items()}
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Parse a ``Retry-After`` header given in seconds, falling back to ``default``."""
+    try:
+        return max(0.0, float(value)) if value is not None else default
+    except ValueError:
+        return default
@@ -0,0 +1,262 @@
+"""Registry of agents that are imported only when selected.
+
+Each entry records where an agent class lives (``"module:Class"``) and which
+``config.yaml`` section configures it, so listing agents or parsing CLI
+arguments never imports an agent module or its dependencies.
+
+Third-party packages add agents through the ``smallagents.agents`` entry
+point group::
+
+    [project.entry-points."smallagents.agents"]
+    my-agent = "my_package.agents:MyAgent"
+
+Discovered entry points are cached on disk (``SMALLAGENTS_CACHE_DIR``,
+default ``~/.cache/smallagents``) keyed by the modification times of the
+``sys.path`` directories, so ``importlib.metadata`` is only scanned again
+after packages are installed or removed.
+"""
+
+import importlib
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+ENTRY_POINT_GROUP = "smallagents.agents"
+
+
+class AgentSpec:
+    """Where to find an agent class and how to configure it."""
+
+    __slots__ = (
+        "name",
+        "target",
+        "config_section",
+        "description",
+        "input_field",
+        "distribution",
+        "_cls",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        config_section: Optional[str] = None,
+        description: str = "",
+        input_field: str = "query",
+        distribution: Optional[str] = None,
+    ) -> None:
+        """``target`` is ``"package.module:ClassName"``.
+
+        ``input_field`` names the ``run()`` argument that a plain CLI query
+        fills in; ``distribution`` is the package that provided a plugin.
+        """
+        if ":" not in target:
+            raise ValueError(
+                f"Agent target must look like 'module:Class', got {target!r}"
+            )
+        self.name = name
+        self.target = target
+        self.config_section = config_section or name.replace("-", "_")
+        self.description = description
+        self.input_field = input_field
+        self.distribution = distribution
+        self._cls: Optional[type] = None
+
+    def metadata(self) -> Dict[str, Any]:
+        """Return the spec as a dict without importing the agent."""
+        return {
+            "name": self.name,
+            "target": self.target,
+            "config_section": self.config_section,
+            "description": self.description,
+            "input_field": self.input_field,
+            "distribution": self.distribution,
+        }
+
+    def load(self) -> type:
+        """Import and return the agent class (cached after the first call)."""
+        if self._cls is None:
+            module, _, attr = self.target.partition(":")
+            self._cls = getattr(importlib.import_module(module), attr)
+        return self._cls
+
+
+_REGISTRY: Dict[str, AgentSpec] = {}
+_discovered = False
+
+
+def register(
+    name: str,
+    target: str,
+    config_section: Optional[str] = None,
+    description: str = "",
+    input_field: str = "query",
+    distribution: Optional[str] = None,
+) -> AgentSpec:
+    """Register (or replace) an agent under ``name``."""
+    spec = AgentSpec(
+        name, target, config_section, description, input_field, distribution
+    )
+    _REGISTRY[name] = spec
+    return spec
+
+
+def _cache_file() -> str:
+    cache_dir = os.environ.get("SMALLAGENTS_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "smallagents"
+    )
+    return os.path.join(cache_dir, "entry_points.json")
+
+
+def _fingerprint() -> List[List[Any]]:
+    """Identify the current set of installed packages cheaply."""
+    fingerprint = []
+    for path in sys.path:
+        try:
+            fingerprint.append([path, os.stat(path or ".").st_mtime_ns])
+        except OSError:
+            continue
+    return fingerprint
+
+
+def _scan_entry_points() -> List[Dict[str, Any]]:
+    """Read the entry point group from installed distribution metadata."""
+    from importlib import metadata
+
+    # An EntryPoints object, or a dict of groups before Python 3.10
+    entry_points: Any = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        selected = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:
+        selected = entry_points.get(ENTRY_POINT_GROUP, [])
+    found = []
+    for ep in selected:
+        dist = getattr(ep, "dist", None)
+        found.append(
+            {
+                "name": ep.name,
+                "target": ep.value,
+                "distribution": getattr(dist, "name", None),
+            }
+        )
+    return found
+
+
+def _load_entry_points(refresh: bool = False) -> List[Dict[str, Any]]:
+    """Return entry points from the disk cache, rescanning when it is stale."""
+    path = _cache_file()
+    fingerprint = _fingerprint()
+    if not refresh:
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") == fingerprint:
+                return list(cached["entry_points"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    found = _scan_entry_points()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "entry_points": found}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return found
+
+
+def discover(refresh: bool = False) -> List[str]:
+    """Register agents from entry points; returns the newly added names.
+
+    Names already registered (including the built-in agents) are kept.
+    Nothing is imported until an agent is selected.
+    """
+    global _discovered
+    added = []
+    for ep in _load_entry_points(refresh):
+        if ep["name"] in _REGISTRY:
+            continue
+        try:
+            register(ep["name"], ep["target"], distribution=ep.get("distribution"))
+        except ValueError:
+            continue
+        added.append(ep["name"])
+    _discovered = True
+    return added
+
+
+def _ensure_discovered() -> None:
+    if not _discovered:
+        discover()
+
+
+def available() -> List[str]:
+    """Return registered and discovered agent names, sorted."""
+    _ensure_discovered()
+    return sorted(_REGISTRY)
+
+
+def describe() -> List[Dict[str, Any]]:
+    """Return metadata for every agent without importing any of them."""
+    _ensure_discovered()
+    return [_REGISTRY[name].metadata() for name in sorted(_REGISTRY)]
+
+
+def get_spec(name: str) -> AgentSpec:
+    """Return the spec for ``name``; raises ``ValueError`` if unknown."""
+    if name not in _REGISTRY:
+        _ensure_discovered()
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown agent: {name}") from None
+
+
+def load(name: str) -> type:
+    """Import and return the agent class registered as ``name``."""
+    return get_spec(name).load()
+
+
+def create(name: str, config: Optional[Dict[str, Any]] = None) -> Any:
+    """Instantiate ``name`` with its section of a full ``config.yaml`` mapping."""
+    spec = get_spec(name)
+    section = (config or {}).get("agents", {}).get(spec.config_section, {})
+    return spec.load()(section)
+
+
+register(
+    "search",
+    "agents.search_agent:SearchAgent",
+    "search",
+    "Keyword search over a local corpus",
+)
+register(
+    "async-search",
+    "agents.async_search_agent:AsyncSearchAgent",
+    "async_search",
+    "Concurrent keyword search",
+)
+register(
+    "api",
+    "agents.api_agent:APIAgent",
+    "api",
+    "HTTP requests with retries",
+    input_field="endpoint",
+)
+register(
+    "social-video",
+    "agents.social_media_video_agent:SocialMediaVideoAgent",
+    "social_video",
+    "AI video generation and social publishing",
+    input_field="topic",
+)
+register(
+    "sharded-search",
+    "agents.sharded_search:ShardedSearchAgent",
+    "sharded_search",
+    "Scatter-gather search over SearchAgent shard servers",
+)
@@ -0,0 +1,91 @@
+"""Process-wide registry of shared, reference-counted agent resources.
+
+Agents that need an expensive resource (an HTTP session and its connection
+pool, for example) acquire it by key. The first caller builds it, later
+callers with the same key reuse it, and it is closed when the last holder
+releases it.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _Entry:
+    __slots__ = ("resource", "refs", "closer")
+
+    def __init__(self, resource: Any, closer: Optional[Callable[[Any], None]]) -> None:
+        self.resource = resource
+        self.refs = 0
+        self.closer = closer
+
+
+class ResourceRegistry:
+    """Thread-safe map of keys to shared resources with reference counts."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+
+    def acquire(
+        self,
+        key: Hashable,
+        factory: Callable[[], Any],
+        closer: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Return the resource for ``key``, building it with ``factory`` if needed.
+
+        ``closer(resource)`` runs when the last reference is released; by
+        default the resource's ``close()`` method is called.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(factory(), closer)
+            entry.refs += 1
+            return entry.resource
+
+    def release(self, key: Hashable) -> None:
+        """Drop one reference to ``key``, closing the resource on the last one."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[key]
+        _close(entry)
+
+    def refcount(self, key: Hashable) -> int:
+        """Return how many holders ``key`` currently has."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refs if entry is not None else 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def close_all(self) -> None:
+        """Close every resource regardless of outstanding references."""
+        with self._lock:
+            entries: List[_Entry] = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            _close(entry)
+
+
+def _close(entry: _Entry) -> None:
+    if entry.closer is not None:
+        entry.closer(entry.resource)
+    elif hasattr(entry.resource, "close"):
+        entry.resource.close()
+
+
+# Registry shared by every agent in the process
+registry = ResourceRegistry()
@@ -2,11 +2,73 @@
 
 This is a simple, synchronous example. Replace the `_search` stub with real logic
 (e.g. web requests, API calls, or integration with a search/indexing library).
+
+Besides the default keyword matching, ``retrieval.mode: dense`` or ``hybrid``
+ranks the corpus by embedding similarity (see ``agents.vector_search``;
+requires NumPy).
 """
 
-from typing import Any, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
 
 from .base_agent import BaseAgent
+from .process_pool import WarmProcessPool, execution_config, shard_ranges
+
+if TYPE_CHECKING:
+    from .vector_search import DenseRetriever
+
+RETRIEVAL_MODES = ("keyword", "dense", "hybrid")
+
+
+def _tokenize(query: str) -> List[str]:
+    """Split a query into lower-cased tokens."""
+    return [t.lower() for t in query.split() if t.strip()]
+
+
+def _lower_corpus(corpus: Sequence[str]) -> List[str]:
+    """Build a worker's state: the lower-cased corpus."""
+    return [s.lower() for s in corpus]
+
+
+def _match_range(
+    lowered: List[str], tokens: List[str], start: int, stop: int
+) -> List[int]:
+    """Return indices in ``[start, stop)`` whose text contains every token."""
+    return [i for i in range(start, stop) if all(tok in lowered[i] for tok in tokens)]
+
+
+def _match_batch(lowered: List[str], token_lists: List[List[str]]) -> List[List[int]]:
+    """Return matching indices over the whole corpus for several queries."""
+    return [
+        _match_range(lowered, tokens, 0, len(lowered)) if tokens else []
+        for tokens in token_lists
+    ]
+
+
+def retrieval_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a SearchAgent's ``retrieval`` config block.
+
+    ``mode`` is ``"keyword"`` (default), ``"dense"`` or ``"hybrid"``;
+    ``top_k`` defaults to ``max_results`` (else 10). The remaining keys are
+    passed to ``vector_search.DenseRetriever``.
+    """
+    retrieval = dict(config.get("retrieval") or {})
+    mode = retrieval.get("mode", "keyword")
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(
+            f"retrieval.mode must be one of {RETRIEVAL_MODES}, got {mode!r}"
+        )
+    retrieval["mode"] = mode
+    retrieval.setdefault("top_k", config.get("max_results", 10))
+    return retrieval
 
 
 class SearchAgent(BaseAgent):
@@ -22,19 +84,182 @@ class SearchAgent(BaseAgent):
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the SearchAgent."""
         super().__init__(config)
+        self.corpus: List[str] = list(self.config.get("corpus", self.CORPUS))
+        shard = self.config.get("shard")
+        if shard:
+            # Serve one contiguous partition, as a shard of a ShardedSearchAgent
+            index, count = int(shard["index"]), int(shard["count"])
+            if not 0 <= index < count:
+                raise ValueError("shard.index must be in [0, shard.count)")
+            ranges = shard_ranges(len(self.corpus), count)
+            start, stop = ranges[index] if index < len(ranges) else (0, 0)
+            self.corpus = self.corpus[start:stop]
+        self.execution = execution_config(self.config)
+        self.retrieval = retrieval_config(self.config)
+        self._pool: Optional[WarmProcessPool] = None
+        self._retriever: Optional[DenseRetriever] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop the process pool and vector index so the agent can be pickled."""
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_retriever"] = None
+        return state
+
+    def _dense(self) -> bool:
+        """Return True if queries are ranked by embedding similarity."""
+        return bool(self.retrieval["mode"] != "keyword")
+
+    def _get_retriever(self) -> "DenseRetriever":
+        """Return the vector index, embedding the corpus on first use."""
+        if self._retriever is None:
+            # Deferred so keyword-mode agents never import NumPy
+            from .vector_search import DenseRetriever
+
+            self._retriever = DenseRetriever(self.corpus, self.retrieval)
+        return self._retriever
+
+    def _ranked(self, query: str, hits: List[Any]) -> Dict[str, Any]:
+        """Build a dense/hybrid result from ``(index, score)`` pairs."""
+        return {
+            "query": query,
+            "result_count": len(hits),
+            "results": [self.corpus[i] for i, _ in hits],
+            "scores": [score for _, score in hits],
+        }
+
+    def _use_pool(self) -> bool:
+        """Return True if searches should be sharded across worker processes."""
+        return bool(
+            self.execution["mode"] == "process"
+            and len(self.corpus) >= self.execution.get("min_shard_size", 10_000)
+        )
+
+    def _get_pool(self) -> WarmProcessPool:
+        """Return the warm pool, starting it with the current corpus on first use."""
+        if self._pool is None:
+            self._pool = WarmProcessPool(
+                _lower_corpus,
+                (self.corpus,),
+                workers=self.execution.get("workers"),
+                start_method=self.execution.get("start_method"),
+            )
+        return self._pool
 
     def _search(self, query: str) -> List[str]:
         """Perform naive search over corpus."""
         # Very naive search: return corpus lines that contain all query tokens
-        tokens = [t.lower() for t in query.split() if t.strip()]
+        tokens = _tokenize(query)
         if not tokens:
             return []
-        results = [s for s in self.CORPUS if all(tok in s.lower() for tok in tokens)]
+        if self._use_pool():
+            pool = self._get_pool()
+            tasks = [
+                (tokens, start, stop)
+                for start, stop in shard_ranges(len(self.corpus), pool.workers)
+            ]
+            return [
+                self.corpus[i] for shard in pool.map(_match_range, tasks) for i in shard
+            ]
+        results = [s for s in self.corpus if all(tok in s.lower() for tok in tokens)]
+        return results
+
+    def warmup(self) -> None:
+        """Build the vector index, or start the worker processes and load the corpus into them."""
+        if self._dense():
+            self._get_retriever()
+        elif self._use_pool():
+            self._get_pool().warm()
+
+    def close(self) -> None:
+        """Stop the worker processes and drop the vector index; both are rebuilt on next use."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        self._retriever = None
+        super().close()
+
+    def run_many(self, queries: Iterable[str]) -> List[Dict[str, Any]]:
+        """Run several queries, spreading them across workers in process mode."""
+        queries = list(queries)
+        for query in queries:
+            if not isinstance(query, str):
+                raise TypeError("query must be a string")
+        if self._dense():
+            # One matrix product scores every query against the corpus
+            with self.step("search_batch"):
+                ranked = self._get_retriever().search(queries)
+            return [self._ranked(query, hits) for query, hits in zip(queries, ranked)]
+        if not self._use_pool():
+            return [self.run(query=query) for query in queries]
+
+        with self.step("search_batch"):
+            pool = self._get_pool()
+            token_lists = [_tokenize(query) for query in queries]
+            tasks = [
+                (token_lists[start:stop],)
+                for start, stop in shard_ranges(len(queries), pool.workers * 4)
+            ]
+            matches = [
+                indices for batch in pool.map(_match_batch, tasks) for indices in batch
+            ]
+        results = []
+        for query, indices in zip(queries, matches):
+            hits = [self.corpus[i] for i in indices]
+            results.append({"query": query, "result_count": len(hits), "results": hits})
         return results
 
     def run(self, query: str = "") -> Dict[str, Any]:
         """Run the search agent with the given query."""
         if not isinstance(query, str):
             raise TypeError("query must be a string")
-        results = self._search(query)
+        if self._dense():
+            with self.step("search"):
+                hits = self._get_retriever().search([query])[0]
+            return self._ranked(query, hits)
+        with self.step("search"):
+            results = self._search(query)
         return {"query": query, "result_count": len(results), "results": results}
+
+    def run_stream(self, query: str = "") -> Generator[Dict[str, Any], None, None]:
+        """Yield ``{"event": "hit", "index": ..., "text": ...}`` per match, then ``done``.
+
+        Hits come in corpus order without building the full result list. In
+        process mode the corpus is split into more shards than workers, and
+        each shard's hits are yielded as soon as it (and those before it)
+        finish. The ``done`` event carries the query and ``result_count``.
+        In dense/hybrid mode hits come best first and carry a ``score``.
+        """
+        if not isinstance(query, str):
+            raise TypeError("query must be a string")
+        tokens = _tokenize(query)
+        count = 0
+        if self._dense():
+            for i, score in self._get_retriever().search([query])[0]:
+                count += 1
+                yield {
+                    "event": "hit",
+                    "index": i,
+                    "text": self.corpus[i],
+                    "score": score,
+                }
+        elif tokens:
+            if self._use_pool():
+                pool = self._get_pool()
+                tasks = [
+                    (tokens, start, stop)
+                    for start, stop in shard_ranges(len(self.corpus), pool.workers * 4)
+                ]
+                indices: Iterable[int] = (
+                    i for shard in pool.imap(_match_range, tasks) for i in shard
+                )
+            else:
+                indices = (
+                    i
+                    for i, s in enumerate(self.corpus)
+                    if all(tok in s.lower() for tok in tokens)
+                )
+            for i in indices:
+                count += 1
+                yield {"event": "hit", "index": i, "text": self.corpus[i]}
+        yield {"event": "done", "result": {"query": query, "result_count": count}}
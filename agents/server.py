@@ -0,0 +1,399 @@
+"""Long-running HTTP server exposing warm agent instances.
+
+Routes:
+
+- ``POST /agents/{name}/run`` — JSON body of keyword arguments for ``run()``
+- ``POST /agents/{name}/batch`` — ``{"requests": [kwargs, ...]}``
+- ``POST /agents/{name}/stream`` — like ``run``, answered with one JSON line
+  per ``run_stream()`` event as it happens
+- ``GET /agents`` — agent metadata, with credential-like config values
+  (``*_key``, tokens, secrets, passwords) redacted
+- ``GET /health`` and ``GET /metrics`` (Prometheus text)
+
+Agents are created and warmed once at startup. Each agent has a concurrency
+limit with a bounded wait queue; requests beyond it get ``503`` with
+``Retry-After``. Concurrent ``{"query": ...}`` requests to an agent with
+``run_many()`` (``SearchAgent``) are coalesced into one batched call.
+A ``"deadline"`` in the body (seconds) is passed to ``run()`` or
+``run_stream()``; requests abandoned because of it get ``504``.
+"""
+
+import asyncio
+import inspect
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from . import registry
+from .bridge import get_executor
+from .deadline import Cancelled
+from .instrumentation import Metrics, render_prometheus
+from .tracing import extract, start_span
+
+
+def build_agents(names: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Instantiate the named registry agents with their ``config.yaml`` sections."""
+    return {name: registry.create(name, config) for name in names}
+
+
+async def _call(agent: Any, method: str, *args: Any, **kwargs: Any) -> Any:
+    """Await an async agent method or offload a sync one to the shared executor."""
+    fn = getattr(agent, method)
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    if method == "run":
+        return await agent.arun(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), lambda: fn(*args, **kwargs))
+
+
+def _stream(agent: Any, kwargs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Return the agent's ``run_stream()`` events as an async iterator."""
+    if inspect.isasyncgenfunction(agent.run_stream):
+        events: AsyncIterator[Dict[str, Any]] = agent.run_stream(**kwargs)
+    else:
+        events = agent.arun_stream(**kwargs)
+    return events
+
+
+# Config keys whose values are never served back
+_SECRET_KEY = re.compile(
+    r"(^|_)(key|token|secret|password|credentials?)$", re.IGNORECASE
+)
+
+
+def _redact(value: Any) -> Any:
+    """Return ``value`` with credential-like dict entries masked, at any depth."""
+    if isinstance(value, dict):
+        return {
+            k: "***"
+            if isinstance(k, str) and _SECRET_KEY.search(k) and v
+            else _redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _line(event: Any) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode()
+
+
+class Overloaded(Exception):
+    """Raised when an agent's wait queue is full."""
+
+
+class _Limiter:
+    """Semaphore with a bounded number of waiters."""
+
+    def __init__(self, concurrency: int, max_pending: int) -> None:
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def __aenter__(self) -> None:
+        if self.semaphore.locked() and self.pending >= self.max_pending:
+            raise Overloaded()
+        self.pending += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.pending -= 1
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.semaphore.release()
+
+
+class _Batcher:
+    """Coalesce concurrent single queries into ``agent.run_many`` calls."""
+
+    def __init__(
+        self, agent: Any, max_batch: int, window: float, metrics: Metrics
+    ) -> None:
+        self.agent = agent
+        self.max_batch = max_batch
+        self.window = window
+        self.metrics = metrics
+        self.pending: List[Tuple[str, asyncio.Future[Any]]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, query: str) -> Any:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self.pending.append((query, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[Any]"]]) -> None:
+        self.metrics.incr("batches")
+        self.metrics.incr("batched_requests", len(batch))
+        try:
+            results = await _call(self.agent, "run_many", [query for query, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _json(
+    data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None
+) -> web.Response:
+    return web.json_response(
+        data,
+        status=status,
+        headers=headers,
+        dumps=lambda obj: json.dumps(obj, default=str),
+    )
+
+
+class AgentServer:
+    """aiohttp application serving a fixed set of warm agents."""
+
+    def __init__(
+        self,
+        agents: Dict[str, Any],
+        max_concurrency: int = 64,
+        max_pending: int = 1024,
+        max_batch: int = 32,
+        batch_window: float = 0.002,
+    ) -> None:
+        """Serve ``agents`` by name; ``max_batch <= 1`` disables batching."""
+        self.agents = agents
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.metrics = Metrics("AgentServer")
+        self._limiters: Dict[str, _Limiter] = {}
+        self._batchers: Dict[str, _Batcher] = {}
+
+    def _limiter(self, name: str) -> _Limiter:
+        if name not in self._limiters:
+            agent_config = getattr(self.agents[name], "config", {})
+            concurrency = agent_config.get("max_concurrency", self.max_concurrency)
+            self._limiters[name] = _Limiter(concurrency, self.max_pending)
+        return self._limiters[name]
+
+    def _batcher(self, name: str) -> Optional[_Batcher]:
+        agent = self.agents[name]
+        if self.max_batch <= 1 or not hasattr(agent, "run_many"):
+            return None
+        if name not in self._batchers:
+            self._batchers[name] = _Batcher(
+                agent, self.max_batch, self.batch_window, self.metrics
+            )
+        return self._batchers[name]
+
+    async def run_agent(self, name: str, kwargs: Dict[str, Any]) -> Any:
+        """Run one request through the agent's limiter, batching single queries."""
+        async with self._limiter(name):
+            batcher = self._batcher(name)
+            if (
+                batcher is not None
+                and set(kwargs) == {"query"}
+                and isinstance(kwargs["query"], str)
+            ):
+                return await batcher.submit(kwargs["query"])
+            return await _call(self.agents[name], "run", **kwargs)
+
+    def _agent_name(self, request: web.Request) -> str:
+        name = request.match_info["name"]
+        if name not in self.agents:
+            raise web.HTTPNotFound(
+                text=json.dumps({"success": False, "error": f"Unknown agent: {name}"}),
+                content_type="application/json",
+            )
+        return name
+
+    async def _body(self, request: web.Request) -> Any:
+        if not request.can_read_body:
+            return {}
+        try:
+            return await request.json()
+        except json.JSONDecodeError as e:
+            raise web.HTTPBadRequest(
+                text=json.dumps({"success": False, "error": f"Invalid JSON: {e}"}),
+                content_type="application/json",
+            ) from e
+
+    async def _guarded(self, name: str, kwargs: Any) -> Tuple[int, Any]:
+        """Run a request and map failures to HTTP status codes."""
+        if not isinstance(kwargs, dict):
+            return 400, {
+                "success": False,
+                "error": "Request body must be a JSON object",
+            }
+        try:
+            return 200, await self.run_agent(name, kwargs)
+        except Exception as e:
+            return self._failure(name, e)
+
+    def _failure(self, name: str, e: Exception) -> Tuple[int, Any]:
+        """Map an exception from an agent call to a status code and body."""
+        if isinstance(e, Overloaded):
+            self.metrics.incr("rejected")
+            return 503, {"success": False, "error": f"Agent {name} is overloaded"}
+        if isinstance(e, Cancelled):
+            self.metrics.incr("deadline_exceeded")
+            return 504, {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__,
+            }
+        if isinstance(e, (TypeError, ValueError)):
+            return 400, {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__,
+            }
+        self.metrics.incr("errors")
+        return 500, {"success": False, "error": str(e), "error_type": type(e).__name__}
+
+    async def handle_run(self, request: web.Request) -> web.Response:
+        """POST /agents/{name}/run"""
+        name = self._agent_name(request)
+        with start_span(
+            f"POST /agents/{name}/run",
+            {"agent": name},
+            kind="server",
+            parent=extract(request.headers),
+        ) as span, self.metrics.timer("run"):
+            status, data = await self._guarded(name, await self._body(request))
+            if span is not None:
+                span.set_attribute("http.status_code", status)
+        headers = {"Retry-After": "1"} if status == 503 else None
+        return _json(data, status=status, headers=headers)
+
+    async def handle_batch(self, request: web.Request) -> web.Response:
+        """POST /agents/{name}/batch"""
+        name = self._agent_name(request)
+        body = await self._body(request)
+        items = body.get("requests") if isinstance(body, dict) else None
+        if not isinstance(items, list):
+            return _json(
+                {"success": False, "error": 'Body must be {"requests": [...]}'},
+                status=400,
+            )
+        with self.metrics.timer("batch"):
+            outcomes = await asyncio.gather(
+                *(self._guarded(name, kwargs) for kwargs in items)
+            )
+        return _json(
+            {
+                "results": [
+                    {"status": status, "result": data} for status, data in outcomes
+                ]
+            }
+        )
+
+    async def handle_stream(self, request: web.Request) -> web.StreamResponse:
+        """POST /agents/{name}/stream
+
+        Errors before the first event get a status code like ``run``; later
+        ones end the stream with an ``{"event": "error", ...}`` line.
+        """
+        name = self._agent_name(request)
+        kwargs = await self._body(request)
+        if not isinstance(kwargs, dict):
+            return _json(
+                {"success": False, "error": "Request body must be a JSON object"},
+                status=400,
+            )
+        events: Optional[AsyncIterator[Dict[str, Any]]] = None
+        response: Optional[web.StreamResponse] = None
+        try:
+            async with self._limiter(name):
+                with self.metrics.timer("stream"):
+                    events = _stream(self.agents[name], kwargs)
+                    first = await events.__anext__()
+                    response = web.StreamResponse(
+                        headers={"Content-Type": "application/x-ndjson"}
+                    )
+                    await response.prepare(request)
+                    await response.write(_line(first))
+                    try:
+                        async for event in events:
+                            await response.write(_line(event))
+                    except Exception as e:
+                        self.metrics.incr("errors")
+                        error = {
+                            "event": "error",
+                            "error": str(e),
+                            "error_type": type(e).__name__,
+                        }
+                        await response.write(_line(error))
+                    await response.write_eof()
+                    return response
+        except Exception as e:
+            if response is not None:
+                raise  # the client went away mid-stream
+            status, data = self._failure(name, e)
+            headers = {"Retry-After": "1"} if status == 503 else None
+            return _json(data, status=status, headers=headers)
+        finally:
+            if events is not None and hasattr(events, "aclose"):
+                await events.aclose()
+
+    async def handle_agents(self, request: web.Request) -> web.Response:
+        """GET /agents"""
+        return _json(
+            {name: _redact(agent.info()) for name, agent in self.agents.items()}
+        )
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """GET /health"""
+        return _json({"status": "ok", "agents": sorted(self.agents)})
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """GET /metrics"""
+        registries = [self.metrics] + [
+            agent.metrics
+            for agent in self.agents.values()
+            if getattr(agent, "metrics", None) is not None
+        ]
+        return web.Response(
+            text=render_prometheus(registries), content_type="text/plain"
+        )
+
+    async def _start_agents(self, app: web.Application) -> None:
+        for agent in self.agents.values():
+            await _call(agent, "start")
+
+    async def _close_agents(self, app: web.Application) -> None:
+        for agent in self.agents.values():
+            await _call(agent, "close")
+
+    def build_app(self) -> web.Application:
+        """Create the aiohttp application."""
+        app = web.Application()
+        app.router.add_post("/agents/{name}/run", self.handle_run)
+        app.router.add_post("/agents/{name}/batch", self.handle_batch)
+        app.router.add_post("/agents/{name}/stream", self.handle_stream)
+        app.router.add_get("/agents", self.handle_agents)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self._start_agents)
+        app.on_cleanup.append(self._close_agents)
+        return app
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """Run the server until interrupted."""
+        web.run_app(self.build_app(), host=host, port=port, access_log=None)
@@ -0,0 +1,382 @@
+"""Sharded search: scatter each query to shard servers and merge the results.
+
+A shard is an ``AgentServer`` serving a ``SearchAgent`` over one partition
+of the corpus. ``ShardedSearchAgent`` sends every query to all shards at
+once, waits up to ``shard_timeout`` seconds (capped by the call's deadline),
+and merges whatever came back: keyword matches in corpus order, dense and
+hybrid hits by score down to ``top_k``. Shards that fail or straggle are
+reported under ``"shards"`` and the result is marked ``"partial"``.
+
+Shards can run anywhere reachable over HTTP. On each host, serve one
+partition with::
+
+    python main.py serve --agents search     # config: agents.search.shard: {index: 0, count: 4}
+    python -m agents.sharded_search --shard 0/4 --corpus docs.txt --port 9000
+
+and point the coordinator at them with ``shards: [http://host-a:9000, ...]``.
+For a single machine, ``local_shards: 4`` starts the shard servers as child
+processes over ``corpus``::
+
+    agent = ShardedSearchAgent({"corpus": docs, "local_shards": 4})
+    agent.run_sync(query="agents")
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import ClientSession, TCPConnector, web
+
+from . import deadline
+from .async_agent import AsyncBaseAgent
+from .process_pool import shard_ranges
+from .search_agent import SearchAgent, retrieval_config
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+
+class ShardsUnavailable(Exception):
+    """No shard answered a query."""
+
+
+def _shard_config(config: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Return ``config`` for shard ``index``, with its own retrieval cache files."""
+    retrieval = dict(config.get("retrieval") or {})
+    for key in ("cache_path", "index_path"):
+        if retrieval.get(key):
+            root, ext = os.path.splitext(retrieval[key])
+            retrieval[key] = f"{root}.shard{index}{ext}"
+    return dict(config, retrieval=retrieval) if "retrieval" in config else config
+
+
+def _serve_shard(
+    corpus: List[str], config: Dict[str, Any], host: str, conn: "Connection"
+) -> None:
+    """Child process: serve a SearchAgent over ``corpus`` and report the bound port."""
+    from .server import AgentServer
+
+    async def start() -> None:
+        agent = SearchAgent(dict(config, corpus=corpus))
+        # Embed the partition before reporting the port, so no query waits for it
+        agent.start()
+        runner = web.AppRunner(
+            AgentServer({"search": agent}).build_app(), access_log=None
+        )
+        await runner.setup()
+        await web.TCPSite(runner, host, 0).start()
+        conn.send(runner.addresses[0][1])
+        conn.close()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(start())
+    loop.run_forever()
+
+
+class LocalShards:
+    """Child processes each serving one contiguous partition of a corpus."""
+
+    def __init__(
+        self,
+        corpus: Sequence[str],
+        count: int,
+        config: Optional[Dict[str, Any]] = None,
+        host: str = "127.0.0.1",
+        start_method: str = "spawn",
+    ) -> None:
+        """Partition ``corpus`` into ``count`` shards; ``config`` configures each shard's SearchAgent.
+
+        Retrieval ``cache_path`` and ``index_path`` get a ``.shard<i>`` suffix
+        per shard, since each shard embeds a different partition.
+        """
+        if count < 1:
+            raise ValueError("local_shards must be at least 1")
+        self.corpus = list(corpus)
+        self.count = count
+        self.config = dict(config or {})
+        self.host = host
+        self.start_method = start_method
+        self.urls: List[str] = []
+        self._processes: List[BaseProcess] = []
+
+    def start(self, timeout: float = 60.0) -> List[str]:
+        """Start the shard servers and return their base URLs, in shard order."""
+        if self._processes:
+            return self.urls
+        # Deferred so coordinators of remote shards never import multiprocessing;
+        # spawn keeps children from inheriting the parent's event loop thread
+        import multiprocessing
+        from multiprocessing.connection import wait
+
+        context: Any = multiprocessing.get_context(self.start_method)
+        pipes = []
+        for index, (start, stop) in enumerate(
+            shard_ranges(len(self.corpus), self.count)
+        ):
+            parent, child = context.Pipe(duplex=False)
+            config = _shard_config(self.config, index)
+            process = context.Process(
+                target=_serve_shard,
+                args=(self.corpus[start:stop], config, self.host, child),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._processes.append(process)
+            pipes.append(parent)
+        try:
+            for pipe, process in zip(pipes, self._processes):
+                if pipe not in wait([pipe, process.sentinel], timeout):
+                    state = (
+                        "exited"
+                        if not process.is_alive()
+                        else f"did not start within {timeout}s"
+                    )
+                    raise RuntimeError(f"shard server {state}")
+                self.urls.append(f"http://{self.host}:{pipe.recv()}")
+        except BaseException:
+            self.stop()
+            raise
+        return self.urls
+
+    def stop(self) -> None:
+        """Terminate the shard servers."""
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(5)
+        self._processes = []
+        self.urls = []
+
+    def __enter__(self) -> "LocalShards":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.stop()
+
+
+class ShardedSearchAgent(AsyncBaseAgent):
+    """Scatter-gather search over SearchAgent shard servers.
+
+    Config: ``shards`` (base URLs of shard servers, in corpus order) or
+    ``local_shards`` (number of child-process shards over ``corpus``);
+    ``shard_timeout`` (seconds per query, default 1.0); ``shard_agent``
+    (agent name on the shard servers, default ``"search"``); ``retrieval``
+    and ``max_results`` as for ``SearchAgent``, passed on to local shards.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize the coordinator; shards and connections start on first use."""
+        super().__init__(config)
+        self.retrieval = retrieval_config(self.config)
+        self.shard_timeout = float(self.config.get("shard_timeout", 1.0))
+        self.shard_agent = self.config.get("shard_agent", "search")
+        self.local: Optional[LocalShards] = None
+        self.urls: List[str] = [
+            url.rstrip("/") for url in self.config.get("shards", [])
+        ]
+        if self.config.get("local_shards"):
+            shard_config: Dict[str, Any] = {
+                key: self.config[key]
+                for key in ("retrieval", "max_results", "execution")
+                if key in self.config
+            }
+            self.local = LocalShards(
+                self.config.get("corpus", SearchAgent.CORPUS),
+                int(self.config["local_shards"]),
+                shard_config,
+                start_method=self.config.get("start_method", "spawn"),
+            )
+        elif not self.urls:
+            raise ValueError(
+                "ShardedSearchAgent needs 'shards' (URLs) or 'local_shards'"
+            )
+        self._session: Optional[ClientSession] = None
+        self._starting: Optional[asyncio.Future[List[str]]] = None
+
+    async def _get_session(self) -> ClientSession:
+        """Return the HTTP session, starting local shards first if configured."""
+        if self.local is not None and not self.local.urls:
+            if self._starting is None:
+                loop = asyncio.get_running_loop()
+                self._starting = asyncio.ensure_future(
+                    loop.run_in_executor(None, self.local.start)
+                )
+            try:
+                self.urls = await asyncio.shield(self._starting)
+            finally:
+                if self._starting.done():
+                    self._starting = None
+        if self._session is None:
+            self._session = ClientSession(connector=TCPConnector(limit=0))
+        return self._session
+
+    async def warmup(self) -> None:
+        """Start local shards and open connections."""
+        await self._get_session()
+
+    async def close(self) -> None:
+        """Close connections and stop local shards."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.local is not None:
+            self.local.stop()
+        await super().close()
+
+    async def _post(self, url: str, route: str, body: Dict[str, Any]) -> Any:
+        session = await self._get_session()
+        async with session.post(
+            f"{url}/agents/{self.shard_agent}/{route}", json=body
+        ) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200:
+                error = data.get("error") if isinstance(data, dict) else data
+                raise RuntimeError(f"HTTP {response.status}: {error}")
+            return data
+
+    async def _scatter(
+        self, route: str, body: Dict[str, Any]
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """POST ``body`` to every shard; return per-shard responses (None if missing) and a status report."""
+        await self._get_session()
+        timeout = deadline.remaining_timeout(self.shard_timeout)
+        tasks = [
+            asyncio.ensure_future(self._post(url, route, body)) for url in self.urls
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        # Let the stragglers finish cancelling, so none is left running or unretrieved
+        await asyncio.gather(*pending, return_exceptions=True)
+        responses: List[Any] = []
+        failed: Dict[str, str] = {}
+        for url, task in zip(self.urls, tasks):
+            if task in pending:
+                failed[url] = f"timed out after {timeout:.3g}s"
+                responses.append(None)
+            elif task.exception() is not None:
+                exc = task.exception()
+                failed[url] = f"{type(exc).__name__}: {exc}"
+                responses.append(None)
+            else:
+                responses.append(task.result())
+        self.count("shard_failures", len(failed))
+        if len(failed) == len(self.urls):
+            raise ShardsUnavailable(f"no shard answered: {failed}")
+        status = {
+            "total": len(self.urls),
+            "answered": len(self.urls) - len(failed),
+            "failed": failed,
+        }
+        return responses, status
+
+    def _merge(
+        self, query: str, parts: List[Optional[Dict[str, Any]]], status: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Combine shard results for one query."""
+        answered = [part for part in parts if part is not None]
+        if self.retrieval["mode"] == "keyword":
+            results = [text for part in answered for text in part["results"]]
+            merged: Dict[str, Any] = {
+                "query": query,
+                "result_count": len(results),
+                "results": results,
+            }
+        else:
+            ranked = heapq.merge(
+                *(zip(part["scores"], part["results"]) for part in answered),
+                key=lambda hit: -hit[0],
+            )
+            hits = list(ranked)[: self.retrieval["top_k"]]
+            merged = {
+                "query": query,
+                "result_count": len(hits),
+                "results": [text for _, text in hits],
+                "scores": [score for score, _ in hits],
+            }
+        merged["partial"] = bool(status["failed"])
+        merged["shards"] = status
+        return merged
+
+    async def run(self, query: str = "") -> Dict[str, Any]:
+        """Search every shard for ``query`` and merge their results."""
+        if not isinstance(query, str):
+            raise TypeError("query must be a string")
+        with self.step("scatter"):
+            parts, status = await self._scatter("run", {"query": query})
+        return self._merge(query, parts, status)
+
+    async def run_many(self, queries: Sequence[str]) -> List[Dict[str, Any]]:
+        """Search several queries with one batch request per shard."""
+        queries = list(queries)
+        for query in queries:
+            if not isinstance(query, str):
+                raise TypeError("query must be a string")
+        with self.step("scatter_batch"):
+            responses, status = await self._scatter(
+                "batch", {"requests": [{"query": q} for q in queries]}
+            )
+        results = []
+        for i, query in enumerate(queries):
+            parts = []
+            query_status = dict(status, failed=dict(status["failed"]))
+            for url, response in zip(self.urls, responses):
+                item = response["results"][i] if response is not None else None
+                if item is not None and item["status"] != 200:
+                    query_status["failed"][url] = (
+                        f"HTTP {item['status']}: {item['result'].get('error')}"
+                    )
+                    item = None
+                parts.append(item["result"] if item is not None else None)
+            query_status["answered"] = status["total"] - len(query_status["failed"])
+            results.append(self._merge(query, parts, query_status))
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run ``python -m agents.sharded_search``: serve one shard of a corpus."""
+    parser = argparse.ArgumentParser(
+        description="Serve one SearchAgent shard over HTTP"
+    )
+    parser.add_argument(
+        "--shard", required=True, help="Partition to serve, as INDEX/COUNT (e.g. 0/4)"
+    )
+    parser.add_argument(
+        "--corpus",
+        help="File with one document per line (default: the built-in corpus)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("keyword", "dense", "hybrid"),
+        default="keyword",
+        help="Retrieval mode of the shard's SearchAgent",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=9000, help="Port to listen on")
+    args = parser.parse_args(argv)
+
+    index, _, count = args.shard.partition("/")
+    corpus = SearchAgent.CORPUS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [line.rstrip("\n") for line in f if line.strip()]
+    config = {
+        "corpus": corpus,
+        "shard": {"index": int(index), "count": int(count)},
+        "retrieval": {"mode": args.mode},
+    }
+
+    from .server import AgentServer
+
+    print(json.dumps({"shard": args.shard, "url": f"http://{args.host}:{args.port}"}))
+    AgentServer({"search": SearchAgent(config)}).serve(host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,36 @@
 This agent replicates the n8n workflow functionality for automating
 video creation with Google's VEO3 and posting to social media via Blotato.
 """
+import functools
 import json
 import time
-from typing import Any, Dict, List, Optional
+import uuid
+from collections import deque
+from typing import Any, Dict, Generator, Iterator, List, Optional
 
 import requests
 
+from agents import deadline
 from agents.base_agent import BaseAgent
+from agents.cassette import session_from_config
+from agents.checkpoint import CheckpointStore, open_checkpoint_store
+from agents.job_queue import JobQueue, JobRunner
+from agents.log import get_logger
+from agents.quota import QuotaError, QuotaManager, RateLimitedError, parse_retry_after
+from agents.tracing import inject
+from agents.upload_cache import UploadCache
+from agents.webhook import RenderCallbackServer, render_video_url
+
+logger = get_logger(__name__)
+
+DEMO_VIDEO_URL = "https://commondatastorage.googleapis.com/gtv-videos-bucket/sample/BigBuckBunny.mp4"
 
 
 class SocialMediaVideoAgent(BaseAgent):
     """Agent for automated video creation and social media posting."""
 
+    PIPELINE_STAGES = ("concept", "render", "publish")
+
     def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
         """Initialize the Social Media Video Agent."""
         super().__init__(config)
@@ -40,10 +58,129 @@ class SocialMediaVideoAgent(BaseAgent):
             "bluesky_id": ""
         })
         
+        # Provider endpoints; point these at agents.stub_providers for load tests
+        self.openai_base_url = self.config.get("openai_base_url", "https://api.openai.com").rstrip("/")
+        self.fal_base_url = self.config.get("fal_base_url", "https://queue.fal.run").rstrip("/")
+        self.blotato_base_url = self.config.get("blotato_base_url", "https://backend.blotato.com").rstrip("/")
+
         # Workflow settings
         self.max_retries = self.config.get("max_retries", 3)
         self.video_wait_time = self.config.get("video_wait_time", 300)  # 5 minutes
 
+        # Per-provider rate limits and usage counters ("openai", "fal", "blotato")
+        self.quotas = QuotaManager(self.config.get("quotas", {}))
+
+        # Optional on-disk checkpoints so interrupted runs can resume
+        self.checkpoints: Optional[CheckpointStore] = open_checkpoint_store(self.config.get("checkpoint_path"))
+
+        # Skip re-uploading media Blotato already has
+        self.upload_cache = UploadCache(
+            path=self.config.get("upload_cache_path"),
+            ttl=self.config.get("upload_cache_ttl", 86400),
+        )
+
+        # Optional webhook-driven render completion instead of sleeping
+        self.use_webhooks = self.config.get("use_webhooks", False)
+        self.callback_server: Optional[RenderCallbackServer] = None
+
+        # Optional record/replay of provider traffic (see agents.cassette)
+        self.http: Optional[requests.Session] = session_from_config(self.config.get("cassette"))
+
+    def _record_render(self, submitted_at: float) -> None:
+        """Count render seconds spent on a finished VEO3 job."""
+        self.quotas.provider("fal").record_render_seconds(max(0.0, time.time() - submitted_at))
+
+    def _discard_step(self, run_id: Optional[str], step: str) -> None:
+        """Drop a checkpointed step so a resumed run recomputes it."""
+        checkpoints = self._get_checkpoints()
+        if checkpoints is not None and run_id is not None:
+            checkpoints.discard_step(run_id, step)
+
+    def _get_checkpoints(self) -> Optional[CheckpointStore]:
+        """Return the checkpoint store, reopening it if ``close()`` shut it."""
+        if self.checkpoints is None:
+            self.checkpoints = open_checkpoint_store(self.config.get("checkpoint_path"))
+        return self.checkpoints
+
+    def _get_http(self) -> Optional[requests.Session]:
+        """Return the cassette session, recreating it if ``close()`` shut it."""
+        if self.http is None:
+            self.http = session_from_config(self.config.get("cassette"))
+        return self.http
+
+    def _get_callback_server(self) -> Optional[RenderCallbackServer]:
+        """Start the render callback listener on first use when enabled."""
+        if self.use_webhooks and self.callback_server is None:
+            self.callback_server = RenderCallbackServer(
+                host=self.config.get("webhook_host", "127.0.0.1"),
+                port=self.config.get("webhook_port", 0),
+                public_url=self.config.get("webhook_public_url"),
+            ).start()
+        return self.callback_server
+
+    def _request(self, provider: str, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a provider request within its rate limits.
+
+        Requests wait for the provider's token bucket instead of failing. A 429
+        pauses the bucket for ``Retry-After`` and is retried up to
+        ``max_retries`` times before ``RateLimitedError`` is raised. Timeouts
+        and backoff are bounded by the current deadline.
+        """
+        quota = self.quotas.provider(provider)
+        http = self._get_http()
+        client = http if http is not None else requests
+        send = client.post if method == "POST" else client.get
+        timeout = kwargs.get("timeout")
+        retry_after = 1.0
+        for attempt in range(self.max_retries + 1):
+            deadline.check()
+            quota.acquire()
+            kwargs["timeout"] = deadline.remaining_timeout(timeout)
+            with self.step(f"http_{provider}") as step:
+                if step.span is not None:
+                    kwargs["headers"] = inject(dict(kwargs.get("headers") or {}))
+                    step.set_attribute("http.method", method)
+                    step.set_attribute("http.url", url)
+                    step.set_attribute("http.attempt", attempt)
+                try:
+                    response = send(url, **kwargs)
+                except requests.exceptions.Timeout:
+                    deadline.check()  # report a timeout cut short by the deadline as such
+                    raise
+                step.set_attribute("http.status_code", response.status_code)
+            if response.status_code != 429:
+                response.raise_for_status()
+                return response
+            retry_after = parse_retry_after(response.headers.get("Retry-After"), default=2.0 ** attempt)
+            quota.throttle(retry_after)
+            if quota.request_bucket is None and attempt < self.max_retries:
+                # No bucket to pause, so back off here
+                deadline.sleep(retry_after)
+        raise RateLimitedError(provider, retry_after)
+
+    def _record_llm_usage(self, data: Dict[str, Any]) -> None:
+        """Count the LLM tokens reported in an OpenAI response."""
+        tokens = (data.get("usage") or {}).get("total_tokens", 0)
+        if tokens:
+            self.quotas.provider("openai").record_llm_tokens(tokens)
+
+    def quota_usage(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-provider usage counters and budgets."""
+        return self.quotas.snapshot()
+
+    def _load_checkpoint(self, run_id: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """Load saved state for a run, or empty state when checkpointing is off."""
+        checkpoints = self._get_checkpoints()
+        if checkpoints is None or run_id is None:
+            return {"steps": {}, "social_posts": {}}
+        return checkpoints.load(run_id)
+
+    def _checkpoint_step(self, run_id: Optional[str], step: str, value: Any) -> None:
+        """Persist a completed step output when checkpointing is enabled."""
+        checkpoints = self._get_checkpoints()
+        if checkpoints is not None and run_id is not None:
+            checkpoints.save_step(run_id, step, value)
+
     def generate_video_concept(self, topic: str) -> Dict[str, Any]:
         """Generate video concept using OpenAI GPT-4."""
         system_prompt = """You are an AI designed to generate 1 immersive, realistic idea based on a user-provided topic. Your output must be formatted as a JSON object and follow all the rules below exactly.
@@ -70,8 +207,10 @@ OUTPUT FORMAT:
 }"""
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
+            response = self._request(
+                "openai",
+                "POST",
+                f"{self.openai_base_url}/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.openai_api_key}",
                     "Content-Type": "application/json"
@@ -86,11 +225,14 @@ OUTPUT FORMAT:
                 },
                 timeout=30
             )
-            response.raise_for_status()
             
-            content = response.json()["choices"][0]["message"]["content"]
+            data = response.json()
+            self._record_llm_usage(data)
+            content = data["choices"][0]["message"]["content"]
             return json.loads(content)
             
+        except (QuotaError, deadline.Cancelled):
+            raise
         except Exception as e:
             return {
                 "error": f"Failed to generate concept: {str(e)}",
@@ -100,6 +242,11 @@ OUTPUT FORMAT:
                 "Status": "for production"
             }
 
+    @staticmethod
+    def fallback_prompt(environment: str) -> str:
+        """Generic VEO3 prompt used when the LLM request fails."""
+        return f"A person in {environment.lower()} holds a camera close to their face, creating a selfie-style shot. Main character: young content creator with expressive eyes. They say: 'This is absolutely incredible, you have to see this!' while gesturing excitedly. They pan the camera slightly to show the surroundings. Time of Day: golden hour. Lens: wide-angle smartphone camera with slight fish-eye effect. Audio: (implied) ambient environmental sounds. Background: {environment.lower()} visible in soft focus behind them."
+
     def create_veo3_prompt(self, idea: str, environment: str) -> str:
         """Create VEO3-compatible video prompt."""
         system_prompt = """You are an AI agent that writes hyper-realistic, cinematic video prompts for Google VEO3. Each prompt should describe a short, vivid selfie-style video clip featuring one unnamed character speaking or acting in a specific moment.
@@ -125,8 +272,10 @@ RULES:
 - Always include the five key technical elements."""
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
+            response = self._request(
+                "openai",
+                "POST",
+                f"{self.openai_base_url}/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.openai_api_key}",
                     "Content-Type": "application/json"
@@ -141,72 +290,159 @@ RULES:
                 },
                 timeout=30
             )
-            response.raise_for_status()
             
-            return response.json()["choices"][0]["message"]["content"]
+            data = response.json()
+            self._record_llm_usage(data)
+            return data["choices"][0]["message"]["content"]
             
+        except (QuotaError, deadline.Cancelled):
+            raise
         except Exception as e:
-            # Fallback prompt
-            return f"A person in {environment.lower()} holds a camera close to their face, creating a selfie-style shot. Main character: young content creator with expressive eyes. They say: 'This is absolutely incredible, you have to see this!' while gesturing excitedly. They pan the camera slightly to show the surroundings. Time of Day: golden hour. Lens: wide-angle smartphone camera with slight fish-eye effect. Audio: (implied) ambient environmental sounds. Background: {environment.lower()} visible in soft focus behind them."
+            return self.fallback_prompt(environment)
+
+    def generate_video_with_veo3(self, prompt: str, run_id: Optional[str] = None) -> Optional[str]:
+        """Generate video using VEO3 API.
 
-    def generate_video_with_veo3(self, prompt: str) -> Optional[str]:
-        """Generate video using VEO3 API."""
+        When ``run_id`` is given and checkpointing is enabled, the render
+        request ID is persisted as soon as it is issued, so a rerun waits on
+        the existing render instead of paying for a new one. With
+        ``use_webhooks`` enabled the render is submitted with a callback URL
+        and completion is awaited on the local listener rather than by sleeping.
+        """
         try:
-            # Start video generation
-            response = requests.post(
-                "https://queue.fal.run/fal-ai/veo3",
-                headers={
-                    "Authorization": f"Key {self.veo3_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={"prompt": prompt},
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            request_id = response.json().get("request_id")
-            if not request_id:
-                return None
-            
-            # Wait for processing
-            print(f"Video generation started. Request ID: {request_id}")
-            print(f"Waiting {self.video_wait_time} seconds for processing...")
-            time.sleep(self.video_wait_time)
+            callback_server = self._get_callback_server()
+            saved_steps = self._load_checkpoint(run_id)["steps"]
+            request_id = saved_steps.get("request_id")
+            wait_time = self.video_wait_time
+            submitted_at = time.time()
+
+            if request_id:
+                # Only wait for whatever is left of the original render window
+                submitted_at = saved_steps.get("render_submitted_at", submitted_at)
+                elapsed = time.time() - submitted_at
+                wait_time = max(0.0, self.video_wait_time - elapsed)
+                logger.info("Resuming video generation", run_id=run_id, request_id=request_id)
+            else:
+                # Start video generation
+                response = self._request(
+                    "fal",
+                    "POST",
+                    f"{self.fal_base_url}/fal-ai/veo3",
+                    headers={
+                        "Authorization": f"Key {self.veo3_api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    params={"fal_webhook": callback_server.callback_url} if callback_server else None,
+                    json={"prompt": prompt},
+                    timeout=30
+                )
+
+                request_id = response.json().get("request_id")
+                if not request_id:
+                    return None
+
+                self._checkpoint_step(run_id, "request_id", request_id)
+                submitted_at = time.time()
+                self._checkpoint_step(run_id, "render_submitted_at", submitted_at)
+                logger.info("Video generation started", run_id=run_id, request_id=request_id)
+
+            if callback_server is not None:
+                logger.info("Waiting for render webhook", run_id=run_id, request_id=request_id, timeout=wait_time)
+                completion = callback_server.wait_for(request_id, timeout=deadline.remaining_timeout(wait_time))
+                if completion is not None:
+                    video_url = render_video_url(completion)
+                    self._record_render(submitted_at)
+                    if video_url is None:
+                        logger.warning("Video generation failed", run_id=run_id, request_id=request_id,
+                                       status=completion.get("status"))
+                        self._discard_step(run_id, "request_id")
+                    return video_url
+                # No callback in time (or it went to a previous process): check once
+            else:
+                # Wait for processing
+                logger.info("Waiting for render", run_id=run_id, request_id=request_id, seconds=wait_time)
+                # Raises at once if the render can't be collected before the deadline
+                deadline.sleep(wait_time)
             
             # Retrieve result
-            result_response = requests.get(
-                f"https://queue.fal.run/fal-ai/veo3/requests/{request_id}",
+            result_response = self._request(
+                "fal",
+                "GET",
+                f"{self.fal_base_url}/fal-ai/veo3/requests/{request_id}",
                 headers={"Authorization": f"Key {self.veo3_api_key}"},
                 timeout=30
             )
-            result_response.raise_for_status()
             
             result_data = result_response.json()
-            if result_data.get("status") == "completed":
+            status = result_data.get("status")
+            if status == "completed":
+                self._record_render(submitted_at)
                 return result_data.get("video", {}).get("url")
-            else:
-                print(f"Video generation status: {result_data.get('status')}")
-                return None
+
+            logger.warning("Video not ready", run_id=run_id, request_id=request_id, status=status)
+            if str(status).upper() not in ("IN_QUEUE", "IN_PROGRESS"):
+                # The render is gone for good; submit a fresh one next time
+                self._discard_step(run_id, "request_id")
+            return None
                 
+        except (QuotaError, deadline.Cancelled):
+            raise
         except Exception as e:
-            print(f"Error generating video: {str(e)}")
+            logger.error("Error generating video", run_id=run_id, error=str(e))
             return None
 
+    def warmup(self) -> None:
+        """Start the render callback listener ahead of the first render."""
+        if self.use_webhooks:
+            self._get_callback_server()
+
+    def close(self) -> None:
+        """Stop the render callback listener, close the checkpoint store and cassette session.
+
+        The agent stays usable: each is reopened on next use.
+        """
+        if self.callback_server is not None:
+            self.callback_server.close()
+            self.callback_server = None
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+            self.checkpoints = None
+        if self.http is not None:
+            self.http.close()
+            self.http = None
+        super().close()
+
     def upload_video_to_blotato(self, video_url: str) -> Optional[str]:
-        """Upload video to Blotato for social media posting."""
+        """Upload video to Blotato for social media posting.
+
+        Uploads are deduplicated through ``upload_cache``, so retried runs and
+        the shared demo-video fallback reuse the existing Blotato media URL.
+        """
+        cached_url = self.upload_cache.get(video_url)
+        if cached_url:
+            self.count("upload_cache_hits")
+            logger.info("Reusing cached Blotato upload", sampled=True)
+            return cached_url
+
         try:
-            response = requests.post(
-                "https://backend.blotato.com/v2/media",
+            response = self._request(
+                "blotato",
+                "POST",
+                f"{self.blotato_base_url}/v2/media",
                 headers={"blotato-api-key": self.blotato_api_key},
                 data={"url": video_url},
                 timeout=60
             )
-            response.raise_for_status()
             
-            return response.json().get("url")
+            media_url = response.json().get("url")
+            if media_url:
+                self.upload_cache.put(video_url, media_url)
+            return media_url
             
+        except (QuotaError, deadline.Cancelled):
+            raise
         except Exception as e:
-            print(f"Error uploading to Blotato: {str(e)}")
+            logger.error("Error uploading to Blotato", error=str(e))
             return None
 
     def post_to_social_platform(self, platform: str, media_url: str, caption: str, title: Optional[str] = None) -> Dict[str, Any]:
@@ -263,8 +499,10 @@ RULES:
         }
         
         try:
-            response = requests.post(
-                "https://backend.blotato.com/v2/posts",
+            response = self._request(
+                "blotato",
+                "POST",
+                f"{self.blotato_base_url}/v2/posts",
                 headers={
                     "blotato-api-key": self.blotato_api_key,
                     "Content-Type": "application/json"
@@ -272,7 +510,6 @@ RULES:
                 json=payload,
                 timeout=60
             )
-            response.raise_for_status()
             
             return {
                 "success": True,
@@ -280,6 +517,8 @@ RULES:
                 "response": response.json()
             }
             
+        except (QuotaError, deadline.Cancelled):
+            raise
         except Exception as e:
             return {
                 "success": False,
@@ -287,92 +526,290 @@ RULES:
                 "error": str(e)
             }
 
-    def run(self, topic: str = "amazing technology", platforms: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Run the complete social media video automation workflow."""
+    def new_run_state(
+        self,
+        topic: str = "amazing technology",
+        platforms: Optional[List[str]] = None,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Create the JSON-serializable state dict threaded through the stages."""
         if platforms is None:
             platforms = ["instagram", "youtube", "tiktok", "facebook"]
-        
-        start_time = time.time()
-        results = {
+        if run_id is None:
+            run_id = uuid.uuid4().hex
+
+        saved_steps = self._load_checkpoint(run_id)["steps"]
+        return {
+            "run_id": run_id,
             "topic": topic,
             "platforms": platforms,
-            "start_time": start_time,
+            "start_time": time.time(),
             "steps": {},
             "social_posts": {},
+            "resumed_steps": sorted(
+                step for step in ("concept", "veo3_prompt", "video_url", "blotato_media_url")
+                if step in saved_steps
+            ),
             "success": False
         }
-        
-        try:
-            # Step 1: Generate video concept
-            print("🎯 Step 1: Generating video concept...")
-            concept = self.generate_video_concept(topic)
-            results["steps"]["concept"] = concept
-            
-            if "error" in concept:
-                print(f"⚠️ Concept generation had issues: {concept['error']}")
-            
-            # Step 2: Create VEO3 prompt
-            print("📝 Step 2: Creating VEO3 prompt...")
+
+    def run_stage(self, stage: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one pipeline stage against ``results`` and return it updated.
+
+        Stages are listed in ``PIPELINE_STAGES``; each reads the outputs of the
+        previous ones from ``results["steps"]``.
+        """
+        for _ in self._stage_events(stage, results):
+            pass
+        return results
+
+    def _stage_events(self, stage: str, results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Run one stage, yielding its ``run_stream()`` events as they happen."""
+        handlers = {
+            "concept": self._stage_concept,
+            "render": self._stage_render,
+            "publish": self._stage_publish,
+        }
+        if stage not in handlers:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        with self.step(stage):
+            yield from handlers[stage](results, self._load_checkpoint(results["run_id"]))
+
+    def _stage_concept(
+        self, results: Dict[str, Any], saved: Dict[str, Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """Steps 1-2: generate the concept and the VEO3 prompt."""
+        run_id = results["run_id"]
+        saved_steps = saved["steps"]
+
+        # Step 1: Generate video concept
+        if "concept" in saved_steps:
+            logger.info("Reusing checkpointed video concept", run_id=run_id, step=1)
+            concept = saved_steps["concept"]
+        else:
+            logger.info("Generating video concept", run_id=run_id, step=1)
+            concept = self.generate_video_concept(results["topic"])
+            if "error" not in concept:
+                # Fallback concepts are not checkpointed, so a resumed run retries the LLM
+                self._checkpoint_step(run_id, "concept", concept)
+        results["steps"]["concept"] = concept
+        yield {"event": "step", "step": "concept", "value": concept}
+
+        if "error" in concept:
+            logger.warning("Concept generation had issues", run_id=run_id, error=concept["error"])
+
+        # Step 2: Create VEO3 prompt
+        if "veo3_prompt" in saved_steps:
+            logger.info("Reusing checkpointed VEO3 prompt", run_id=run_id, step=2)
+            veo3_prompt = saved_steps["veo3_prompt"]
+        else:
+            logger.info("Creating VEO3 prompt", run_id=run_id, step=2)
             veo3_prompt = self.create_veo3_prompt(concept["Idea"], concept["Environment"])
-            results["steps"]["veo3_prompt"] = veo3_prompt
-            
-            # Step 3: Generate video
-            print("🎬 Step 3: Generating video with VEO3...")
-            video_url = self.generate_video_with_veo3(veo3_prompt)
-            
-            if not video_url:
-                # Use a demo video URL for testing
-                video_url = "https://commondatastorage.googleapis.com/gtv-videos-bucket/sample/BigBuckBunny.mp4"
-                print("⚠️ Using demo video URL for testing")
-            
-            results["steps"]["video_url"] = video_url
-            
-            # Step 4: Upload to Blotato
-            print("📤 Step 4: Uploading video to Blotato...")
+            if "error" not in concept and veo3_prompt != self.fallback_prompt(concept["Environment"]):
+                self._checkpoint_step(run_id, "veo3_prompt", veo3_prompt)
+        results["steps"]["veo3_prompt"] = veo3_prompt
+        yield {"event": "step", "step": "veo3_prompt", "value": veo3_prompt}
+
+    def _stage_render(
+        self, results: Dict[str, Any], saved: Dict[str, Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """Step 3: render the video with VEO3."""
+        run_id = results["run_id"]
+        video_url = saved["steps"].get("video_url")
+        rendered = bool(video_url)
+        if rendered:
+            logger.info("Reusing checkpointed video", run_id=run_id, step=3)
+        else:
+            logger.info("Generating video with VEO3", run_id=run_id, step=3)
+            video_url = self.generate_video_with_veo3(results["steps"]["veo3_prompt"], run_id=run_id)
+            rendered = bool(video_url)
+            if rendered:
+                self._checkpoint_step(run_id, "video_url", video_url)
+
+        if not video_url:
+            # Use a demo video URL for testing
+            video_url = DEMO_VIDEO_URL
+            self.count("demo_video_fallbacks")
+            logger.warning("Using demo video URL for testing", run_id=run_id)
+
+        results["steps"]["video_url"] = video_url
+        results["steps"]["rendered"] = rendered
+        yield {"event": "step", "step": "video_url", "value": video_url, "rendered": rendered}
+
+    def _stage_publish(
+        self, results: Dict[str, Any], saved: Dict[str, Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """Steps 4-5: upload to Blotato and post to every platform."""
+        run_id = results["run_id"]
+        steps = results["steps"]
+        video_url = steps["video_url"]
+        rendered = steps.get("rendered", False)
+
+        # Step 4: Upload to Blotato
+        blotato_media_url = saved["steps"].get("blotato_media_url") if rendered else None
+        if blotato_media_url:
+            logger.info("Reusing checkpointed Blotato upload", run_id=run_id, step=4)
+        else:
+            logger.info("Uploading video to Blotato", run_id=run_id, step=4)
             blotato_media_url = self.upload_video_to_blotato(video_url)
-            
-            if not blotato_media_url:
-                blotato_media_url = video_url  # Fallback
-                print("⚠️ Using original video URL as fallback")
-            
-            results["steps"]["blotato_media_url"] = blotato_media_url
-            
-            # Step 5: Post to social platforms
-            print("📱 Step 5: Posting to social media platforms...")
-            for platform in platforms:
-                print(f"  📤 Posting to {platform}...")
-                post_result = self.post_to_social_platform(
-                    platform=platform,
-                    media_url=blotato_media_url,
-                    caption=concept["Caption"],
-                    title=concept.get("Idea", "Auto-generated Video")
-                )
-                results["social_posts"][platform] = post_result
-                
-                if post_result["success"]:
-                    print(f"  ✅ {platform}: Posted successfully")
-                else:
-                    print(f"  ❌ {platform}: {post_result['error']}")
-            
-            # Check overall success
-            successful_posts = sum(1 for result in results["social_posts"].values() if result["success"])
-            results["success"] = successful_posts > 0
-            results["successful_posts"] = successful_posts
-            results["total_platforms"] = len(platforms)
-            
-            execution_time = time.time() - start_time
+            if blotato_media_url and rendered:
+                self._checkpoint_step(run_id, "blotato_media_url", blotato_media_url)
+
+        if not blotato_media_url:
+            blotato_media_url = video_url  # Fallback
+            logger.warning("Using original video URL as fallback", run_id=run_id)
+
+        steps["blotato_media_url"] = blotato_media_url
+        yield {"event": "step", "step": "blotato_media_url", "value": blotato_media_url}
+
+        # Step 5: Post to social platforms
+        concept = steps["concept"]
+        logger.info("Posting to social media platforms", run_id=run_id, step=5,
+                    platforms=results["platforms"])
+        for platform in results["platforms"]:
+            # A queued job retried after a 429 carries its earlier posts in the payload
+            previous = results["social_posts"].get(platform) or saved["social_posts"].get(platform)
+            if previous and previous.get("success"):
+                logger.info("Already posted", run_id=run_id, platform=platform, sampled=True)
+                results["social_posts"][platform] = previous
+                yield {"event": "post", "platform": platform, "result": previous}
+                continue
+
+            logger.debug("Posting", run_id=run_id, platform=platform)
+            post_result = self.post_to_social_platform(
+                platform=platform,
+                media_url=blotato_media_url,
+                caption=concept["Caption"],
+                title=concept.get("Idea", "Auto-generated Video")
+            )
+            results["social_posts"][platform] = post_result
+            checkpoints = self._get_checkpoints()
+            if checkpoints is not None:
+                checkpoints.save_post(run_id, platform, post_result)
+
+            if post_result["success"]:
+                self.count("posts_succeeded")
+                logger.info("Posted successfully", run_id=run_id, platform=platform, sampled=True)
+            else:
+                self.count("posts_failed")
+                logger.warning("Post failed", run_id=run_id, platform=platform, error=post_result["error"])
+            yield {"event": "post", "platform": platform, "result": post_result}
+
+        # Check overall success
+        successful_posts = sum(1 for result in results["social_posts"].values() if result["success"])
+        results["success"] = successful_posts > 0
+        results["successful_posts"] = successful_posts
+        results["total_platforms"] = len(results["platforms"])
+
+    def enqueue_run(
+        self,
+        queue: JobQueue,
+        topic: str = "amazing technology",
+        platforms: Optional[List[str]] = None,
+        priority: int = 0,
+    ) -> int:
+        """Queue a workflow run for ``create_worker`` and return the job ID."""
+        state = self.new_run_state(topic, platforms)
+        return queue.enqueue(
+            self.PIPELINE_STAGES[0], state, priority=priority, max_attempts=self.max_retries
+        )
+
+    def _run_queued_stage(self, stage: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Job handler for one stage; raises so the queue retries failed publishes."""
+        self.run_stage(stage, results)
+        if stage == self.PIPELINE_STAGES[-1]:
+            results["execution_time"] = time.time() - results["start_time"]
+            if not results["success"]:
+                raise RuntimeError("No platform accepted the post")
+        return results
+
+    def create_worker(self, queue: JobQueue, pools: Optional[Dict[str, int]] = None) -> JobRunner:
+        """Build a runner with one worker pool per pipeline stage.
+
+        Render workers mostly wait on VEO3, so that pool is the widest by
+        default; its visibility timeout covers the full render window. A
+        retried publish job only posts to platforms it has not posted to yet.
+        """
+        pools = pools or self.config.get("worker_pools", {"concept": 2, "render": 8, "publish": 2})
+        return JobRunner(
+            queue,
+            [(stage, functools.partial(self._run_queued_stage, stage)) for stage in self.PIPELINE_STAGES],
+            pools=pools,
+            visibility_timeouts={
+                "concept": 120.0,
+                "render": self.video_wait_time + 120.0,
+                "publish": 300.0,
+            },
+            retry_backoff=self.config.get("retry_backoff", 5.0),
+        )
+
+    def run(
+        self,
+        topic: str = "amazing technology",
+        platforms: Optional[List[str]] = None,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run the complete social media video automation workflow.
+
+        Pass the ``run_id`` of an earlier run to resume it from its last
+        completed step; only platforms whose post failed are retried.
+        A run stopped by its ``deadline`` returns with ``cancelled: True``
+        and can be resumed the same way.
+        """
+        # Drain the events; the last one is "done" with the result
+        done = deque(self._workflow_events(topic, platforms, run_id), maxlen=1)[0]
+        result: Dict[str, Any] = done["result"]
+        return result
+
+    def run_stream(
+        self,
+        topic: str = "amazing technology",
+        platforms: Optional[List[str]] = None,
+        run_id: Optional[str] = None,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """Run the workflow, yielding an event as each step and post completes.
+
+        Yields ``{"event": "start", "run_id": ...}``, then
+        ``{"event": "step", "step": ..., "value": ...}`` for the concept,
+        VEO3 prompt, video URL and Blotato upload, one
+        ``{"event": "post", "platform": ..., "result": ...}`` per platform
+        and finally ``{"event": "done", "result": ...}`` with what ``run()``
+        returns.
+        """
+        yield from self._workflow_events(topic, platforms, run_id)
+
+    def _workflow_events(
+        self, topic: str, platforms: Optional[List[str]], run_id: Optional[str]
+    ) -> Iterator[Dict[str, Any]]:
+        """The events behind ``run_stream()``, uninstrumented so ``run()`` is timed once."""
+        results = self.new_run_state(topic, platforms, run_id)
+        start_time = time.perf_counter()
+        yield {"event": "start", "run_id": results["run_id"]}
+
+        try:
+            for stage in self.PIPELINE_STAGES:
+                yield from self._stage_events(stage, results)
+
+            execution_time = time.perf_counter() - start_time
             results["execution_time"] = execution_time
             
-            print(f"\n🎉 Workflow completed in {execution_time:.2f}s")
-            print(f"✅ Successfully posted to {successful_posts}/{len(platforms)} platforms")
-            
-            return results
+            logger.info(
+                "Workflow completed",
+                run_id=results["run_id"],
+                seconds=round(execution_time, 3),
+                successful_posts=results["successful_posts"],
+                total_platforms=results["total_platforms"],
+            )
             
         except Exception as e:
             results["error"] = str(e)
-            results["execution_time"] = time.time() - start_time
-            print(f"❌ Workflow failed: {str(e)}")
-            return results
+            if isinstance(e, deadline.Cancelled):
+                # Abandoned for the caller's deadline; rerun with the run_id to resume
+                results["cancelled"] = True
+            results["execution_time"] = time.perf_counter() - start_time
+            logger.error("Workflow failed", run_id=results["run_id"], error=str(e))
+
+        yield {"event": "done", "result": results}
 
 
 # Example usage and configuration
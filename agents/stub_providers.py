@@ -0,0 +1,332 @@
+"""Local stand-in for the providers ``SocialMediaVideoAgent`` calls.
+
+Implements the endpoints the agent uses on one port:
+
+- ``POST /v1/chat/completions`` (OpenAI)
+- ``POST /fal-ai/veo3`` and ``GET /fal-ai/veo3/requests/{id}`` (fal queue),
+  including the ``fal_webhook`` completion callback
+- ``POST /v2/media`` and ``POST /v2/posts`` (Blotato)
+- ``GET /stub/stats`` with per-endpoint response counts
+
+Point the agent at it with ``openai_base_url``, ``fal_base_url`` and
+``blotato_base_url``. Each provider (``openai``, ``fal``, ``blotato``) takes
+``latency`` (same specs as ``agents.cassette``: seconds or a distribution
+dict), ``failure_rate`` (500s), ``rate_limit_rate`` (random 429s),
+``max_rps`` (429 above this many requests per second) and ``retry_after``;
+``fal`` also takes ``render_seconds``. Run it standalone with::
+
+    python -m agents.stub_providers --port 8900 --latency 0.2 --render-seconds 5
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from aiohttp import ClientSession, web
+
+from .bridge import get_background_loop
+from .cassette import latency_model
+
+PROVIDERS = ("openai", "fal", "blotato")
+
+CONCEPT = {
+    "Caption": "Wait for it... #robots #viral #ai",
+    "Idea": "Robot chef flips pancakes mid-air",
+    "Environment": "Sunny retro diner kitchen",
+    "Status": "for production",
+}
+
+PROMPT = (
+    "A chrome robot chef in a sunny retro diner flips a pancake high into the air and catches it, "
+    "saying 'Breakfast is served!' Handheld selfie lens, warm morning light, sizzling griddle ambience."
+)
+
+
+class _Provider:
+    """Latency and failure behaviour for one provider."""
+
+    def __init__(self, name: str, config: Dict[str, Any], rng: random.Random) -> None:
+        self.name = name
+        self.rng = rng
+        self.latency = latency_model(config.get("latency"), seed=rng.getrandbits(32))
+        self.failure_rate = float(config.get("failure_rate", 0.0))
+        self.rate_limit_rate = float(config.get("rate_limit_rate", 0.0))
+        self.max_rps = config.get("max_rps")
+        self.retry_after = float(config.get("retry_after", 1.0))
+        self._accepted: Deque[float] = deque()
+
+    def _over_limit(self) -> bool:
+        """Sliding one-second window over accepted requests."""
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        while self._accepted and self._accepted[0] <= now - 1.0:
+            self._accepted.popleft()
+        if len(self._accepted) >= self.max_rps:
+            return True
+        self._accepted.append(now)
+        return False
+
+    async def respond(self, build: Any) -> web.Response:
+        """Wait out the latency, then answer 429/500 or ``build()``'s JSON."""
+        delay = self.latency(0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._over_limit() or self.rng.random() < self.rate_limit_rate:
+            return web.json_response(
+                {"error": "rate limited"},
+                status=429,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if self.rng.random() < self.failure_rate:
+            return web.json_response({"error": f"{self.name} stub failure"}, status=500)
+        body = build()
+        if isinstance(body, web.Response):
+            return body
+        return web.json_response(body)
+
+
+class StubProviderServer:
+    """aiohttp app emulating OpenAI, fal and Blotato for load tests."""
+
+    def __init__(
+        self, config: Optional[Dict[str, Any]] = None, seed: Optional[int] = None
+    ) -> None:
+        """``config`` maps provider names to behaviour; ``fal`` may set ``render_seconds``."""
+        config = config or {}
+        self.rng = random.Random(seed)
+        self.providers = {
+            name: _Provider(name, config.get(name, {}), self.rng) for name in PROVIDERS
+        }
+        self.render_seconds = latency_model(
+            config.get("fal", {}).get("render_seconds"), seed=self.rng.getrandbits(32)
+        )
+        self.renders: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._ids = itertools.count(1)
+        self._webhooks: Set[asyncio.Future[None]] = set()
+        self._client: Optional[ClientSession] = None
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        response: web.StreamResponse = await handler(request)
+        route = request.match_info.route.resource
+        key = route.canonical if route is not None else request.path
+        counts = self.stats.setdefault(f"{request.method} {key}", {})
+        counts[str(response.status)] = counts.get(str(response.status), 0) + 1
+        return response
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        messages = body.get("messages") or [{}]
+        wants_concept = "JSON" in str(messages[0].get("content", ""))
+        content = json.dumps(CONCEPT) if wants_concept else PROMPT
+
+        def build() -> Dict[str, Any]:
+            return {
+                "id": f"chatcmpl-{next(self._ids)}",
+                "object": "chat.completion",
+                "model": body.get("model", "gpt-4"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "total_tokens": len(json.dumps(messages)) // 4 + len(content) // 4
+                },
+            }
+
+        return await self.providers["openai"].respond(build)
+
+    async def submit_render(self, request: web.Request) -> web.Response:
+        await request.read()
+        webhook = request.query.get("fal_webhook")
+
+        def build() -> Dict[str, Any]:
+            request_id = f"req-{next(self._ids):06d}"
+            duration = self.render_seconds(0.0)
+            self.renders[request_id] = {"ready_at": time.monotonic() + duration}
+            if webhook:
+                task = asyncio.ensure_future(
+                    self._deliver(webhook, request_id, duration)
+                )
+                self._webhooks.add(task)
+                task.add_done_callback(self._webhooks.discard)
+            return {"request_id": request_id, "status": "IN_QUEUE"}
+
+        return await self.providers["fal"].respond(build)
+
+    def _video(self, request_id: str) -> Dict[str, str]:
+        return {"url": f"{self.base_url}/media/{request_id}.mp4"}
+
+    async def _deliver(self, url: str, request_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if self._client is None:
+            self._client = ClientSession()
+        body = {
+            "request_id": request_id,
+            "status": "OK",
+            "payload": {"video": self._video(request_id)},
+        }
+        try:
+            async with self._client.post(url, json=body) as response:
+                await response.read()
+        except Exception:  # the agent may be gone; fal just gives up too
+            pass
+
+    async def render_status(self, request: web.Request) -> web.Response:
+        request_id = request.match_info["request_id"]
+
+        def build() -> Any:
+            render = self.renders.get(request_id)
+            if render is None:
+                return web.json_response({"detail": "Request not found"}, status=404)
+            if time.monotonic() < render["ready_at"]:
+                return {"request_id": request_id, "status": "IN_PROGRESS"}
+            return {
+                "request_id": request_id,
+                "status": "completed",
+                "video": self._video(request_id),
+            }
+
+        return await self.providers["fal"].respond(build)
+
+    async def upload_media(self, request: web.Request) -> web.Response:
+        await request.read()
+        return await self.providers["blotato"].respond(
+            lambda: {"url": f"{self.base_url}/media/blotato-{next(self._ids)}.mp4"}
+        )
+
+    async def create_post(self, request: web.Request) -> web.Response:
+        await request.read()
+        return await self.providers["blotato"].respond(
+            lambda: web.json_response(
+                {"postSubmissionId": f"sub-{next(self._ids)}"}, status=201
+            )
+        )
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    async def _cleanup(self, app: web.Application) -> None:
+        for task in list(self._webhooks):
+            task.cancel()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def build_app(self) -> web.Application:
+        """Create the aiohttp application."""
+        app = web.Application(middlewares=[self._count])
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/fal-ai/veo3", self.submit_render)
+        app.router.add_get("/fal-ai/veo3/requests/{request_id}", self.render_status)
+        app.router.add_post("/v2/media", self.upload_media)
+        app.router.add_post("/v2/posts", self.create_post)
+        app.router.add_get("/stub/stats", self.handle_stats)
+        app.on_cleanup.append(self._cleanup)
+        return app
+
+    def agent_config(self) -> Dict[str, str]:
+        """Return the ``SocialMediaVideoAgent`` base URL settings for this server."""
+        return {
+            "openai_base_url": self.base_url,
+            "fal_base_url": self.base_url,
+            "blotato_base_url": self.base_url,
+        }
+
+    async def _start(self, host: str, port: int) -> str:
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "StubProviderServer":
+        """Serve on the shared background loop; ``port=0`` picks a free port."""
+        get_background_loop().run(self._start(host, port))
+        return self
+
+    def stop(self) -> None:
+        """Stop a server started with ``start()``."""
+        if self._runner is not None:
+            get_background_loop().run(self._runner.cleanup())
+            self._runner = None
+
+    def __enter__(self) -> "StubProviderServer":
+        return self.start()
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.stop()
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8900) -> None:
+        """Run the server until interrupted."""
+        self.base_url = f"http://{host}:{port}"
+        web.run_app(self.build_app(), host=host, port=port, access_log=None)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run ``python -m agents.stub_providers``; the options apply to every provider."""
+    parser = argparse.ArgumentParser(
+        description="Serve stub OpenAI, fal and Blotato endpoints"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8900, help="Port to listen on")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response"
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 500",
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with 429",
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=int,
+        help="Answer 429 above this many requests per second per provider",
+    )
+    parser.add_argument(
+        "--render-seconds",
+        type=float,
+        default=0.0,
+        help="How long each VEO3 render takes",
+    )
+    parser.add_argument("--seed", type=int, help="Seed for repeatable failures")
+    args = parser.parse_args(argv)
+
+    behaviour = {
+        "latency": args.latency,
+        "failure_rate": args.failure_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "max_rps": args.max_rps,
+    }
+    config = {name: dict(behaviour) for name in PROVIDERS}
+    config["fal"]["render_seconds"] = args.render_seconds
+    print(
+        f"Point the agent at http://{args.host}:{args.port} "
+        "(openai_base_url, fal_base_url, blotato_base_url)"
+    )
+    StubProviderServer(config, seed=args.seed).serve(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,595 @@
+"""Span-based tracing for agent runs, steps and outbound HTTP calls.
+
+Every ``run()`` opens a span, every ``self.step(name)`` opens a child span,
+and HTTP helpers add ``http.*`` attributes and a W3C ``traceparent`` header.
+The current span lives in a ``contextvars.ContextVar``, so it follows
+asyncio tasks automatically and threads whenever the caller's context is
+copied (``BaseAgent.arun``, the orchestrator and ``propagate``).
+
+Tracing is off until an exporter is configured::
+
+    from agents import tracing
+
+    tracing.configure([tracing.JSONFileExporter("trace.jsonl")])
+
+``OTLPHTTPExporter`` sends the OpenTelemetry OTLP/JSON format to a collector
+(``http://localhost:4318/v1/traces``). Saved JSON traces can be analysed
+offline with ``python -m agents.tracing trace.jsonl``.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar(
+    "smallagents_span", default=None
+)
+
+
+class SpanContext:
+    """Identifiers of a span, e.g. a remote parent parsed from ``traceparent``."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str) -> None:
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional[Union["Span", SpanContext]],
+        kind: str,
+        attributes: Optional[Dict[str, Any]],
+    ) -> None:
+        self.name = name
+        self.trace_id: str = (
+            parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        )
+        self.span_id: str = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "OK"
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value pair to the span."""
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span as failed with ``exc``."""
+        self.status = "ERROR"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed without an exception."""
+        self.status = "ERROR"
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span as a JSON-serializable dict."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _SpanScope:
+    """Context manager that makes a span current and ends it on exit."""
+
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span) -> None:
+        self.tracer = tracer
+        self.span = span
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc is not None:
+            self.span.record_exception(exc)
+        if self._token is not None:
+            _current.reset(self._token)
+        self.tracer.end(self.span)
+
+
+class _NullScope:
+    """Scope returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        return None
+
+
+NULL_SCOPE = _NullScope()
+
+
+class _UseSpan:
+    """Context manager that makes an existing span current without ending it."""
+
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span) -> None:
+        self.span = span
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+
+class Tracer:
+    """Creates spans and hands finished ones to exporters on a background thread."""
+
+    def __init__(self, service_name: str = "smallagents") -> None:
+        """Create a tracer with no exporters (disabled)."""
+        self.service_name = service_name
+        self.exporters: List[Any] = []
+        self.enabled = False
+        self._processor: Optional[_BatchProcessor] = None
+
+    def configure(
+        self, exporters: Sequence[Any], service_name: Optional[str] = None
+    ) -> None:
+        """Replace the exporters; an empty list disables tracing."""
+        self.shutdown()
+        if service_name:
+            self.service_name = service_name
+        self.exporters = list(exporters)
+        if self.exporters:
+            self._processor = _BatchProcessor(self.exporters)
+        self.enabled = bool(self.exporters)
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "internal",
+        parent: Optional[Union[Span, SpanContext]] = None,
+    ) -> Any:
+        """Return a context manager for a child of ``parent`` or the current span.
+
+        While tracing is disabled the returned scope yields ``None``.
+        """
+        if not self.enabled:
+            return NULL_SCOPE
+        return _SpanScope(self, Span(name, parent or _current.get(), kind, attributes))
+
+    def open_span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None
+    ) -> Optional[Span]:
+        """Start a child of the current span without making it current; end it with ``end()``.
+
+        For work that is resumed piecemeal, such as a generator, where
+        ``use_span()`` re-activates the span around each piece. Returns
+        ``None`` while tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        return Span(name, _current.get(), "internal", attributes)
+
+    def end(self, span: Span) -> None:
+        """Finish ``span`` and queue it for export."""
+        span.end_ns = time.time_ns()
+        processor = self._processor
+        if processor is not None:
+            processor.submit(span)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until queued spans have been exported."""
+        if self._processor is not None:
+            self._processor.flush(timeout)
+
+    def shutdown(self) -> None:
+        """Flush and stop the export thread and exporters."""
+        processor, self._processor = self._processor, None
+        self.enabled = False
+        if processor is not None:
+            processor.shutdown()
+
+
+class _BatchProcessor:
+    """Background thread exporting finished spans in batches."""
+
+    def __init__(
+        self, exporters: List[Any], max_batch: int = 512, interval: float = 1.0
+    ) -> None:
+        import queue
+
+        self.exporters = exporters
+        self.max_batch = max_batch
+        self.interval = interval
+        self.queue: queue.Queue[Any] = queue.Queue()
+        self._empty = queue.Empty
+        self.thread = threading.Thread(
+            target=self._work, name="smallagents-tracing", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, span: Span) -> None:
+        self.queue.put(span)
+
+    def _export(self, batch: List[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+            except Exception as e:  # never let tracing break the agent
+                print(
+                    f"Trace export failed in {type(exporter).__name__}: {e}",
+                    file=sys.stderr,
+                )
+
+    def _work(self) -> None:
+        batch: List[Span] = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.interval)
+            except self._empty:
+                item = None
+            if isinstance(item, Span):
+                batch.append(item)
+                if len(batch) < self.max_batch:
+                    continue
+            if batch:
+                self._export(batch)
+                batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item == "stop":
+                return
+
+    def flush(self, timeout: float) -> None:
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def shutdown(self) -> None:
+        self.queue.put("stop")
+        self.thread.join(5.0)
+        for exporter in self.exporters:
+            close = getattr(exporter, "shutdown", None)
+            if close is not None:
+                close()
+
+
+TRACER = Tracer()
+
+
+def configure(exporters: Sequence[Any], service_name: Optional[str] = None) -> Tracer:
+    """Configure the process-wide tracer."""
+    TRACER.configure(exporters, service_name)
+    return TRACER
+
+
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    kind: str = "internal",
+    parent: Optional[Union[Span, SpanContext]] = None,
+) -> Any:
+    """Start a span on the process-wide tracer."""
+    return TRACER.start_span(name, attributes, kind, parent)
+
+
+def use_span(span: Optional[Span]) -> Any:
+    """Make ``span`` current for a block without ending it; no-op for ``None``."""
+    return NULL_SCOPE if span is None else _UseSpan(span)
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span, if any."""
+    return _current.get()
+
+
+def propagate(fn: Callable[..., T]) -> Callable[..., T]:
+    """Bind ``fn`` to a copy of the caller's context, for running on another thread."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def inject(headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+    """Add a W3C ``traceparent`` header for the current span, if any."""
+    span = _current.get()
+    if span is not None:
+        headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-01"
+    return headers
+
+
+def extract(headers: Mapping[str, str]) -> Optional[SpanContext]:
+    """Parse a W3C ``traceparent`` header into a remote parent context."""
+    value = headers.get("traceparent")
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+
+class InMemoryExporter:
+    """Keeps exported spans in a list (tests, notebooks)."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+
+class JSONFileExporter:
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str) -> None:
+        """Write spans to ``path`` (created if missing, appended otherwise)."""
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(
+            json.dumps(span.to_dict(), default=str) + "\n" for span in spans
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: Sequence[Span], service_name: str = "smallagents") -> Dict[str, Any]:
+    """Encode spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "smallagents"},
+                        "spans": [
+                            {
+                                "traceId": span.trace_id,
+                                "spanId": span.span_id,
+                                "parentSpanId": span.parent_id or "",
+                                "name": span.name,
+                                "kind": _OTLP_KINDS.get(span.kind, 1),
+                                "startTimeUnixNano": str(span.start_ns),
+                                "endTimeUnixNano": str(span.end_ns),
+                                "attributes": [
+                                    {"key": key, "value": _otlp_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "status": (
+                                    {"code": 2, "message": span.error or ""}
+                                    if span.status == "ERROR"
+                                    else {"code": 1}
+                                ),
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class OTLPHTTPExporter:
+    """Posts spans to an OpenTelemetry collector using OTLP/HTTP JSON."""
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:4318/v1/traces",
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+        service_name: Optional[str] = None,
+    ) -> None:
+        """Send to ``endpoint`` with optional extra ``headers`` (e.g. auth)."""
+        self.endpoint = endpoint
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]) -> None:
+        import urllib.request
+
+        body = json.dumps(
+            to_otlp(spans, self.service_name or TRACER.service_name)
+        ).encode()
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers=self.headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def exporters_from_options(
+    trace_file: Optional[str] = None, otlp_endpoint: Optional[str] = None
+) -> List[Any]:
+    """Build exporters from CLI options, falling back to environment variables.
+
+    ``SMALLAGENTS_TRACE_FILE`` and ``SMALLAGENTS_OTLP_ENDPOINT`` are used
+    when the options are not given.
+    """
+    trace_file = trace_file or os.environ.get("SMALLAGENTS_TRACE_FILE")
+    otlp_endpoint = otlp_endpoint or os.environ.get("SMALLAGENTS_OTLP_ENDPOINT")
+    exporters: List[Any] = []
+    if trace_file:
+        exporters.append(JSONFileExporter(trace_file))
+    if otlp_endpoint:
+        exporters.append(OTLPHTTPExporter(otlp_endpoint))
+    return exporters
+
+
+# Offline analysis of JSON trace files
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read spans written by ``JSONFileExporter``."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def critical_path(
+    spans: Sequence[Dict[str, Any]], trace_id: str
+) -> List[Dict[str, Any]]:
+    """Return the chain of spans that determined a trace's end time.
+
+    Starting at the root, follow the child that finished last at each level.
+    """
+    in_trace = [s for s in spans if s["trace_id"] == trace_id]
+    ids = {s["span_id"] for s in in_trace}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in in_trace:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+    path: List[Dict[str, Any]] = []
+    level = children.get(None, [])
+    while level:
+        span = max(level, key=lambda s: s["end_ns"])
+        path.append(span)
+        level = children.get(span["span_id"], [])
+    return path
+
+
+def summarize(spans: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Return count, errors and p50/p95/p99/max duration (ms) per span name."""
+    by_name: Dict[str, List[Dict[str, Any]]] = {}
+    for span in spans:
+        by_name.setdefault(span["name"], []).append(span)
+    summary = {}
+    for name, group in by_name.items():
+        durations = sorted(s["duration_ms"] for s in group)
+
+        def pct(q: float, durations: List[float] = durations) -> float:
+            return durations[min(len(durations) - 1, int(q * len(durations)))]
+
+        summary[name] = {
+            "count": len(group),
+            "errors": sum(1 for s in group if s["status"] == "ERROR"),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": durations[-1],
+        }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print span latency percentiles and the critical path of the slowest traces."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Analyse a SmallAgents JSON trace file"
+    )
+    parser.add_argument("path", help="File written by JSONFileExporter")
+    parser.add_argument(
+        "--top", type=int, default=3, help="Number of slowest traces to show"
+    )
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.path)
+    print(
+        f"{'span':<40} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    for name, row in sorted(
+        summarize(spans).items(), key=lambda item: -item[1]["p95_ms"]
+    ):
+        print(
+            f"{name:<40} {row['count']:>6} {row['errors']:>6} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+
+    roots = sorted(
+        (s for s in spans if s["parent_id"] is None), key=lambda s: -s["duration_ms"]
+    )
+    for root in roots[: args.top]:
+        print(
+            f"\nCritical path of {root['name']} ({root['duration_ms']:.1f} ms, trace {root['trace_id']}):"
+        )
+        for depth, span in enumerate(critical_path(spans, root["trace_id"])):
+            print(
+                f"{'  ' * depth}{span['name']}  {span['duration_ms']:.1f} ms  {span['status']}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
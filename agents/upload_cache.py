@@ -0,0 +1,96 @@
+"""Content-addressed cache of media uploads with TTL and on-disk persistence."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class UploadCache:
+    """Map a media source to the URL it was already uploaded to.
+
+    Sources are keyed by a SHA-256 digest: of the file contents for local
+    paths, otherwise of the URL itself. Entries expire after ``ttl`` seconds.
+    When ``path`` is set the cache is loaded from and written back to a JSON
+    file, so duplicate uploads are skipped across process restarts too.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 86400.0) -> None:
+        """Create the cache, loading existing entries from ``path`` if any."""
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    @staticmethod
+    def key_for(source: str) -> str:
+        """Return the content address for a local file path or URL."""
+        digest = hashlib.sha256()
+        if os.path.isfile(source):
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            return f"sha256:{digest.hexdigest()}"
+        digest.update(source.strip().encode("utf-8"))
+        return f"url:{digest.hexdigest()}"
+
+    def get(self, source: str) -> Optional[str]:
+        """Return the cached media URL for ``source`` if present and fresh."""
+        key = self.key_for(source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry["stored_at"] > self.ttl:
+                del self._entries[key]
+                return None
+            return str(entry["media_url"])
+
+    def put(self, source: str, media_url: str) -> None:
+        """Record that ``source`` was uploaded to ``media_url``."""
+        key = self.key_for(source)
+        with self._lock:
+            self._entries[key] = {"media_url": media_url, "stored_at": time.time()}
+            self._save()
+
+    def invalidate(self, source: str) -> None:
+        """Forget the upload recorded for ``source``."""
+        key = self.key_for(source)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def __len__(self) -> int:
+        """Return the number of stored entries, including expired ones."""
+        return len(self._entries)
+
+    def _save(self) -> None:
+        """Drop expired entries and atomically rewrite the cache file."""
+        now = time.time()
+        self._entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if now - entry["stored_at"] <= self.ttl
+        }
+        if not self.path:
+            return
+        # A unique temp file per write, so concurrent processes never share one
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(self._entries, f)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
@@ -0,0 +1,414 @@
+"""Dense and hybrid retrieval for ``SearchAgent`` on NumPy.
+
+The corpus is embedded once into a contiguous ``float32`` matrix of
+L2-normalised rows (optionally cached as a memory-mapped ``.npy`` file), and
+queries are scored with batched matrix products over blocks of rows, keeping
+each block's best ``k`` with ``argpartition``. Hybrid mode adds a keyword
+score (the fraction of query words a document contains, from an inverted
+index) to the cosine similarity.
+
+The default embedder is ``HashingEmbedder``: signed feature hashing of words
+and character trigrams, so related word forms share dimensions and no model
+or network is needed. Any object with ``dim``, ``name`` and
+``embed(texts) -> ndarray`` can replace it, given directly or as a
+``"package.module:factory"`` path.
+"""
+
+import importlib
+import json
+import os
+import re
+import tempfile
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+# Rows scored per matrix product; bounds temporaries at block * queries floats
+BLOCK_ROWS = 262_144
+
+INDEX_TYPES = ("exact", "ivfpq")
+
+
+def words(text: str) -> List[str]:
+    """Split text into lower-cased word tokens."""
+    return _WORD.findall(text.lower())
+
+
+class HashingEmbedder:
+    """Signed hashing vectorizer over words and character n-grams.
+
+    Each feature is hashed (CRC32, stable across processes) to one of ``dim``
+    columns with a +/-1 sign; rows are L2-normalised. ``ngram=0`` disables
+    character n-grams.
+    """
+
+    def __init__(
+        self, dim: int = 128, ngram: int = 3, ngram_weight: float = 0.5
+    ) -> None:
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+        self.ngram = ngram
+        self.ngram_weight = ngram_weight
+        self.name = f"hashing-{dim}-{ngram}-{ngram_weight}"
+        self._features: Dict[str, Tuple[List[int], List[float]]] = {}
+
+    def _hash(self, feature: str, weight: float) -> Tuple[int, float]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        return h % self.dim, weight if h & 0x80000000 else -weight
+
+    def _word_features(self, word: str) -> Tuple[List[int], List[float]]:
+        """Columns and signed weights for one word, cached per distinct word."""
+        cached = self._features.get(word)
+        if cached is None:
+            pairs = [self._hash("w:" + word, 1.0)]
+            if self.ngram:
+                marked = f"#{word}#"
+                pairs += [
+                    self._hash("c:" + marked[i : i + self.ngram], self.ngram_weight)
+                    for i in range(max(1, len(marked) - self.ngram + 1))
+                ]
+            cached = ([c for c, _ in pairs], [v for _, v in pairs])
+            if len(self._features) < 1_000_000:
+                self._features[word] = cached
+        return cached
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a ``(len(texts), dim)`` float32 matrix of unit rows (zero rows for empty text)."""
+        rows: List[int] = []
+        cols: List[int] = []
+        vals: List[float] = []
+        for i, text in enumerate(texts):
+            for word in words(text):
+                c, v = self._word_features(word)
+                rows.extend([i] * len(c))
+                cols.extend(c)
+                vals.extend(v)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(
+            matrix,
+            (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)),
+            np.asarray(vals, dtype=np.float32),
+        )
+        return normalize(matrix)
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise rows in place, leaving zero rows as they are."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def load_embedder(spec: Any = None, dim: int = 128) -> Any:
+    """Build an embedder from config.
+
+    ``None`` or ``"hashing"`` gives ``HashingEmbedder(dim)``; a dict may set
+    ``type: hashing`` with its options, or ``factory: "module:callable"`` with
+    keyword arguments; a ``"module:callable"`` string is called with no
+    arguments; objects with an ``embed`` method are used as they are.
+    """
+    if spec is None or spec == "hashing":
+        return HashingEmbedder(dim)
+    if hasattr(spec, "embed"):
+        return spec
+    if isinstance(spec, str):
+        return _import(spec)()
+    if isinstance(spec, dict):
+        options = dict(spec)
+        factory = options.pop("factory", None)
+        if factory is not None:
+            return _import(factory)(**options)
+        if options.pop("type", "hashing") != "hashing":
+            raise ValueError("embedder type must be 'hashing' or a factory path")
+        options.setdefault("dim", dim)
+        return HashingEmbedder(**options)
+    raise TypeError(
+        "embedder must be 'hashing', a 'module:callable' path, a dict or an embedder object"
+    )
+
+
+def _import(path: str) -> Any:
+    module, _, attr = path.partition(":")
+    if not attr:
+        raise ValueError(f"Expected 'module:callable', got {path!r}")
+    return getattr(importlib.import_module(module), attr)
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``k`` best ``(scores, columns)`` of each row, best first."""
+    n = scores.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(scores.dtype), empty.astype(np.intp)
+    if k < n:
+        part = np.argpartition(scores, n - k, axis=1)[:, n - k :]
+    else:
+        part = np.broadcast_to(np.arange(n), scores.shape).copy()
+    picked = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-picked, axis=1, kind="stable")
+    return np.take_along_axis(picked, order, axis=1), np.take_along_axis(
+        part, order, axis=1
+    )
+
+
+def corpus_fingerprint(corpus: Iterable[str]) -> str:
+    """Cheap content hash identifying a corpus for cache validation."""
+    crc = 0
+    count = 0
+    for text in corpus:
+        crc = zlib.crc32(text.encode("utf-8") + b"\0", crc)
+        count += 1
+    return f"{count}:{crc:08x}"
+
+
+class DenseIndex:
+    """Exact inner-product search over a float32 ``(n, dim)`` matrix."""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        if vectors.ndim != 2 or vectors.dtype != np.float32:
+            raise ValueError("vectors must be a 2-D float32 matrix")
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    @classmethod
+    def build(
+        cls,
+        texts: Sequence[str],
+        embedder: Any,
+        path: Optional[str] = None,
+        batch_size: int = 8192,
+    ) -> "DenseIndex":
+        """Embed ``texts`` in batches, straight into a ``.npy`` memmap when ``path`` is set."""
+        shape = (len(texts), embedder.dim)
+        vectors: np.ndarray
+        if path is not None:
+            vectors = np.lib.format.open_memmap(
+                path, mode="w+", dtype=np.float32, shape=shape
+            )
+        else:
+            vectors = np.empty(shape, dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            vectors[start : start + batch_size] = embedder.embed(
+                texts[start : start + batch_size]
+            )
+        if isinstance(vectors, np.memmap):
+            vectors.flush()
+        return cls(vectors)
+
+    def save(self, path: str) -> None:
+        """Write the matrix as a ``.npy`` file."""
+        np.save(path, self.vectors)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "DenseIndex":
+        """Load a saved matrix, memory-mapped read-only by default."""
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def search(
+        self, queries: np.ndarray, k: int, extra: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``k`` best ``(scores, ids)`` per query row, best first.
+
+        ``extra`` is an optional ``(queries, n)`` matrix added to the inner
+        products (hybrid keyword scores).
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        n = len(self)
+        best_scores: List[np.ndarray] = []
+        best_ids: List[np.ndarray] = []
+        for start in range(0, n, BLOCK_ROWS):
+            stop = min(n, start + BLOCK_ROWS)
+            scores = queries @ self.vectors[start:stop].T
+            if extra is not None:
+                scores += extra[:, start:stop]
+            block_scores, block_ids = top_k(scores, k)
+            best_scores.append(block_scores)
+            best_ids.append(block_ids + start)
+        if not best_scores:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.intp)
+        if len(best_scores) == 1:
+            return best_scores[0], best_ids[0]
+        merged_scores, picked = top_k(np.hstack(best_scores), k)
+        return merged_scores, np.take_along_axis(np.hstack(best_ids), picked, axis=1)
+
+
+class KeywordIndex:
+    """Inverted index from words to the documents containing them."""
+
+    def __init__(self, corpus: Sequence[str]) -> None:
+        postings: Dict[str, List[int]] = {}
+        for i, text in enumerate(corpus):
+            for word in set(words(text)):
+                postings.setdefault(word, []).append(i)
+        self.size = len(corpus)
+        self.postings = {
+            word: np.asarray(ids, dtype=np.int32) for word, ids in postings.items()
+        }
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        """Return a ``(queries, n)`` float32 matrix: fraction of each query's words per document."""
+        matrix = np.zeros((len(queries), self.size), dtype=np.float32)
+        for row, query in enumerate(queries):
+            tokens = set(words(query))
+            for token in tokens:
+                ids = self.postings.get(token)
+                if ids is not None:
+                    matrix[row, ids] += 1.0 / len(tokens)
+        return matrix
+
+    def scores_for(self, query: str, ids: np.ndarray) -> np.ndarray:
+        """Return the keyword score of ``query`` for the documents ``ids`` only."""
+        result = np.zeros(len(ids), dtype=np.float32)
+        tokens = set(words(query))
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is not None:
+                found = np.searchsorted(postings, ids).clip(max=len(postings) - 1)
+                result += (postings[found] == ids) / len(tokens)
+        return result
+
+
+class DenseRetriever:
+    """Embeds a corpus once and answers dense or hybrid top-k queries.
+
+    Options (the ``retrieval`` config block): ``mode`` (``dense`` or
+    ``hybrid``), ``top_k``, ``embedder``, ``dim``, ``cache_path`` (``.npy``
+    file reused while the corpus and embedder match), ``keyword_weight``
+    (hybrid share of the keyword score, default 0.3) and ``min_score``.
+
+    ``index: ivfpq`` searches an approximate ``ann.IVFPQIndex`` instead of
+    scoring every document, tuned by ``nlist``, ``m``, ``nprobe`` (default
+    8) and ``refine`` (default 4, 0 skips exact re-ranking) and cached at
+    ``index_path`` (``.npz`` is appended if missing). Hybrid scoring then
+    applies to the ANN candidates.
+    """
+
+    def __init__(self, corpus: Sequence[str], options: Dict[str, Any]) -> None:
+        self.corpus = corpus
+        self.mode = options.get("mode", "dense")
+        self.top_k = int(options.get("top_k", 10))
+        self.min_score = float(options.get("min_score", 0.0))
+        self.keyword_weight = (
+            float(options.get("keyword_weight", 0.3)) if self.mode == "hybrid" else 0.0
+        )
+        if not 0.0 <= self.keyword_weight <= 1.0:
+            raise ValueError("keyword_weight must be between 0 and 1")
+        index_type = options.get("index", "exact")
+        if index_type not in INDEX_TYPES:
+            raise ValueError(
+                f"retrieval.index must be one of {INDEX_TYPES}, got {index_type!r}"
+            )
+        self.nprobe = int(options.get("nprobe", 8))
+        self.refine = int(options.get("refine", 4))
+        self.embedder = load_embedder(
+            options.get("embedder"), dim=int(options.get("dim", 128))
+        )
+        self._meta = {
+            "embedder": getattr(self.embedder, "name", type(self.embedder).__name__),
+            "dim": self.embedder.dim,
+            "corpus": corpus_fingerprint(self.corpus),
+        }
+        self.index = self._open_index(options.get("cache_path"))
+        self.ann = self._open_ann(options) if index_type == "ivfpq" else None
+        self.keywords = KeywordIndex(corpus) if self.mode == "hybrid" else None
+
+    def _open_index(self, cache_path: Optional[str]) -> DenseIndex:
+        """Load the cached matrix if it matches this corpus and embedder, else build it."""
+        if cache_path is None:
+            return DenseIndex.build(self.corpus, self.embedder)
+        meta = self._meta
+        meta_path = cache_path + ".json"
+        if os.path.exists(cache_path) and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                if json.load(f) == meta:
+                    return DenseIndex.load(cache_path)
+        # Drop the stale meta first and build beside the cache, so a crash or a
+        # concurrent reader never sees a half-written matrix under valid meta
+        try:
+            os.unlink(meta_path)
+        except FileNotFoundError:
+            pass
+        directory = os.path.dirname(os.path.abspath(cache_path))
+        with tempfile.NamedTemporaryFile(
+            dir=directory, suffix=".npy.tmp", delete=False
+        ) as tmp:
+            tmp_path = tmp.name
+        try:
+            index = DenseIndex.build(self.corpus, self.embedder, path=tmp_path)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False
+        ) as out:
+            json.dump(meta, out)
+        os.replace(out.name, meta_path)
+        return index
+
+    def _open_ann(self, options: Dict[str, Any]) -> Any:
+        """Load the saved ANN index if it was built for this corpus and settings, else build it."""
+        # Deferred so exact-search retrievers never import the ANN module
+        from .ann import IVFPQIndex
+
+        meta = dict(self._meta, nlist=options.get("nlist"), m=int(options.get("m", 16)))
+        path = options.get("index_path")
+        if path is not None and not path.endswith(".npz"):
+            path += ".npz"  # where NumPy has always put it
+        if path is not None and os.path.exists(path):
+            index = IVFPQIndex.load(path)
+            if index.meta == meta:
+                return index
+        index = IVFPQIndex.build(
+            self.index.vectors, nlist=meta["nlist"], m=meta["m"], meta=meta
+        )
+        if path is not None:
+            index.save(path)
+        return index
+
+    def search(
+        self, queries: Sequence[str], k: Optional[int] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """Return ``[(doc_index, score), ...]`` best first for each query."""
+        k = self.top_k if k is None else k
+        vectors = self.embedder.embed(queries)
+        if self.keywords is not None:
+            vectors *= 1.0 - self.keyword_weight
+        if self.ann is not None:
+            bonus = None
+            if self.keywords is not None:
+                keywords, weight = self.keywords, self.keyword_weight
+
+                def bonus(row: int, ids: np.ndarray) -> np.ndarray:
+                    return weight * keywords.scores_for(queries[row], ids)
+
+            exact = self.index.vectors if self.refine else None
+            scores, ids = self.ann.search(
+                vectors, k, self.nprobe, exact, self.refine, bonus
+            )
+        else:
+            extra = None
+            if self.keywords is not None:
+                extra = self.keywords.scores(queries)
+                extra *= self.keyword_weight
+            scores, ids = self.index.search(vectors, k, extra)
+        return [
+            [
+                (int(i), float(s))
+                for s, i in zip(row_scores, row_ids)
+                if s > self.min_score
+            ]
+            for row_scores, row_ids in zip(scores, ids)
+        ]
@@ -0,0 +1,182 @@
+"""Local HTTP callback listener for webhook-driven render completion."""
+
+import json
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class RenderCallbackServer:
+    """Receive fal queue webhooks and resolve futures keyed by request ID.
+
+    Completions are buffered, so a webhook that arrives before anyone asked
+    for its request ID is still delivered. Waiting on a render therefore costs
+    no polling traffic, however many renders are outstanding. Unclaimed
+    completions are dropped after ``buffer_ttl`` seconds, and at most
+    ``max_buffered`` are kept, so late or unknown callbacks cannot pile up.
+    """
+
+    CALLBACK_PATH = "/callbacks/veo3"
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        public_url: Optional[str] = None,
+        buffer_ttl: float = 600.0,
+        max_buffered: int = 1024,
+    ) -> None:
+        """Bind the listener; ``port=0`` picks a free ephemeral port."""
+        self._futures: Dict[str, Future[Dict[str, Any]]] = {}
+        self._buffered: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.buffer_ttl = buffer_ttl
+        self.max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.public_url = public_url.rstrip("/") if public_url else None
+
+    @property
+    def address(self) -> str:
+        """Return the local ``http://host:port`` the listener is bound to."""
+        host, port = self._httpd.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    @property
+    def callback_url(self) -> str:
+        """Return the URL to hand to the provider as the webhook target."""
+        return f"{self.public_url or self.address}{self.CALLBACK_PATH}"
+
+    def start(self) -> "RenderCallbackServer":
+        """Start serving in a background daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, name="render-callbacks", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the listener and cancel any futures still waiting."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+            self._buffered.clear()
+
+    def expect(self, request_id: str) -> "Future[Dict[str, Any]]":
+        """Return the future resolved when ``request_id`` completes.
+
+        The future stays registered until ``wait_for`` returns or ``discard``
+        is called.
+        """
+        with self._lock:
+            future = self._futures.get(request_id)
+            if future is None:
+                future = Future()
+                buffered = self._buffered.pop(request_id, None)
+                if buffered is not None:
+                    future.set_result(buffered[1])
+                self._futures[request_id] = future
+            return future
+
+    def discard(self, request_id: str) -> None:
+        """Stop waiting for ``request_id`` and forget its future."""
+        with self._lock:
+            future = self._futures.pop(request_id, None)
+        if future is not None:
+            future.cancel()
+
+    def wait_for(
+        self, request_id: str, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Block until the completion for ``request_id`` arrives.
+
+        Returns the webhook body, or ``None`` if ``timeout`` elapses first.
+        """
+        future = self.expect(request_id)
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+        finally:
+            with self._lock:
+                if self._futures.get(request_id) is future:
+                    del self._futures[request_id]
+
+    def pending(self) -> int:
+        """Return the number of request IDs with unresolved futures."""
+        with self._lock:
+            return sum(1 for future in self._futures.values() if not future.done())
+
+    def _resolve(self, body: Dict[str, Any]) -> bool:
+        """Resolve the future for a webhook body; return False if unusable."""
+        request_id = body.get("request_id")
+        if not request_id:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            future = self._futures.get(str(request_id))
+            if future is None:
+                # Nobody is waiting yet: buffer it, dropping expired and oldest entries
+                for key, (received, _) in list(self._buffered.items()):
+                    if now - received > self.buffer_ttl:
+                        del self._buffered[key]
+                while self._buffered and len(self._buffered) >= self.max_buffered:
+                    del self._buffered[next(iter(self._buffered))]
+                self._buffered[str(request_id)] = (now, body)
+                return True
+        if not future.done():
+            future.set_result(body)
+        return True
+
+    def buffered(self) -> int:
+        """Return the number of completions received before anyone waited for them."""
+        with self._lock:
+            return len(self._buffered)
+
+    def _make_handler(self) -> type:
+        """Build a request handler class bound to this server."""
+        server = self
+
+        class _CallbackHandler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?", 1)[0] != server.CALLBACK_PATH:
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self.send_error(400, "invalid JSON")
+                    return
+                if not isinstance(body, dict) or not server._resolve(body):
+                    self.send_error(400, "missing request_id")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: Any) -> None:
+                """Silence the default per-request stderr logging."""
+
+        return _CallbackHandler
+
+
+def render_video_url(completion: Dict[str, Any]) -> Optional[str]:
+    """Extract the video URL from a fal webhook body, if the render succeeded."""
+    if str(completion.get("status", "")).upper() not in ("OK", "COMPLETED"):
+        return None
+    payload = completion.get("payload") or {}
+    url = (payload.get("video") or {}).get("url")
+    return url if isinstance(url, str) else None
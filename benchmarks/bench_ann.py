@@ -0,0 +1,105 @@
+"""Recall@10 versus query throughput of the IVF-PQ index against exact search.
+
+Each ``ann.n=<size>.nprobe=<p>.refine=<r>`` entry is one operating point; the
+``ann.n=<size>.exact`` entry is the brute-force baseline. Recall counts a
+returned document as correct when its exact score ties or beats the exact
+10th best, since generated corpora contain many equal-scoring documents.
+"""
+
+import functools
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from agents.ann import IVFPQIndex
+from agents.vector_search import DenseIndex, HashingEmbedder
+
+from .common import make_corpus
+
+SIZES = [100_000, 1_000_000]
+QUICK_SIZES = [100_000]
+
+NPROBES = [1, 2, 4, 8, 16, 32, 64]
+QUICK_NPROBES = [1, 8, 32]
+
+K = 10
+QUERY_COUNT = 200
+
+T = TypeVar("T")
+
+
+def recall(
+    index: DenseIndex, queries: np.ndarray, ids: np.ndarray, kth: np.ndarray
+) -> float:
+    """Tie-aware recall@K of ``ids`` against the exact ``kth`` best scores."""
+    found = np.einsum("qkd,qd->qk", index.vectors[np.clip(ids, 0, None)], queries)
+    return float(((found >= kth[:, None] - 1e-5) & (ids >= 0)).mean())
+
+
+def timed(fn: Callable[[], T]) -> Tuple[float, T]:
+    """Seconds taken by ``fn()``, and its result."""
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def ann_ids(
+    ann: IVFPQIndex,
+    queries: np.ndarray,
+    nprobe: int,
+    exact: Optional[np.ndarray],
+    refine: int,
+) -> np.ndarray:
+    """Top-K ids for each query, searched one at a time."""
+    return np.array(
+        [ann.search(q[None, :], K, nprobe, exact, refine)[1][0] for q in queries]
+    )
+
+
+def bench_ann(size: int, nprobes: List[int]) -> Dict[str, Dict[str, float]]:
+    """Build both indexes over ``size`` documents and sweep ``nprobe``."""
+    embedder = HashingEmbedder()
+    exact = DenseIndex.build(make_corpus(size), embedder)
+    queries = embedder.embed(make_corpus(QUERY_COUNT, seed=99, words=3))
+
+    results: Dict[str, Dict[str, float]] = {}
+    t0 = time.perf_counter()
+    ann = IVFPQIndex.build(exact.vectors)
+    build_s = time.perf_counter() - t0
+
+    # One query at a time, as SearchAgent.run issues them
+    truth = [exact.search(q[None, :], K) for q in queries]
+    elapsed, _ = timed(lambda: [exact.search(q[None, :], K) for q in queries])
+    kth = np.array([scores[0, -1] for scores, _ in truth])
+    results[f"ann.n={size}.exact"] = {
+        "throughput_qps": len(queries) / elapsed,
+        "recall": 1.0,
+    }
+
+    for nprobe in nprobes:
+        for refine in (0, 4):
+            elapsed, found = timed(
+                functools.partial(
+                    ann_ids,
+                    ann,
+                    queries,
+                    nprobe,
+                    exact.vectors if refine else None,
+                    refine,
+                )
+            )
+            results[f"ann.n={size}.nprobe={nprobe}.refine={refine}"] = {
+                "throughput_qps": len(queries) / elapsed,
+                "recall": recall(exact, queries, found, kth),
+            }
+    results[f"ann.n={size}.build"] = {"build_ms": build_s * 1000}
+    return results
+
+
+def collect(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Run the recall/throughput sweep for each corpus size."""
+    results = {}
+    for size in QUICK_SIZES if quick else SIZES:
+        results.update(bench_ann(size, QUICK_NPROBES if quick else NPROBES))
+    return results
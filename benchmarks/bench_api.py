@@ -0,0 +1,86 @@
+"""APIAgent throughput against a local stub HTTP server."""
+
+import contextlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator
+
+from agents.api_agent import APIAgent
+
+from .common import measure
+
+PAYLOAD = json.dumps({"id": 1, "title": "stub", "body": "x" * 256}).encode()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answer every GET/POST with a small fixed JSON document."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+
+@contextlib.contextmanager
+def stub_server() -> Iterator[str]:
+    """Serve the stub on an ephemeral localhost port and yield its base URL."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def collect(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Run sequential and threaded APIAgent benchmarks."""
+    iterations = 200 if quick else 2000
+    threads = 8
+    results = {}
+    with stub_server() as base_url:
+        agent = APIAgent({"base_url": base_url, "instrumentation": False})
+        results["api.get.sequential"] = measure(
+            lambda: agent.run(method="GET", endpoint="/posts/1"), iterations, warmup=10
+        )
+        agent.close()
+
+        agents = [
+            APIAgent({"base_url": base_url, "instrumentation": False})
+            for _ in range(threads)
+        ]
+        per_thread = iterations // threads
+
+        def worker(a: APIAgent) -> None:
+            for _ in range(per_thread):
+                a.run(method="GET", endpoint="/posts/1")
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(worker, agents))
+        elapsed = time.perf_counter() - t0
+        results[f"api.get.threads={threads}"] = {
+            "throughput_qps": per_thread * threads / elapsed
+        }
+        for a in agents:
+            a.close()
+    return results
@@ -0,0 +1,161 @@
+"""SearchAgent and AsyncSearchAgent latency and throughput by corpus size."""
+
+import asyncio
+import itertools
+import time
+from typing import Any, Callable, Dict
+
+from agents.async_search_agent import AsyncSearchAgent
+from agents.bridge import get_background_loop
+from agents.search_agent import SearchAgent
+from agents.sharded_search import ShardedSearchAgent
+
+from .common import iterations_for, latency_stats, make_corpus, measure
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+QUICK_SIZES = [10, 1_000, 10_000]
+
+# Every item costs an awaited sleep, so large async corpora take minutes
+ASYNC_SIZES = [10, 100, 1_000]
+QUICK_ASYNC_SIZES = [10, 100]
+
+# Batched throughput, inline versus sharded over a warm process pool
+PROCESS_SIZES = [100_000, 1_000_000]
+QUICK_PROCESS_SIZES = [100_000]
+
+# Dense/hybrid retrieval over a NumPy embedding matrix (index build not timed)
+DENSE_SIZES = [10_000, 100_000, 1_000_000]
+QUICK_DENSE_SIZES = [10_000, 100_000]
+
+# Scatter-gather over local shard servers, by shard count
+SHARDED_SIZES = [100_000, 1_000_000]
+QUICK_SHARDED_SIZES = [100_000]
+SHARD_COUNTS = [1, 2, 4]
+
+QUERIES = ["agent python", "vector index", "video pipeline", "nomatch"]
+
+
+def querying(run: Callable[..., Any]) -> Callable[[], Any]:
+    """Return a no-argument call of ``run`` that cycles through ``QUERIES``."""
+    queries = itertools.cycle(QUERIES)
+    return lambda: run(query=next(queries))
+
+
+def bench_sync(size: int) -> Dict[str, float]:
+    """Measure SearchAgent.run over a corpus of ``size`` documents."""
+    agent = SearchAgent({"corpus": make_corpus(size), "instrumentation": False})
+    queries = iter(QUERIES * 100_000)
+    return measure(lambda: agent.run(query=next(queries)), iterations_for(size))
+
+
+def bench_async(size: int) -> Dict[str, float]:
+    """Measure AsyncSearchAgent.run latency and concurrent throughput."""
+    agent = AsyncSearchAgent(
+        {
+            "corpus": make_corpus(size),
+            "concurrent_searches": 100,
+            "instrumentation": False,
+        }
+    )
+    iterations = 5
+
+    async def main() -> Dict[str, float]:
+        samples = []
+        for i in range(iterations):
+            t0 = time.perf_counter()
+            await agent.run(query=QUERIES[i % len(QUERIES)])
+            samples.append(time.perf_counter() - t0)
+        stats = latency_stats(samples)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(agent.run(query=q) for q in QUERIES))
+        stats["throughput_qps"] = len(QUERIES) / (time.perf_counter() - t0)
+        return stats
+
+    return asyncio.run(main())
+
+
+def bench_process(size: int) -> Dict[str, float]:
+    """Measure run_many throughput inline and on one worker per core (see ``meta.cpus``)."""
+    corpus = make_corpus(size)
+    queries = QUERIES * 8
+    stats: Dict[str, float] = {}
+    for mode in ("inline", "process"):
+        agent = SearchAgent(
+            {
+                "corpus": corpus,
+                "execution": {"mode": mode, "min_shard_size": 0},
+                "instrumentation": False,
+            }
+        )
+        try:
+            agent.warmup()
+            t0 = time.perf_counter()
+            agent.run_many(queries)
+            stats[f"{mode}_throughput_qps"] = len(queries) / (time.perf_counter() - t0)
+        finally:
+            agent.close()
+    return stats
+
+
+def bench_dense(size: int) -> Dict[str, float]:
+    """Measure dense and hybrid run latency plus batched run_many throughput."""
+    corpus = make_corpus(size)
+    stats: Dict[str, float] = {}
+    for mode in ("dense", "hybrid"):
+        agent = SearchAgent(
+            {"corpus": corpus, "retrieval": {"mode": mode}, "instrumentation": False}
+        )
+        agent.warmup()
+        for name, value in measure(
+            querying(agent.run), iterations_for(size, high=200)
+        ).items():
+            stats[f"{mode}_{name}"] = value
+        batch = QUERIES * 8
+        t0 = time.perf_counter()
+        agent.run_many(batch)
+        stats[f"{mode}_batch_throughput_qps"] = len(batch) / (time.perf_counter() - t0)
+        agent.close()
+    return stats
+
+
+def bench_sharded(size: int) -> Dict[str, float]:
+    """Measure ShardedSearchAgent latency and batched throughput for 1, 2 and 4 local shards."""
+    corpus = make_corpus(size)
+    loop = get_background_loop()
+    stats: Dict[str, float] = {}
+    for shards in SHARD_COUNTS:
+        agent = ShardedSearchAgent(
+            {
+                "corpus": corpus,
+                "local_shards": shards,
+                "shard_timeout": 30,
+                "instrumentation": False,
+            }
+        )
+        with agent:
+            latency = measure(querying(agent.run_sync), iterations_for(size, high=200))
+            stats[f"shards={shards}_p50_ms"] = latency["p50_ms"]
+            batch = QUERIES * 8
+            t0 = time.perf_counter()
+            loop.run(agent.run_many(batch))
+            stats[f"shards={shards}_batch_throughput_qps"] = len(batch) / (
+                time.perf_counter() - t0
+            )
+    return stats
+
+
+def collect(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Run all search benchmarks."""
+    results = {}
+    for size in QUICK_SIZES if quick else SIZES:
+        results[f"search.sync.n={size}"] = bench_sync(size)
+    for size in QUICK_ASYNC_SIZES if quick else ASYNC_SIZES:
+        results[f"search.async.n={size}"] = bench_async(size)
+    for size in QUICK_PROCESS_SIZES if quick else PROCESS_SIZES:
+        results[f"search.process.n={size}"] = bench_process(size)
+    for size in QUICK_SHARDED_SIZES if quick else SHARDED_SIZES:
+        results[f"search.sharded.n={size}"] = bench_sharded(size)
+    for size in QUICK_DENSE_SIZES if quick else DENSE_SIZES:
+        results[f"search.dense.n={size}"] = bench_dense(size)
+    return results
@@ -0,0 +1,46 @@
+"""Import and CLI startup time, measured in fresh interpreters."""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "startup.python": [sys.executable, "-c", "pass"],
+    "startup.import_agents": [sys.executable, "-c", "import agents"],
+    "startup.cli_help": [sys.executable, "main.py", "--help"],
+    "startup.cli_search": [
+        sys.executable,
+        "main.py",
+        "--agent",
+        "search",
+        "--query",
+        "agents",
+    ],
+}
+
+
+def _time_command(command: List[str], repeat: int) -> Dict[str, float]:
+    """Return the best and median wall time of ``command`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(
+            command,
+            cwd=ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {"min_ms": samples[0], "p50_ms": samples[len(samples) // 2]}
+
+
+def collect(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Time interpreter startup, package import and CLI invocations."""
+    repeat = 3 if quick else 10
+    return {name: _time_command(cmd, repeat) for name, cmd in COMMANDS.items()}
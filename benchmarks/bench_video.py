@@ -0,0 +1,144 @@
+"""SocialMediaVideoAgent pipeline overhead with mocked providers.
+
+The ``replayed`` benchmarks run the real HTTP path against a recorded
+cassette (``cassettes/social_video.json``) with its provider timings scaled
+down, sequentially and as a threaded load test. The ``stubbed`` ones drive
+the pipeline over real local HTTP against ``agents.stub_providers``, with
+renders completed by webhook.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from unittest.mock import Mock, patch
+
+from agents.social_media_video_agent import SocialMediaVideoAgent
+from agents.stub_providers import StubProviderServer
+
+from .common import measure, quiet
+
+CASSETTE = os.path.join(os.path.dirname(__file__), "cassettes", "social_video.json")
+
+# Recorded provider timings total ~11 s per run; replay them at 1%
+LATENCY_SCALE = 0.01
+
+CONCEPT = '{"Caption": "Wow #viral", "Idea": "Robot chef", "Environment": "Kitchen", "Status": "for production"}'
+
+
+def _response(data: Dict[str, Any]) -> Mock:
+    response = Mock()
+    response.status_code = 200
+    response.json.return_value = data
+    return response
+
+
+def _fake_post(url: str, **kwargs: Any) -> Mock:
+    """Answer each provider endpoint the pipeline calls."""
+    if "openai" in url:
+        return _response(
+            {
+                "choices": [{"message": {"content": CONCEPT}}],
+                "usage": {"total_tokens": 100},
+            }
+        )
+    if "fal" in url:
+        return _response({"request_id": "req-1"})
+    if url.endswith("/media"):
+        return _response({"url": "https://blotato.example/media.mp4"})
+    return _response({"id": "post-1"})
+
+
+def _fake_get(url: str, **kwargs: Any) -> Mock:
+    return _response(
+        {"status": "completed", "video": {"url": "https://fal.example/video.mp4"}}
+    )
+
+
+def collect(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Measure end-to-end pipeline overhead with zero provider latency."""
+    iterations = 50 if quick else 500
+    platforms = ["instagram", "youtube", "tiktok", "facebook"]
+    config = {
+        "video_wait_time": 0,
+        "social_accounts": {f"{p}_id": p for p in platforms},
+    }
+    results = {}
+    with quiet(), patch(
+        "agents.social_media_video_agent.requests.post", side_effect=_fake_post
+    ), patch("agents.social_media_video_agent.requests.get", side_effect=_fake_get):
+        agent = SocialMediaVideoAgent(config)
+        results["video.pipeline.mocked"] = measure(
+            lambda: agent.run(topic="robots", platforms=platforms), iterations
+        )
+        checkpointed = SocialMediaVideoAgent({**config, "checkpoint_path": ":memory:"})
+        results["video.pipeline.mocked_checkpointed"] = measure(
+            lambda: checkpointed.run(topic="robots", platforms=platforms), iterations
+        )
+    results.update(replayed(quick))
+    results.update(stubbed(quick))
+    return results
+
+
+def replayed(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Measure the pipeline over replayed provider traffic with recorded latency."""
+    iterations = 5 if quick else 20
+    threads = 8
+    platforms = ["instagram", "youtube", "tiktok", "facebook"]
+    agent = SocialMediaVideoAgent(
+        {
+            "video_wait_time": 0,
+            "social_accounts": {f"{p}_id": p for p in platforms},
+            "cassette": {
+                "path": CASSETTE,
+                "mode": "replay",
+                "latency": "recorded",
+                "latency_scale": LATENCY_SCALE,
+            },
+        }
+    )
+    run = lambda: agent.run(topic="robots", platforms=platforms)  # noqa: E731
+    results = {"video.pipeline.replayed": measure(run, iterations)}
+
+    with ThreadPoolExecutor(threads) as pool:
+        t0 = time.perf_counter()
+        list(pool.map(lambda _: run(), range(iterations * threads)))
+        elapsed = time.perf_counter() - t0
+    results["video.pipeline.replayed_threads"] = {
+        "throughput_qps": iterations * threads / elapsed
+    }
+    agent.close()
+    return results
+
+
+def stubbed(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Load-test the pipeline against the local stub providers."""
+    iterations = 5 if quick else 20
+    threads = 8
+    platforms = ["instagram", "youtube", "tiktok", "facebook"]
+    behaviour = {"latency": 0.005}
+    stub_config = {
+        "openai": behaviour,
+        "blotato": behaviour,
+        "fal": {**behaviour, "render_seconds": 0.02},
+    }
+    with quiet(), StubProviderServer(stub_config, seed=1) as stub:
+        agent = SocialMediaVideoAgent(
+            {
+                **stub.agent_config(),
+                "video_wait_time": 10,
+                "use_webhooks": True,
+                "social_accounts": {f"{p}_id": p for p in platforms},
+            }
+        )
+        run = lambda: agent.run(topic="robots", platforms=platforms)  # noqa: E731
+        results = {"video.pipeline.stubbed": measure(run, iterations)}
+        with ThreadPoolExecutor(threads) as pool:
+            t0 = time.perf_counter()
+            list(pool.map(lambda _: run(), range(iterations * threads)))
+            elapsed = time.perf_counter() - t0
+        results["video.pipeline.stubbed_threads"] = {
+            "throughput_qps": iterations * threads / elapsed
+        }
+        agent.close()
+    return results
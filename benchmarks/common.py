@@ -0,0 +1,91 @@
+"""Shared helpers for the benchmark modules."""
+
+import contextlib
+import io
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
+VOCABULARY = [
+    "agent",
+    "agents",
+    "python",
+    "async",
+    "search",
+    "index",
+    "vector",
+    "query",
+    "pipeline",
+    "video",
+    "social",
+    "media",
+    "token",
+    "cache",
+    "queue",
+    "worker",
+    "latency",
+    "throughput",
+    "scalable",
+    "lightweight",
+    "event",
+    "driven",
+    "orchestration",
+    "autonomous",
+    "testing",
+    "patterns",
+    "concurrent",
+    "model",
+]
+
+
+def make_corpus(size: int, seed: int = 1234, words: int = 8) -> List[str]:
+    """Build a deterministic synthetic corpus of ``size`` short documents."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(VOCABULARY, k=words)) for _ in range(size)]
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    """Summarise per-call durations (seconds) as millisecond percentiles."""
+    ordered = sorted(samples)
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+def measure(
+    fn: Callable[[], Any], iterations: int, warmup: int = 1
+) -> Dict[str, float]:
+    """Time ``fn`` repeatedly; return latency percentiles and throughput."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    stats = latency_stats(samples)
+    stats["throughput_qps"] = iterations / elapsed if elapsed else 0.0
+    return stats
+
+
+def iterations_for(
+    size: int, budget: int = 2_000_000, low: int = 5, high: int = 2000
+) -> int:
+    """Pick a repeat count so each size costs roughly the same total work."""
+    return max(low, min(high, budget // max(size, 1)))
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """Silence stdout from agents that print progress."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
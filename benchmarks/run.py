@@ -0,0 +1,141 @@
+"""Run the benchmark suite, store results as JSON and check for regressions.
+
+Usage::
+
+    python -m benchmarks.run --quick --output bench.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+
+Exits with status 1 when any metric regresses by more than ``--threshold``
+(a fraction) relative to the baseline.
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+Results = Dict[str, Dict[str, float]]
+
+SUITES = {
+    "search": "benchmarks.bench_search",
+    "ann": "benchmarks.bench_ann",
+    "api": "benchmarks.bench_api",
+    "video": "benchmarks.bench_video",
+    "startup": "benchmarks.bench_startup",
+}
+
+# Metric suffixes where a larger value is an improvement; all others are costs
+HIGHER_IS_BETTER = ("_qps", "_per_s", "recall")
+
+
+def run_suites(names: List[str], quick: bool = False) -> Results:
+    """Import and run the named suites, merging their results."""
+    results: Results = {}
+    for name in names:
+        module = importlib.import_module(SUITES[name])
+        collect: Callable[[bool], Results] = module.collect
+        print(f"running {name} benchmarks...", file=sys.stderr)
+        results.update(collect(quick))
+    return results
+
+
+def compare(
+    current: Results, baseline: Results, threshold: float
+) -> List[Dict[str, Any]]:
+    """Return metrics that are worse than ``baseline`` by more than ``threshold``.
+
+    Benchmarks or metrics missing on either side are ignored.
+    """
+    regressions = []
+    for bench, metrics in sorted(current.items()):
+        for metric, value in sorted(metrics.items()):
+            base = baseline.get(bench, {}).get(metric)
+            if not base:
+                continue
+            higher_is_better = metric.endswith(HIGHER_IS_BETTER)
+            change = (
+                (base - value) / base if higher_is_better else (value - base) / base
+            )
+            if change > threshold:
+                regressions.append(
+                    {
+                        "benchmark": bench,
+                        "metric": metric,
+                        "baseline": base,
+                        "current": value,
+                        "regression": change,
+                    }
+                )
+    return regressions
+
+
+def load_results(path: str) -> Results:
+    """Read the ``results`` section of a saved benchmark file."""
+    with open(path, encoding="utf-8") as f:
+        results: Results = json.load(f)["results"]
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Run SmallAgents benchmarks")
+    parser.add_argument(
+        "--suite",
+        nargs="+",
+        choices=sorted(SUITES),
+        default=sorted(SUITES),
+        help="Suites to run (default: all)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Smaller sizes and fewer iterations"
+    )
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument(
+        "--baseline", help="Compare against a previously saved results file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed regression as a fraction (default: 0.2 = 20%%)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suites(args.suite, quick=args.quick)
+    document = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    text = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['benchmark']} {r['metric']}: "
+                f"{r['baseline']:.4g} -> {r['current']:.4g} ({r['regression']:+.0%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+        print("no regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
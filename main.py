@@ -1,60 +1,261 @@
-"""CLI entrypoint for running SmallAgents examples."""
+"""CLI entrypoint for running SmallAgents examples.
 
-import argparse
-from typing import Any, Dict
+Agent modules (and their dependencies such as ``requests``) are imported
+only once an agent is selected, through ``agents.registry``, so short-lived
+invocations stay fast.
+"""
 
-import yaml
+import argparse
+import sys
+from typing import Any, Dict, List, Optional
 
-from agents.search_agent import SearchAgent
-from agents.api_agent import APIAgent
-from agents.social_media_video_agent import SocialMediaVideoAgent
+from agents import profiling, registry, tracing
 
 
 def load_config(path: str = "config.yaml") -> Dict[str, Any]:
     """Load configuration from YAML file."""
     try:
-        with open(path, encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+        f = open(path, encoding="utf-8")
     except FileNotFoundError:
         return {}
+    import yaml
+
+    with f:
+        return yaml.safe_load(f) or {}
+
+
+def add_tracing_args(parser: argparse.ArgumentParser) -> None:
+    """Add the --trace/--otlp-endpoint options."""
+    parser.add_argument("--trace", metavar="FILE", help="Append tracing spans to FILE as JSON lines")
+    parser.add_argument("--otlp-endpoint", help="Send spans to an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces")
+
+
+def setup_tracing(args: argparse.Namespace) -> None:
+    """Enable tracing from options or SMALLAGENTS_TRACE_FILE/SMALLAGENTS_OTLP_ENDPOINT."""
+    exporters = tracing.exporters_from_options(args.trace, args.otlp_endpoint)
+    if exporters:
+        tracing.configure(exporters)
+
+
+def add_logging_args(parser: argparse.ArgumentParser) -> None:
+    """Add the --log-level/--log-sample-rate options."""
+    parser.add_argument("--log-level", help="Agent log level (default: SMALLAGENTS_LOG_LEVEL or INFO)")
+    parser.add_argument(
+        "--log-sample-rate", type=float, help="Fraction of per-item log lines to keep (default: 1.0)"
+    )
+
+
+def setup_logging(args: argparse.Namespace, force: bool = True) -> None:
+    """Write agent logs to stderr as JSON lines from a background thread.
+
+    Without ``force`` this is skipped unless the loaded agent modules log
+    at all, which keeps ``logging`` off the short search path.
+    """
+    if not (force or args.log_level or "agents.log" in sys.modules):
+        return
+    from agents import log
+
+    log.configure(level=args.log_level, sample_rate=args.log_sample_rate)
+
+
+def add_profiling_args(parser: argparse.ArgumentParser) -> None:
+    """Add the --profile/--profile-dir options."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        metavar="MODES",
+        help="Profile agent runs; comma-separated cprofile, tracemalloc, sample (default: cprofile)",
+    )
+    parser.add_argument("--profile-dir", default="profiles", help="Directory for profile dumps")
+
+
+def setup_profiling(args: argparse.Namespace) -> profiling.ProfileSettings:
+    """Enable process-wide profiling if --profile was given; return the settings used."""
+    settings = profiling.ProfileSettings(args.profile or "cprofile", output_dir=args.profile_dir)
+    if args.profile:
+        profiling.enable_all(settings)
+    return settings
+
+
+def serve(argv: List[str]) -> None:
+    """Run ``main.py serve``: keep agents warm behind an HTTP server."""
+    import signal
+
+    from agents.server import AgentServer, build_agents
+
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Serve SmallAgents over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--config", default="config.yaml", help="Configuration file path")
+    parser.add_argument(
+        "--agents",
+        nargs="+",
+        choices=registry.available(),
+        default=["search", "async-search", "api"],
+        help="Agents to serve",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=64, help="In-flight requests per agent")
+    parser.add_argument("--max-pending", type=int, default=1024, help="Queued requests per agent before 503")
+    parser.add_argument("--max-batch", type=int, default=32, help="Largest coalesced query batch (1 disables)")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="How long to wait to fill a batch")
+    add_tracing_args(parser)
+    add_logging_args(parser)
+    add_profiling_args(parser)
+    args = parser.parse_args(argv)
+    setup_tracing(args)
+    setup_logging(args)
+    settings = setup_profiling(args)
+    if hasattr(signal, "SIGUSR1"):
+        # kill -USR1 <pid> toggles profiling of a running server
+        profiling.install_signal_handler(signal.SIGUSR1, settings)
+
+    server = AgentServer(
+        build_agents(args.agents, load_config(args.config)),
+        max_concurrency=args.max_concurrency,
+        max_pending=args.max_pending,
+        max_batch=args.max_batch,
+        batch_window=args.batch_window_ms / 1000,
+    )
+    server.serve(host=args.host, port=args.port)
+
+
+def run_batch_cli(agent: Any, args: argparse.Namespace) -> None:
+    """Stream ``--input`` lines through ``agent`` into ``--output`` as JSONL."""
+    from agents.batch import run_batch
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run_batch(
+            agent,
+            source,
+            sink,
+            workers=args.workers,
+            ordered=not args.unordered,
+            field=registry.get_spec(args.agent).input_field,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(
+        f"Processed {stats['processed']} inputs ({stats['errors']} errors) in {stats['elapsed']:.2f}s",
+        file=sys.stderr,
+    )
+
+
+def run_api(agent: Any, args: argparse.Namespace) -> None:
+    """Example API call."""
+    out = agent.run(method="GET", endpoint="/posts/1")
+    print(out)
+
+
+def run_social_video(agent: Any, args: argparse.Namespace) -> None:
+    """Run, queue or work the social video pipeline."""
+    platforms = args.platforms or ["instagram", "youtube"]
+
+    if args.enqueue or args.worker or args.drain:
+        from agents.job_queue import JobQueue
+
+        queue = JobQueue(args.queue)
+        if args.enqueue:
+            job_id = agent.enqueue_run(queue, topic=args.query, platforms=platforms, priority=args.priority)
+            print(f"📥 Queued job {job_id} in {args.queue}")
+        if args.worker:
+            agent.create_worker(queue).run_forever()
+        elif args.drain:
+            agent.create_worker(queue).run_until_idle()
+            print(f"📊 Queue: {queue.stats()}")
+        return
+
+    out = agent.run(topic=args.query, platforms=platforms, run_id=args.run_id)
+    print(f"✅ Posted to {out.get('successful_posts', 0)}/{out.get('total_platforms', 0)} platforms")
+    print(f"🎬 Video: {out.get('steps', {}).get('video_url', 'N/A')}")
+    print(f"🔖 Run ID: {out.get('run_id')}")
 
 
-def main() -> None:
+def run_default(agent: Any, args: argparse.Namespace) -> None:
+    """Pass ``--query`` as the agent's input field; works for plugin agents too."""
+    run = getattr(agent, "run_sync", agent.run)
+    out = run(**{registry.get_spec(args.agent).input_field: args.query})
+    print(out)
+
+
+# Agents whose CLI run needs more than their input field
+CLI_HANDLERS = {"api": run_api, "social-video": run_social_video}
+
+
+def list_agents() -> None:
+    """Print registered and discovered agents without importing them."""
+    for meta in registry.describe():
+        origin = meta["distribution"] or "built-in"
+        print(f"{meta['name']:<16} {meta['target']:<56} {origin}  {meta['description']}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main CLI entry point."""
-    parser = argparse.ArgumentParser(description="Run an example SmallAgent")
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        serve(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Run an example SmallAgent",
+        epilog="Use 'main.py serve --help' to run agents behind an HTTP server.",
+    )
     parser.add_argument(
-        "--agent", 
-        choices=["search", "api", "social-video"], 
+        "--agent",
+        choices=registry.available(),
         default="search",
-        help="Type of agent to run"
+        help="Type of agent to run (built-in or installed plugin)"
     )
+    parser.add_argument("--list-agents", action="store_true", help="List available agents and exit")
     parser.add_argument("--query", default="example", help="Query or topic for the agent")
     parser.add_argument("--config", default="config.yaml", help="Configuration file path")
     parser.add_argument("--platforms", nargs="+", help="Social media platforms (for social-video agent)")
-    args = parser.parse_args()
+    parser.add_argument("--run-id", help="Resume a checkpointed run (for social-video agent)")
+    parser.add_argument("--enqueue", action="store_true", help="Queue the run instead of executing it (for social-video agent)")
+    parser.add_argument("--worker", action="store_true", help="Run queue workers until interrupted (for social-video agent)")
+    parser.add_argument("--drain", action="store_true", help="Run queue workers until the queue is empty (for social-video agent)")
+    parser.add_argument("--queue", default="social_video_jobs.db", help="Job queue database path (for social-video agent)")
+    parser.add_argument("--priority", type=int, default=0, help="Priority of queued jobs; higher runs first")
+    parser.add_argument("--input", help="Run every line of FILE ('-' for stdin) as a query and write JSONL")
+    parser.add_argument("--output", default="-", help="JSONL output file for --input (default: stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel runs for --input")
+    parser.add_argument("--unordered", action="store_true", help="Write --input results as they finish")
+    add_tracing_args(parser)
+    add_logging_args(parser)
+    add_profiling_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.list_agents:
+        list_agents()
+        return
+
+    setup_tracing(args)
+    setup_profiling(args)
+    try:
+        run_cli(args)
+    finally:
+        tracing.TRACER.shutdown()  # flushes pending spans
+        for path in profiling.written_files():
+            print(f"Profile written: {path}", file=sys.stderr)
+
+
+def run_cli(args: argparse.Namespace) -> None:
+    """Create the selected agent and run it once or over ``--input``."""
 
     config = load_config(args.config)
+    agent = registry.create(args.agent, config)
+    setup_logging(args, force=False)
+
+    if args.input:
+        run_batch_cli(agent, args)
+        return
 
-    if args.agent == "search":
-        agent_cfg = config.get("agents", {}).get("search", {})
-        agent = SearchAgent(agent_cfg)
-        out = agent.run(query=args.query)
-        print(out)
-        
-    elif args.agent == "api":
-        agent_cfg = config.get("agents", {}).get("api", {})
-        agent = APIAgent(agent_cfg)
-        # Example API call
-        out = agent.run(method="GET", endpoint="/posts/1")
-        print(out)
-        
-    elif args.agent == "social-video":
-        agent_cfg = config.get("agents", {}).get("social_video", {})
-        agent = SocialMediaVideoAgent(agent_cfg)
-        platforms = args.platforms or ["instagram", "youtube"]
-        out = agent.run(topic=args.query, platforms=platforms)
-        print(f"✅ Posted to {out.get('successful_posts', 0)}/{out.get('total_platforms', 0)} platforms")
-        print(f"🎬 Video: {out.get('steps', {}).get('video_url', 'N/A')}")
+    CLI_HANDLERS.get(args.agent, run_default)(agent, args)
 
 
 if __name__ == "__main__":
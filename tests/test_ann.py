@@ -0,0 +1,131 @@
+"""Tests for the IVF-PQ approximate nearest-neighbour index."""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents.ann import IVFPQIndex, kmeans  # noqa: E402
+from agents.search_agent import SearchAgent  # noqa: E402
+from agents.vector_search import DenseIndex, normalize  # noqa: E402
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+
+@pytest.fixture(scope="module")
+def vectors() -> "ndarray":
+    """2,000 unit vectors around 20 cluster centres."""
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((20, 32))
+    points = centres[rng.integers(0, 20, 2000)] + 0.3 * rng.standard_normal((2000, 32))
+    return normalize(points.astype(np.float32))
+
+
+def recall_at(ids: "ndarray", expected: "ndarray") -> float:
+    """Fraction of the exact top-k found."""
+    return float(
+        np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(ids, expected)])
+    )
+
+
+class TestIVFPQIndex:
+    """Test cases for IVFPQIndex."""
+
+    def test_recall_grows_with_nprobe(self, vectors: "ndarray") -> None:
+        """Test probing every list with exact re-ranking recovers the exact top-k."""
+        index = IVFPQIndex.build(vectors, nlist=16, m=8)
+        queries = vectors[:50]
+        _, expected = DenseIndex(vectors).search(queries, 10)
+
+        low = recall_at(index.search(queries, 10, nprobe=1)[1], expected)
+        full = recall_at(
+            index.search(queries, 10, nprobe=16, exact=vectors, refine=20)[1], expected
+        )
+        assert low < full
+        assert full == pytest.approx(1.0)
+        assert len(index) == 2000 and sorted(index.order) == list(range(2000))
+
+    def test_save_and_load_round_trip(self, vectors: "ndarray", tmp_path: Path) -> None:
+        """Test a loaded index answers exactly like the one saved."""
+        index = IVFPQIndex.build(vectors, nlist=8, m=4, meta={"corpus": "x"})
+        path = str(tmp_path / "index.npz")
+        index.save(path)
+        loaded = IVFPQIndex.load(path)
+
+        assert loaded.meta == {"corpus": "x"}
+        for got, want in zip(
+            loaded.search(vectors[:5], 5, nprobe=2),
+            index.search(vectors[:5], 5, nprobe=2),
+        ):
+            assert np.array_equal(got, want)
+
+        index.save(path)  # replaced in place, with no temp file left behind
+        assert [p.name for p in tmp_path.iterdir()] == ["index.npz"]
+        with pytest.raises(ValueError, match=".npz"):
+            index.save(str(tmp_path / "index"))
+
+    def test_short_lists_are_padded(self, vectors: "ndarray") -> None:
+        """Test queries with fewer candidates than k get -1 ids."""
+        index = IVFPQIndex.build(vectors[:40], nlist=8, m=4)
+        scores, ids = index.search(vectors[:1], 30, nprobe=1)
+        assert (ids[0] == -1).any() and np.isneginf(scores[0][ids[0] == -1]).all()
+
+    def test_invalid_parameters(self, vectors: "ndarray") -> None:
+        """Test m must divide the dimension and kmeans handles k > rows."""
+        with pytest.raises(ValueError, match="must divide"):
+            IVFPQIndex.build(vectors, m=5)
+        assert kmeans(vectors[:3], 5, iters=2).shape == (5, 32)
+
+
+class TestSearchAgentANN:
+    """Test cases for SearchAgent with an approximate index."""
+
+    CORPUS = [
+        f"document {i} about {topic}"
+        for i in range(200)
+        for topic in ("vector search", "video rendering", "agent orchestration")
+    ]
+
+    def test_ann_matches_exact_top_result(self, tmp_path: Path) -> None:
+        """Test ivfpq retrieval finds the same best documents and reuses its saved index."""
+        retrieval = {
+            "mode": "hybrid",
+            "index": "ivfpq",
+            "nlist": 8,
+            "nprobe": 8,
+            "index_path": str(tmp_path / "ann"),
+        }
+        exact = SearchAgent(
+            {"corpus": self.CORPUS, "retrieval": {"mode": "hybrid", "top_k": 3}}
+        )
+        approx = SearchAgent(
+            {"corpus": self.CORPUS, "retrieval": dict(retrieval, top_k=3)}
+        )
+
+        assert approx.run(query="video rendering")["scores"] == pytest.approx(
+            exact.run(query="video rendering")["scores"], abs=1e-5
+        )
+        built = approx._get_retriever().ann
+        with patch.object(
+            IVFPQIndex, "build", side_effect=AssertionError("index rebuilt")
+        ):
+            reloaded = (
+                SearchAgent({"corpus": self.CORPUS, "retrieval": retrieval})
+                ._get_retriever()
+                .ann
+            )
+        assert built is not None and reloaded is not None
+        assert np.array_equal(built.codes, reloaded.codes)
+        assert (tmp_path / "ann.npz").exists()
+
+    def test_unknown_index_type_rejected(self) -> None:
+        """Test an unknown retrieval.index fails when the index is built."""
+        agent = SearchAgent(
+            {"corpus": self.CORPUS, "retrieval": {"mode": "dense", "index": "hnsw"}}
+        )
+        with pytest.raises(ValueError, match="retrieval.index"):
+            agent.warmup()
@@ -125,3 +125,28 @@ class TestAsyncSearchAgent:
         # Test non-matching item
         result = await agent._async_search_item("no match", ["agents"])
         assert result is None
+
+    @pytest.mark.asyncio
+    async def test_run_stream_yields_hits_as_found(self) -> None:
+        """Test run_stream yields every match, then a done summary."""
+        agent = AsyncSearchAgent({"concurrent_searches": 2})
+        events = [event async for event in agent.run_stream(query="agent")]
+
+        hits = [e for e in events if e["event"] == "hit"]
+        assert sorted(e["text"] for e in hits) == sorted(
+            (await agent.run(query="agent"))["results"]
+        )
+        assert all(agent.corpus[e["index"]] == e["text"] for e in hits)
+        assert events[-1] == {
+            "event": "done",
+            "result": {"query": "agent", "result_count": len(hits)},
+        }
+
+    def test_run_stream_sync(self) -> None:
+        """Test the sync bridge stops early without leaving lookups running."""
+        agent = AsyncSearchAgent()
+        stream = agent.run_stream_sync(query="agent")
+        first = next(stream)
+        stream.close()
+        assert first["event"] == "hit"
+        assert [e["event"] for e in agent.run_stream_sync(query="")] == ["done"]
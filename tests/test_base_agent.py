@@ -1,3 +1,6 @@
+import asyncio
+from typing import Any, Dict, List
+
 from agents.base_agent import BaseAgent
 
 
@@ -17,3 +20,20 @@ def test_base_agent_run_not_implemented():
     except NotImplementedError:
         raised = True
     assert raised
+
+
+class EchoAgent(BaseAgent):
+    def run(self, value: Any = None) -> Dict[str, Any]:
+        return {"result": value}
+
+
+def test_base_agent_run_stream_defaults_to_one_done_event() -> None:
+    agent = EchoAgent()
+    assert list(agent.run_stream(value=1)) == [
+        {"event": "done", "result": {"result": 1}}
+    ]
+
+    async def collect() -> List[Dict[str, Any]]:
+        return [event async for event in agent.arun_stream(value=2)]
+
+    assert asyncio.run(collect()) == [{"event": "done", "result": {"result": 2}}]
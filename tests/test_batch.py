@@ -0,0 +1,129 @@
+"""Tests for the batch JSONL runner and CLI options."""
+
+import io
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from agents.async_search_agent import AsyncSearchAgent
+from agents.base_agent import BaseAgent
+from agents.batch import parse_line, run_batch
+from agents.search_agent import SearchAgent
+from main import main
+
+
+class DelayAgent(BaseAgent):
+    """Agent whose run time depends on the query, so completion order varies."""
+
+    def run(self, query: str = "") -> Dict[str, Any]:
+        time.sleep(0.05 if query.endswith("slow") else 0.001)
+        return {"query": query, "thread": threading.get_ident()}
+
+
+def records(text: str) -> List[Dict[str, Any]]:
+    """Parse JSONL output."""
+    return [json.loads(line) for line in text.splitlines()]
+
+
+class TestRunBatch:
+    """Test cases for run_batch."""
+
+    def test_parse_line(self) -> None:
+        """Test plain text, JSON objects and blank lines."""
+        assert parse_line("agents python\n") == {"query": "agents python"}
+        assert parse_line('{"query": "a", "extra": 1}') == {"query": "a", "extra": 1}
+        assert parse_line("  \n") is None
+        assert parse_line("posts/1", field="endpoint") == {"endpoint": "posts/1"}
+
+    def test_sequential_results_and_errors(self) -> None:
+        """Test each line yields one record and failures do not stop the batch."""
+        output = io.StringIO()
+        stats = run_batch(
+            SearchAgent(), ["agents\n", "\n", '{"query": 1}\n', "{oops\n"], output
+        )
+
+        out = records(output.getvalue())
+        assert [r["line"] for r in out] == [1, 3, 4]
+        assert out[0]["result"]["result_count"] == 2
+        assert out[1]["error"].startswith("TypeError")
+        assert out[2]["error"].startswith("JSONDecodeError")
+        assert stats["processed"] == 3 and stats["errors"] == 2
+
+    def test_parallel_ordered(self) -> None:
+        """Test ordered output matches input order despite varying run times."""
+        queries = [f"q{i}{'slow' if i % 3 == 0 else ''}" for i in range(30)]
+        output = io.StringIO()
+        run_batch(DelayAgent(), (q + "\n" for q in queries), output, workers=4)
+
+        out = records(output.getvalue())
+        assert [r["input"]["query"] for r in out] == queries
+        assert len({r["result"]["thread"] for r in out}) > 1
+
+    def test_parallel_unordered(self) -> None:
+        """Test unordered output contains every result, fast ones first."""
+        queries = ["aslow", "b", "c", "d"]
+        output = io.StringIO()
+        run_batch(DelayAgent(), queries, output, workers=4, ordered=False)
+
+        out = [r["input"]["query"] for r in records(output.getvalue())]
+        assert sorted(out) == sorted(queries)
+        assert out[-1] == "aslow"
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_bounded_read_ahead(self, ordered: bool) -> None:
+        """Test the input is consumed at most a few batches ahead of the output."""
+        output = io.StringIO()
+        read = 0
+        max_ahead = 0
+
+        def lines() -> Iterator[str]:
+            nonlocal read, max_ahead
+            for i in range(200):
+                read += 1
+                written = output.getvalue().count("\n")
+                max_ahead = max(max_ahead, read - written)
+                yield f"q{i}\n"
+
+        run_batch(DelayAgent(), lines(), output, workers=2, ordered=ordered)
+        assert output.getvalue().count("\n") == 200
+        assert max_ahead <= 2 * 4 + 1
+
+    def test_async_agent(self) -> None:
+        """Test async agents run through run_sync."""
+        output = io.StringIO()
+        run_batch(AsyncSearchAgent(), ["async\n", "python\n"], output, workers=2)
+        assert [r["result"]["query"] for r in records(output.getvalue())] == [
+            "async",
+            "python",
+        ]
+
+
+class TestBatchCLI:
+    """Test the --input/--output CLI options."""
+
+    def test_file_to_file(self, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+        """Test main.py streams an input file into a JSONL output file."""
+        source = tmp_path / "queries.txt"
+        source.write_text("agents\ntesting\n")
+        target = tmp_path / "results.jsonl"
+
+        main(
+            [
+                "--agent",
+                "search",
+                "--input",
+                str(source),
+                "--output",
+                str(target),
+                "--workers",
+                "2",
+            ]
+        )
+
+        out = records(target.read_text())
+        assert [r["input"]["query"] for r in out] == ["agents", "testing"]
+        assert "Processed 2 inputs (0 errors)" in capsys.readouterr().err
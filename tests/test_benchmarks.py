@@ -0,0 +1,50 @@
+"""Tests for the benchmark harness."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.common import iterations_for, make_corpus, measure
+from benchmarks.run import compare, main
+
+
+class TestBenchmarkHarness:
+    """Test cases for the benchmark runner and helpers."""
+
+    def test_compare_detects_regressions_by_direction(self) -> None:
+        """Test latency increases and throughput drops are both regressions."""
+        baseline = {"search": {"p50_ms": 10.0, "throughput_qps": 100.0}}
+        current = {"search": {"p50_ms": 13.0, "throughput_qps": 70.0}}
+
+        regressions = compare(current, baseline, threshold=0.2)
+
+        assert {r["metric"] for r in regressions} == {"p50_ms", "throughput_qps"}
+
+    def test_compare_ignores_improvements_and_unknown_metrics(self) -> None:
+        """Test faster results and new benchmarks never fail the comparison."""
+        baseline = {"search": {"p50_ms": 10.0, "throughput_qps": 100.0}}
+        current = {
+            "search": {"p50_ms": 5.0, "throughput_qps": 150.0},
+            "new": {"p50_ms": 1.0},
+        }
+        assert compare(current, baseline, threshold=0.2) == []
+
+    def test_main_writes_results_and_fails_on_regression(self, tmp_path: Path) -> None:
+        """Test the CLI stores JSON and exits non-zero on a regression."""
+        output = tmp_path / "current.json"
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"results": {"fake": {"p50_ms": 1.0}}}))
+
+        with patch("benchmarks.run.run_suites", return_value={"fake": {"p50_ms": 2.0}}):
+            status = main(["--output", str(output), "--baseline", str(baseline)])
+
+        assert status == 1
+        assert json.loads(output.read_text())["results"] == {"fake": {"p50_ms": 2.0}}
+
+    def test_helpers(self) -> None:
+        """Test corpus generation is deterministic and measure reports stats."""
+        assert make_corpus(5) == make_corpus(5)
+        assert len(make_corpus(5)) == 5
+        assert iterations_for(1_000_000) == 5
+        stats = measure(lambda: None, iterations=10)
+        assert set(stats) == {"p50_ms", "p95_ms", "mean_ms", "throughput_qps"}
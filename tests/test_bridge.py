@@ -0,0 +1,97 @@
+"""Tests for sync/async bridging between agent hierarchies."""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Any, Dict
+
+import pytest
+
+from agents.async_agent import AsyncBaseAgent
+from agents.async_search_agent import AsyncSearchAgent
+from agents.base_agent import BaseAgent
+from agents.bridge import get_background_loop, get_executor
+from agents.search_agent import SearchAgent
+
+
+class SleepAgent(BaseAgent):
+    """Sync agent that blocks for ``delay`` seconds."""
+
+    def run(self, delay: float = 0.1) -> Dict[str, Any]:
+        time.sleep(delay)
+        return {"thread": threading.get_ident()}
+
+
+class LoopAgent(AsyncBaseAgent):
+    """Async agent that reports the loop it ran on."""
+
+    async def run(self, value: Any = None) -> Dict[str, Any]:
+        await asyncio.sleep(0)
+        return {"value": value, "loop": id(asyncio.get_running_loop())}
+
+
+class TestSyncAgentArun:
+    """Test cases for BaseAgent.arun."""
+
+    @pytest.mark.asyncio
+    async def test_arun_returns_run_result(self) -> None:
+        """Test arun() returns what run() returns."""
+        agent = SearchAgent()
+        assert await agent.arun(query="agents") == SearchAgent().run(query="agents")
+
+    @pytest.mark.asyncio
+    async def test_arun_does_not_block_the_loop(self) -> None:
+        """Test blocking agents overlap instead of serializing on the loop."""
+        agent = SleepAgent()
+        start = time.perf_counter()
+        results = await asyncio.gather(*(agent.arun(delay=0.2) for _ in range(4)))
+        assert time.perf_counter() - start < 0.6
+        assert all(r["thread"] != threading.get_ident() for r in results)
+
+    @pytest.mark.asyncio
+    async def test_arun_is_instrumented(self) -> None:
+        """Test arun() goes through the timed run() wrapper."""
+        agent = SleepAgent()
+        await agent.arun(delay=0)
+        assert agent.info()["metrics"]["steps"]["run"]["count"] == 1
+
+    def test_executor_is_shared(self) -> None:
+        """Test the managed executor is created once per process."""
+        assert get_executor() is get_executor()
+
+
+class TestAsyncAgentRunSync:
+    """Test cases for AsyncBaseAgent.run_sync."""
+
+    def test_run_sync_returns_run_result(self) -> None:
+        """Test run_sync() returns what the coroutine returns."""
+        result = AsyncSearchAgent().run_sync(query="async")
+        assert result["query"] == "async"
+        assert result["result_count"] == 1
+
+    def test_run_sync_reuses_one_loop(self) -> None:
+        """Test repeated calls run on the same persistent loop."""
+        agent = LoopAgent()
+        loops = {agent.run_sync(value=i)["loop"] for i in range(5)}
+        assert loops == {id(get_background_loop().loop)}
+
+    def test_run_sync_from_background_loop_rejected(self) -> None:
+        """Test blocking on the background loop from its own thread fails fast."""
+
+        async def nested() -> Any:
+            return LoopAgent().run_sync()
+
+        with pytest.raises(RuntimeError, match="own thread"):
+            get_background_loop().run(nested())
+
+    def test_run_sync_timeout(self) -> None:
+        """Test run_sync() honours its timeout."""
+
+        class SlowAgent(AsyncBaseAgent):
+            async def run(self) -> Dict[str, Any]:
+                await asyncio.sleep(5)
+                return {}
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            SlowAgent().run_sync(timeout=0.05)
@@ -0,0 +1,188 @@
+"""Tests for the record/replay HTTP cassette transport."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+import requests
+
+from agents import cassette
+from agents.api_agent import APIAgent
+from agents.social_media_video_agent import SocialMediaVideoAgent
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    """Serve a JSON echo of the request path on localhost."""
+
+    class Echo(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = json.dumps({"path": self.path}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Echo)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def replay_session(
+    path: Path, latency: Any = None, sleeps: Any = None
+) -> requests.Session:
+    """Build a replaying session whose injected delays are collected instead of slept."""
+    adapter = cassette.CassetteAdapter(
+        cassette.Cassette(str(path)),
+        "replay",
+        cassette.latency_model(latency, seed=7),
+        sleep=sleeps.append if sleeps is not None else lambda s: None,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    return session
+
+
+class TestCassette:
+    """Test cases for agents.cassette."""
+
+    def test_record_then_replay_offline(self, server: str, tmp_path: Path) -> None:
+        """Test an APIAgent recording replays byte-for-byte with the server gone."""
+        path = tmp_path / "api.json"
+        recorder = APIAgent(
+            {"base_url": server, "cassette": {"path": str(path), "mode": "record"}}
+        )
+        recorded = recorder.run(endpoint="/posts/1")
+        recorder.close()
+        assert recorded["data"] == {"path": "/posts/1"}
+
+        data = json.loads(path.read_text())
+        assert data["interactions"][0]["request"]["url"] == f"{server}/posts/1"
+        assert data["interactions"][0]["elapsed"] > 0
+
+        session = replay_session(path)
+        response = session.get(f"{server}/posts/1")
+        assert response.status_code == 200
+        assert response.json() == {"path": "/posts/1"}
+        with pytest.raises(cassette.CassetteMiss):
+            session.get(f"{server}/posts/2")
+
+    def test_concurrent_recorders_never_leave_partial_files(
+        self, tmp_path: Path
+    ) -> None:
+        """Test two recorders on one file always leave a complete cassette behind."""
+        path = str(tmp_path / "shared.json")
+        recorders = [cassette.Cassette(path), cassette.Cassette(path)]
+        errors: List[BaseException] = []
+
+        def record(recorder: cassette.Cassette, name: str) -> None:
+            try:
+                for i in range(50):
+                    request = {
+                        "method": "GET",
+                        "url": f"http://x/{name}/{i}",
+                        "body": None,
+                    }
+                    recorder.record(
+                        request,
+                        {"status": 200, "headers": {}, "body": "x" * 2000},
+                        0.001,
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=record, args=(r, n))
+            for r, n in zip(recorders, "ab")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert [p.name for p in tmp_path.iterdir()] == ["shared.json"]
+        assert len(json.loads(Path(path).read_text())["interactions"]) == 50
+
+    def test_replay_miss_is_a_request_failure(self, tmp_path: Path) -> None:
+        """Test agents see a missing recording as a connection error."""
+        agent = APIAgent(
+            {
+                "base_url": "http://example.invalid",
+                "max_retries": 0,
+                "cassette": {"path": str(tmp_path / "empty.json")},
+            }
+        )
+        result = agent.run(endpoint="/x")
+        agent.close()
+        assert result["success"] is False
+        assert result["error_type"] == "CassetteMiss"
+
+    def test_latency_models(self, server: str, tmp_path: Path) -> None:
+        """Test fixed, recorded and seeded distribution latency injection."""
+        path = tmp_path / "api.json"
+        record = cassette.CassetteAdapter(cassette.Cassette(str(path)), "record")
+        session = requests.Session()
+        session.mount("http://", record)
+        session.get(f"{server}/a")
+        elapsed = json.loads(path.read_text())["interactions"][0]["elapsed"]
+
+        fixed: List[float] = []
+        replay_session(path, 0.25, fixed).get(f"{server}/a")
+        assert fixed == [0.25]
+
+        recorded: List[float] = []
+        replay_session(path, "recorded", recorded).get(f"{server}/a")
+        assert recorded == [elapsed]
+
+        first: List[float] = []
+        second: List[float] = []
+        spec = {"distribution": "lognormal", "median": 0.1, "sigma": 0.5}
+        for sleeps in (first, second):
+            session = replay_session(path, spec, sleeps)
+            for _ in range(3):
+                session.get(f"{server}/a")
+        assert first == second and len(set(first)) == 3
+
+        with pytest.raises(ValueError, match="distribution"):
+            cassette.latency_model({"distribution": "pareto"})
+
+    def test_video_pipeline_replays_in_order(self) -> None:
+        """Test the video agent replays end to end from the benchmark cassette, also after close()."""
+        platforms = ["instagram", "tiktok"]
+        agent = SocialMediaVideoAgent(
+            {
+                "video_wait_time": 0,
+                "social_accounts": {f"{p}_id": p for p in platforms},
+                "cassette": {
+                    "path": str(ROOT / "benchmarks" / "cassettes" / "social_video.json")
+                },
+            }
+        )
+        results = []
+        for _ in range(2):
+            results.append(agent.run(topic="robots", platforms=platforms))
+            agent.close()
+
+        for result in results:
+            assert result["success"] is True
+            assert (
+                result["steps"]["concept"]["Idea"]
+                == "Robot chef flips pancakes mid-air"
+            )
+            assert result["steps"]["veo3_prompt"].startswith("A chrome robot chef")
+            assert (
+                result["steps"]["video_url"] == "https://fal.media/files/robot-chef.mp4"
+            )
@@ -0,0 +1,58 @@
+"""Tests for CheckpointStore."""
+
+from pathlib import Path
+
+from agents.checkpoint import CheckpointStore, open_checkpoint_store
+
+
+class TestCheckpointStore:
+    """Test cases for CheckpointStore."""
+
+    def test_save_and_load_steps_and_posts(self) -> None:
+        """Test steps and posts round-trip through the store."""
+        store = CheckpointStore()
+        store.save_step("run-1", "concept", {"Idea": "Robot chef"})
+        store.save_step("run-1", "video_url", "https://example.com/video.mp4")
+        store.save_post("run-1", "instagram", {"success": True})
+
+        state = store.load("run-1")
+
+        assert state["steps"]["concept"] == {"Idea": "Robot chef"}
+        assert state["steps"]["video_url"] == "https://example.com/video.mp4"
+        assert state["social_posts"]["instagram"] == {"success": True}
+
+    def test_load_unknown_run_is_empty(self) -> None:
+        """Test loading a run that was never saved."""
+        store = CheckpointStore()
+        assert store.load("missing") == {"steps": {}, "social_posts": {}}
+
+    def test_save_overwrites_and_discard_removes(self) -> None:
+        """Test later saves replace earlier ones and discard drops a step."""
+        store = CheckpointStore()
+        store.save_post("run-1", "youtube", {"success": False})
+        store.save_post("run-1", "youtube", {"success": True})
+        store.save_step("run-1", "request_id", "req-1")
+        store.discard_step("run-1", "request_id")
+
+        state = store.load("run-1")
+
+        assert state["social_posts"]["youtube"] == {"success": True}
+        assert "request_id" not in state["steps"]
+
+    def test_persists_to_disk_and_clear(self, tmp_path: Path) -> None:
+        """Test a file-backed store survives reopening and can be cleared."""
+        path = str(tmp_path / "checkpoints.db")
+        store = CheckpointStore(path)
+        store.save_step("run-1", "veo3_prompt", "A prompt")
+        store.close()
+
+        reopened = CheckpointStore(path)
+        assert reopened.load("run-1")["steps"]["veo3_prompt"] == "A prompt"
+
+        reopened.clear("run-1")
+        assert reopened.load("run-1")["steps"] == {}
+
+    def test_open_checkpoint_store_disabled(self) -> None:
+        """Test checkpointing is disabled without a path."""
+        assert open_checkpoint_store(None) is None
+        assert open_checkpoint_store("") is None
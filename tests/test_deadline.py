@@ -0,0 +1,186 @@
+"""Tests for per-call deadlines and cooperative cancellation."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents import deadline
+from agents.api_agent import APIAgent
+from agents.async_search_agent import AsyncSearchAgent
+from agents.base_agent import BaseAgent
+from agents.deadline import Cancelled, Deadline, DeadlineExceeded
+from agents.orchestrator import Orchestrator
+from agents.search_agent import SearchAgent
+from agents.social_media_video_agent import SocialMediaVideoAgent
+
+
+class DeadlineProbe(BaseAgent):
+    """Sync agent reporting the deadline it runs under."""
+
+    def run(self, **kwargs: Any) -> Dict[str, Any]:
+        current = deadline.current_deadline()
+        return {"kwargs": kwargs, "remaining": current.remaining() if current else None}
+
+
+@pytest.fixture
+def slow_server() -> Iterator[str]:
+    """Serve JSON responses that take one second."""
+
+    class Slow(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            time.sleep(1.0)
+            try:
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+            except OSError:
+                pass
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Slow)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestDeadline:
+    """Test cases for the Deadline token."""
+
+    def test_timeouts_and_checks(self) -> None:
+        """Test I/O timeouts are capped and waits that can't fit raise at once."""
+        d = Deadline(0.5)
+        capped = d.timeout(30)
+        assert capped is not None and 0.4 < capped <= 0.5
+        assert d.timeout(0.1) == 0.1
+        assert Deadline().timeout(30) == 30
+
+        t0 = time.perf_counter()
+        with pytest.raises(DeadlineExceeded, match="left before the deadline"):
+            d.sleep(5)
+        assert time.perf_counter() - t0 < 0.1
+
+        expired = Deadline(0)
+        assert expired.expired
+        with pytest.raises(DeadlineExceeded):
+            expired.check()
+        with pytest.raises(ValueError):
+            Deadline(-1)
+
+    def test_cancel_wakes_sleepers_and_children(self) -> None:
+        """Test cancel() from another thread interrupts a sleep and cancels children."""
+        parent = Deadline()
+        child = parent.child(10)
+        assert child.remaining() is not None and parent.remaining() is None
+        threading.Timer(0.05, parent.cancel, args=("shutting down",)).start()
+
+        t0 = time.perf_counter()
+        with pytest.raises(Cancelled, match="shutting down"):
+            child.sleep(5)
+        assert time.perf_counter() - t0 < 1.0
+        assert child.cancelled and not isinstance(Cancelled(), DeadlineExceeded)
+
+    def test_run_accepts_deadline(self) -> None:
+        """Test every run() takes a deadline, made current and not passed on."""
+        probe = DeadlineProbe()
+        result = probe.run(x=1, deadline=5)
+        assert result["kwargs"] == {"x": 1}
+        assert 4 < result["remaining"] <= 5
+        assert probe.run()["remaining"] is None
+
+        with pytest.raises(DeadlineExceeded):
+            SearchAgent().run(query="agents", deadline=0)  # type: ignore[call-arg]
+        with pytest.raises(TypeError, match="deadline"):
+            probe.run(deadline="soon")
+
+    def test_nested_deadline_only_tightens(self) -> None:
+        """Test a looser inner deadline is bounded by the outer one."""
+        outer = Deadline(1)
+        with deadline.scope(outer):
+            inner = DeadlineProbe().run(deadline=60)
+        assert inner["remaining"] <= 1
+
+    def test_async_run_cancels_gathered_tasks(self) -> None:
+        """Test an async search is abandoned when its deadline passes."""
+        agent = AsyncSearchAgent({"concurrent_searches": 1})
+
+        # Eight 10 ms items run one at a time, so 25 ms is not enough
+        with pytest.raises(DeadlineExceeded):
+            agent.run_sync(query="agent", deadline=0.025)
+
+        token = Deadline()
+        threading.Timer(0.02, token.cancel).start()
+        with pytest.raises(Cancelled):
+            agent.run_sync(query="agent", deadline=token)
+
+    def test_api_agent_gives_up_on_slow_server(self, slow_server: str) -> None:
+        """Test the HTTP timeout and retries are bounded by the deadline."""
+        agent = APIAgent({"base_url": slow_server, "timeout": 30, "max_retries": 3})
+
+        t0 = time.perf_counter()
+        result = agent.run(endpoint="/slow", deadline=0.2)
+        elapsed = time.perf_counter() - t0
+        agent.close()
+
+        assert result["success"] is False
+        assert result["error_type"] == "DeadlineExceeded"
+        assert elapsed < 0.6
+
+    @patch("agents.social_media_video_agent.time.sleep")
+    @patch("agents.social_media_video_agent.requests.post")
+    def test_video_render_wait_is_abandoned(
+        self, mock_post: Mock, mock_sleep: Mock
+    ) -> None:
+        """Test a render wait longer than the deadline fails fast without sleeping."""
+        response = Mock(status_code=200)
+        response.json.side_effect = [
+            {
+                "choices": [
+                    {
+                        "message": {
+                            "content": '{"Caption": "c", "Idea": "i", "Environment": "e"}'
+                        }
+                    }
+                ]
+            },
+            {"choices": [{"message": {"content": "prompt"}}]},
+            {"request_id": "req-1"},
+        ]
+        mock_post.return_value = response
+        agent = SocialMediaVideoAgent({"video_wait_time": 300})
+
+        t0 = time.perf_counter()
+        result = agent.run(topic="robots", deadline=5)  # type: ignore[call-arg]
+
+        assert time.perf_counter() - t0 < 1.0
+        assert result["cancelled"] is True
+        assert "left before the deadline" in result["error"]
+        assert mock_post.call_args.kwargs["timeout"] <= 5
+        mock_sleep.assert_not_called()
+
+    def test_orchestrator_reports_unfinished_nodes(self) -> None:
+        """Test nodes still running at the deadline are cancelled and reported."""
+        orch = Orchestrator()
+        orch.add("fast", SearchAgent(), kwargs={"query": "agents"})
+        orch.add(
+            "slow",
+            AsyncSearchAgent({"concurrent_searches": 1}),
+            kwargs={"query": "agent"},
+        )
+        orch.add("after", DeadlineProbe(), depends_on=["slow"])
+
+        result = orch.run(deadline=0.03)
+
+        assert result["success"] is False
+        assert "fast" in result["outputs"]
+        assert result["errors"]["slow"].startswith("DeadlineExceeded")
+        assert set(result["errors"]) == {"slow", "after"}
@@ -0,0 +1,235 @@
+"""Tests for the agent instrumentation layer."""
+
+import asyncio
+import timeit
+from typing import Any, AsyncGenerator, Dict, Generator
+
+import pytest
+
+from agents import deadline
+from agents.async_agent import AsyncBaseAgent
+from agents.base_agent import BaseAgent
+from agents.instrumentation import LatencyHistogram, Metrics, render_prometheus
+from agents.search_agent import SearchAgent
+
+
+class EchoAgent(BaseAgent):
+    """Agent that echoes its input, optionally failing."""
+
+    def run(self, value: Any = None, fail: bool = False) -> Dict[str, Any]:
+        with self.step("echo"):
+            if fail:
+                raise ValueError("boom")
+        self.count("echoes")
+        return {"result": value}
+
+
+class AsyncEchoAgent(AsyncBaseAgent):
+    """Async agent that echoes its input."""
+
+    async def run(self, value: Any = None) -> Dict[str, Any]:
+        return {"result": value, "success": value is not None}
+
+
+class LoudEchoAgent(EchoAgent):
+    """Subclass whose run() delegates to the parent's."""
+
+    def run(self, value: Any = None, fail: bool = False) -> Dict[str, Any]:
+        return super().run(str(value).upper(), fail)
+
+
+class AsyncLoudEchoAgent(AsyncEchoAgent):
+    """Async subclass whose run() delegates to the parent's."""
+
+    async def run(self, value: Any = None) -> Dict[str, Any]:
+        return await super().run(value)
+
+
+class StreamingAgent(BaseAgent):
+    """Agent whose stream reports the deadline current while each event is made."""
+
+    def run(self) -> Dict[str, Any]:
+        return {}
+
+    def run_stream(self, events: int = 2) -> Generator[Dict[str, Any], None, None]:
+        for i in range(events):
+            yield {
+                "event": "step",
+                "index": i,
+                "remaining": deadline.remaining_timeout(None),
+            }
+        yield {"event": "done", "result": {"success": True}}
+
+
+class AsyncStreamingAgent(AsyncBaseAgent):
+    """Async agent whose stream can stall between events."""
+
+    async def run(self) -> Dict[str, Any]:
+        return {}
+
+    async def run_stream(
+        self, pause: float = 0.0
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        yield {"event": "step"}
+        await asyncio.sleep(pause)
+        yield {"event": "done", "result": {"success": True}}
+
+
+class TestLatencyHistogram:
+    """Test cases for LatencyHistogram."""
+
+    def test_percentiles(self) -> None:
+        """Test percentile estimates land in the right bucket."""
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.001)
+        for _ in range(10):
+            histogram.observe(0.1)
+
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert 0.0005 < summary["p50"] <= 0.001
+        assert 0.06 < summary["p99"] <= 0.1
+        assert summary["max"] == 0.1
+
+    def test_empty(self) -> None:
+        """Test an empty histogram reports zeros."""
+        assert LatencyHistogram().summary()["p95"] == 0.0
+
+
+class TestAgentInstrumentation:
+    """Test the instrumentation surface on the base classes."""
+
+    def test_run_and_steps_are_timed(self) -> None:
+        """Test run() and named steps are recorded with counters."""
+        agent = EchoAgent()
+        agent.run("a")
+        agent.run("b")
+        with pytest.raises(ValueError):
+            agent.run(fail=True)
+
+        metrics = agent.info()["metrics"]
+        assert metrics["steps"]["run"]["count"] == 3
+        assert metrics["steps"]["run"]["errors"] == 1
+        assert metrics["steps"]["run"]["error_rate"] == pytest.approx(1 / 3)
+        assert metrics["steps"]["echo"]["count"] == 3
+        assert metrics["counters"] == {"echoes": 2}
+
+    def test_existing_agents_are_instrumented(self) -> None:
+        """Test concrete agents get run() and sub-step timings for free."""
+        agent = SearchAgent()
+        agent.run(query="agents")
+        steps = agent.info()["metrics"]["steps"]
+        assert steps["run"]["count"] == 1
+        assert steps["search"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_run_is_timed(self) -> None:
+        """Test async run() is timed and failed results count as errors."""
+        agent = AsyncEchoAgent()
+        await agent.run("x")
+        await agent.run(None)
+        run = agent.info()["metrics"]["steps"]["run"]
+        assert run["count"] == 2
+        assert run["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_super_run_is_timed_once(self) -> None:
+        """Test an override calling super().run() records a single run."""
+        agent = LoudEchoAgent()
+        assert agent.run("a") == {"result": "A"}
+        assert agent.info()["metrics"]["steps"]["run"]["count"] == 1
+
+        async_agent = AsyncLoudEchoAgent()
+        await async_agent.run("a")
+        assert async_agent.info()["metrics"]["steps"]["run"]["count"] == 1
+        assert EchoAgent().run("a") == {"result": "a"}
+
+    def test_stream_is_timed_under_its_deadline(self) -> None:
+        """Test run_stream() is timed once and its deadline is current only inside it."""
+        agent = StreamingAgent()
+        events = list(agent.run_stream(deadline=5.0))  # type: ignore[call-arg]
+        assert [e["event"] for e in events] == ["step", "step", "done"]
+        assert all(0 < e["remaining"] <= 5.0 for e in events[:2])
+
+        stream = agent.run_stream(deadline=5.0)  # type: ignore[call-arg]
+        next(stream)
+        assert deadline.current_deadline() is None
+        stream.close()
+        assert agent.info()["metrics"]["steps"]["run_stream"]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_async_stream_stops_at_its_deadline(self) -> None:
+        """Test arun_stream() and an async run_stream() are cut off by the deadline."""
+        agent = AsyncStreamingAgent()
+        with pytest.raises(deadline.DeadlineExceeded):
+            async for _ in agent.run_stream(pause=5.0, deadline=0.05):  # type: ignore[call-arg]
+                pass
+        run_stream = agent.info()["metrics"]["steps"]["run_stream"]
+        assert run_stream["count"] == 1
+        assert run_stream["errors"] == 1
+
+        sync_agent = StreamingAgent()
+        events = [e async for e in sync_agent.arun_stream(events=1, deadline=5.0)]
+        assert events[0]["remaining"] is not None
+        assert sync_agent.info()["metrics"]["steps"]["run_stream"]["count"] == 1
+
+    def test_disabled(self) -> None:
+        """Test disabling instrumentation records nothing."""
+        agent = EchoAgent({"instrumentation": False})
+        assert agent.run("a") == {"result": "a"}
+        assert agent.metrics is None
+        assert agent.metrics_snapshot() is None
+        assert "metrics" not in agent.info()
+
+    def test_disabled_overhead_under_a_microsecond(self) -> None:
+        """Test the disabled run() wrapper costs well under a microsecond."""
+
+        class Bare:
+            def run(self) -> Dict[str, Any]:
+                return {}
+
+        class Wrapped(BaseAgent):
+            def run(self) -> Dict[str, Any]:
+                return {}
+
+        bare = Bare()
+        wrapped = Wrapped({"instrumentation": False})
+        n = 20000
+        bare_time = min(timeit.repeat(bare.run, number=n, repeat=5)) / n
+        wrapped_time = min(timeit.repeat(wrapped.run, number=n, repeat=5)) / n
+        assert wrapped_time - bare_time < 1e-6
+
+
+class TestPrometheusExport:
+    """Test the Prometheus text exposition."""
+
+    def test_render(self) -> None:
+        """Test histogram, error and counter families are rendered."""
+        metrics = Metrics("EchoAgent")
+        metrics.observe("run", 0.002)
+        metrics.observe("run", 0.5, error=True)
+        metrics.incr("echoes", 2)
+
+        text = metrics.to_prometheus()
+
+        assert "# TYPE smallagents_step_duration_seconds histogram" in text
+        assert (
+            'smallagents_step_duration_seconds_bucket{agent="EchoAgent",step="run",le="+Inf"} 2'
+            in text
+        )
+        assert (
+            'smallagents_step_duration_seconds_count{agent="EchoAgent",step="run"} 2'
+            in text
+        )
+        assert 'smallagents_step_errors_total{agent="EchoAgent",step="run"} 1' in text
+        assert 'smallagents_events_total{agent="EchoAgent",name="echoes"} 2' in text
+
+    def test_render_many_agents_once_per_family(self) -> None:
+        """Test several registries share one HELP/TYPE header per family."""
+        first, second = Metrics("A"), Metrics("B")
+        first.observe("run", 0.01)
+        second.observe("run", 0.01)
+        text = render_prometheus([first, second])
+        assert text.count("# TYPE smallagents_step_duration_seconds histogram") == 1
+        assert 'agent="A"' in text and 'agent="B"' in text
@@ -0,0 +1,283 @@
+"""Tests for JobQueue and JobRunner."""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents.job_queue import JobQueue, JobRunner, RetryLater
+from agents.quota import RateLimitedError
+from agents.social_media_video_agent import SocialMediaVideoAgent
+
+
+class TestJobQueue:
+    """Test cases for JobQueue."""
+
+    def test_claims_by_priority_then_fifo(self) -> None:
+        """Test higher-priority jobs are claimed first, FIFO within a priority."""
+        queue = JobQueue()
+        low = queue.enqueue("stage", {"n": 1})
+        high = queue.enqueue("stage", {"n": 2}, priority=5)
+        low2 = queue.enqueue("stage", {"n": 3})
+
+        claimed = [queue.claim("stage")["id"] for _ in range(3)]  # type: ignore[index]
+
+        assert claimed == [high, low, low2]
+        assert queue.claim("stage") is None
+
+    def test_claim_is_scoped_to_stage(self) -> None:
+        """Test workers only see jobs for their own stage."""
+        queue = JobQueue()
+        queue.enqueue("render", {})
+        assert queue.claim("publish") is None
+        assert queue.claim("render") is not None
+
+    def test_expired_lease_is_reclaimed(self) -> None:
+        """Test a job becomes claimable again after its visibility timeout."""
+        queue = JobQueue()
+        job_id = queue.enqueue("stage", {})
+        first = queue.claim("stage", visibility_timeout=0)
+        second = queue.claim("stage", visibility_timeout=60)
+
+        assert first is not None and second is not None
+        assert second["id"] == job_id
+        assert second["attempts"] == 2
+        # The original worker lost its lease and cannot complete the job
+        assert queue.complete(first, {"done": True}) is False
+        assert queue.complete(second, {"done": True}) is True
+
+    def test_fail_retries_with_backoff_then_gives_up(self) -> None:
+        """Test failures are delayed by backoff and stop at max_attempts."""
+        queue = JobQueue()
+        job_id = queue.enqueue("stage", {}, max_attempts=2)
+
+        job = queue.claim("stage")
+        assert job is not None
+        queue.fail(job, "boom", backoff=60)
+        assert queue.claim("stage") is None  # still backing off
+
+        queue.fail(job, "ignored")  # stale token is a no-op
+        with patch("agents.job_queue.time.time", return_value=10**10):
+            job = queue.claim("stage")
+        assert job is not None
+        queue.fail(job, "boom again")
+
+        state = queue.get(job_id)
+        assert state is not None
+        assert state["status"] == "failed"
+        assert state["error"] == "boom again"
+
+    def test_complete_hands_off_to_next_stage(self) -> None:
+        """Test completing a job atomically enqueues the next stage."""
+        queue = JobQueue()
+        queue.enqueue("first", {"n": 1}, priority=3)
+        job = queue.claim("first")
+        assert job is not None
+        queue.complete(job, {"n": 2}, next_stage="second")
+
+        nxt = queue.claim("second")
+        assert nxt is not None
+        assert nxt["payload"] == {"n": 2}
+        assert nxt["priority"] == 3
+        assert queue.stats() == {"first": {"done": 1}, "second": {"running": 1}}
+
+    def test_shared_file_between_queues(self, tmp_path: Path) -> None:
+        """Test two queue handles on one file see the same jobs."""
+        path = str(tmp_path / "jobs.db")
+        producer = JobQueue(path)
+        consumer = JobQueue(path)
+        producer.enqueue("stage", {"hello": "world"})
+
+        job = consumer.claim("stage")
+        assert job is not None and job["payload"] == {"hello": "world"}
+        assert producer.claim("stage") is None
+
+
+class TestJobRunner:
+    """Test cases for JobRunner."""
+
+    def test_runs_jobs_through_all_stages(self) -> None:
+        """Test payloads flow through stages and results are stored."""
+        queue = JobQueue()
+
+        def double(payload: Dict[str, Any]) -> Dict[str, Any]:
+            return {"n": payload["n"] * 2}
+
+        def add_one(payload: Dict[str, Any]) -> Dict[str, Any]:
+            return {"n": payload["n"] + 1}
+
+        runner = JobRunner(
+            queue,
+            [("double", double), ("add", add_one)],
+            pools={"double": 2, "add": 2},
+            poll_interval=0.01,
+        )
+        for n in range(5):
+            queue.enqueue("double", {"n": n})
+
+        assert runner.run_until_idle(timeout=10)
+        results = sorted(queue.get(i)["result"]["n"] for i in range(6, 11))  # type: ignore[index]
+        assert results == [1, 3, 5, 7, 9]
+
+    def test_failing_handler_is_retried(self) -> None:
+        """Test a raising handler is retried until it succeeds."""
+        queue = JobQueue()
+        handler = Mock(side_effect=[RuntimeError("flaky"), {"ok": True}])
+        runner = JobRunner(queue, [("only", handler)], retry_backoff=0)
+        job_id = queue.enqueue("only", {})
+
+        assert runner.process_one("only") is True
+        assert runner.process_one("only") is True
+
+        state = queue.get(job_id)
+        assert state is not None
+        assert state["status"] == "done"
+        assert state["attempts"] == 2
+
+    def test_retries_see_the_payload_as_left(self) -> None:
+        """Test progress a handler records in its payload survives fail and release."""
+        queue = JobQueue()
+        sent = []
+        errors = {"b": RetryLater(0), "c": RuntimeError("flaky")}
+
+        def send_all(payload: Dict[str, Any]) -> Dict[str, Any]:
+            for item in payload["items"]:
+                if item in payload["sent"]:
+                    continue
+                if item in errors:
+                    raise errors.pop(item)
+                sent.append(item)
+                payload["sent"].append(item)
+            return payload
+
+        runner = JobRunner(queue, [("send", send_all)], retry_backoff=0)
+        job_id = queue.enqueue("send", {"items": ["a", "b", "c"], "sent": []})
+        for _ in range(3):
+            assert runner.process_one("send") is True
+
+        state = queue.get(job_id)
+        assert state is not None
+        assert state["status"] == "done"
+        assert sent == ["a", "b", "c"]
+        assert state["attempts"] == 2
+
+    def test_long_handler_keeps_its_lease(self) -> None:
+        """Test a handler outliving its visibility timeout is not reclaimed."""
+        queue = JobQueue()
+        stolen = []
+
+        def slow(payload: Dict[str, Any]) -> Dict[str, Any]:
+            time.sleep(0.4)
+            stolen.append(queue.claim("slow", visibility_timeout=0.15))
+            return {"ok": True}
+
+        runner = JobRunner(queue, [("slow", slow)], visibility_timeouts={"slow": 0.15})
+        job_id = queue.enqueue("slow", {})
+
+        assert runner.process_one("slow") is True
+        assert stolen == [None]
+        state = queue.get(job_id)
+        assert state is not None
+        assert state["status"] == "done"
+        assert state["attempts"] == 1
+
+    def test_requires_stages(self) -> None:
+        """Test a runner without stages is rejected."""
+        with pytest.raises(ValueError):
+            JobRunner(JobQueue(), [])
+
+    @patch.object(SocialMediaVideoAgent, "post_to_social_platform")
+    @patch.object(SocialMediaVideoAgent, "upload_video_to_blotato")
+    @patch.object(SocialMediaVideoAgent, "generate_video_with_veo3")
+    @patch.object(SocialMediaVideoAgent, "create_veo3_prompt")
+    @patch.object(SocialMediaVideoAgent, "generate_video_concept")
+    def test_social_video_worker(
+        self,
+        mock_concept: Mock,
+        mock_prompt: Mock,
+        mock_video: Mock,
+        mock_upload: Mock,
+        mock_post: Mock,
+    ) -> None:
+        """Test SocialMediaVideoAgent jobs run end to end through the queue."""
+        mock_concept.return_value = {
+            "Caption": "Wow #viral",
+            "Idea": "Idea",
+            "Environment": "Env",
+        }
+        mock_prompt.return_value = "Test VEO3 prompt"
+        mock_video.return_value = "https://example.com/video.mp4"
+        mock_upload.return_value = "https://blotato.com/video.mp4"
+        mock_post.return_value = {"success": True, "platform": "instagram"}
+
+        queue = JobQueue()
+        agent = SocialMediaVideoAgent()
+        agent.enqueue_run(queue, topic="queued topic", platforms=["instagram"])
+        runner = agent.create_worker(
+            queue, pools={"concept": 1, "render": 1, "publish": 1}
+        )
+        runner.poll_interval = 0.01
+
+        assert runner.run_until_idle(timeout=10)
+        assert queue.stats() == {
+            "concept": {"done": 1},
+            "render": {"done": 1},
+            "publish": {"done": 1},
+        }
+        final = queue.get(3)
+        assert final is not None
+        assert final["result"]["success"] is True
+        assert final["result"]["topic"] == "queued topic"
+
+    @patch.object(SocialMediaVideoAgent, "_request")
+    @patch.object(SocialMediaVideoAgent, "upload_video_to_blotato")
+    @patch.object(SocialMediaVideoAgent, "generate_video_with_veo3")
+    @patch.object(SocialMediaVideoAgent, "create_veo3_prompt")
+    @patch.object(SocialMediaVideoAgent, "generate_video_concept")
+    def test_rate_limited_publish_does_not_repost(
+        self,
+        mock_concept: Mock,
+        mock_prompt: Mock,
+        mock_video: Mock,
+        mock_upload: Mock,
+        mock_request: Mock,
+    ) -> None:
+        """Test a publish job re-queued on a 429 posts to each platform once."""
+        mock_concept.return_value = {
+            "Caption": "Wow #viral",
+            "Idea": "Idea",
+            "Environment": "Env",
+        }
+        mock_prompt.return_value = "Test VEO3 prompt"
+        mock_video.return_value = "https://example.com/video.mp4"
+        mock_upload.return_value = "https://blotato.com/video.mp4"
+        posted = []
+        throttled: List[str] = []
+
+        def request(provider: str, method: str, url: str, **kwargs: Any) -> Mock:
+            platform = kwargs["json"]["post"]["content"]["platform"]
+            if platform == "youtube" and not throttled:
+                throttled.append(platform)
+                raise RateLimitedError("blotato", 0.0)
+            posted.append(platform)
+            return Mock(json=Mock(return_value={"id": platform}))
+
+        mock_request.side_effect = request
+        queue = JobQueue()
+        agent = SocialMediaVideoAgent(
+            {"social_accounts": {"instagram_id": "1", "youtube_id": "2"}}
+        )
+        agent.enqueue_run(queue, platforms=["instagram", "youtube"])
+        runner = agent.create_worker(
+            queue, pools={"concept": 1, "render": 1, "publish": 1}
+        )
+        runner.poll_interval = 0.01
+
+        assert runner.run_until_idle(timeout=10)
+        assert posted == ["instagram", "youtube"]
+        final = queue.get(3)
+        assert final is not None
+        assert final["status"] == "done"
+        assert final["result"]["successful_posts"] == 2
@@ -0,0 +1,182 @@
+"""Tests for agent lifecycle hooks and the shared resource registry."""
+
+from typing import Any, Dict, List
+
+import pytest
+import responses
+
+from agents.api_agent import APIAgent
+from agents.async_agent import AsyncBaseAgent
+from agents.base_agent import BaseAgent
+from agents.resources import ResourceRegistry, registry
+
+
+class TrackingAgent(BaseAgent):
+    """Sync agent recording lifecycle calls."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[str] = []
+
+    def warmup(self) -> None:
+        self.calls.append("warmup")
+
+    def close(self) -> None:
+        self.calls.append("close")
+        super().close()
+
+    def run(self) -> Dict[str, Any]:
+        return {"result": self.started}
+
+
+class AsyncTrackingAgent(AsyncBaseAgent):
+    """Async agent recording lifecycle calls."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[str] = []
+
+    async def warmup(self) -> None:
+        self.calls.append("warmup")
+
+    async def close(self) -> None:
+        self.calls.append("close")
+        await super().close()
+
+    async def run(self) -> Dict[str, Any]:
+        return {"result": self.started}
+
+
+class Resource:
+    """Closable stand-in resource."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestResourceRegistry:
+    """Test cases for ResourceRegistry."""
+
+    def test_shared_until_last_release(self) -> None:
+        """Test one resource per key, closed when the last holder releases it."""
+        reg = ResourceRegistry()
+        first = reg.acquire("k", Resource)
+        second = reg.acquire("k", Resource)
+        assert first is second
+        assert reg.refcount("k") == 2
+
+        reg.release("k")
+        assert not first.closed
+        reg.release("k")
+        assert first.closed
+        assert "k" not in reg
+        reg.release("k")  # releasing an unknown key is a no-op
+
+    def test_custom_closer_and_close_all(self) -> None:
+        """Test custom closers run and close_all empties the registry."""
+        reg = ResourceRegistry()
+        closed: List[str] = []
+        reg.acquire("a", lambda: "A", closer=closed.append)
+        reg.acquire("b", Resource)
+        reg.close_all()
+        assert closed == ["A"]
+        assert len(reg) == 0
+
+
+class TestLifecycle:
+    """Test cases for start/warmup/close and context managers."""
+
+    def test_sync_context_manager(self) -> None:
+        """Test ``with`` warms up once and closes on exit."""
+        agent = TrackingAgent()
+        with agent as entered:
+            assert entered is agent
+            agent.start()
+            assert agent.run() == {"result": True}
+        assert agent.calls == ["warmup", "close"]
+        assert agent.started is False
+
+    @pytest.mark.asyncio
+    async def test_sync_agent_async_context_manager(self) -> None:
+        """Test ``async with`` on a sync agent runs the hooks off the loop."""
+        agent = TrackingAgent()
+        async with agent:
+            assert (await agent.arun())["result"] is True
+        assert agent.calls == ["warmup", "close"]
+
+    @pytest.mark.asyncio
+    async def test_async_agent_async_context_manager(self) -> None:
+        """Test ``async with`` on an async agent awaits its hooks."""
+        agent = AsyncTrackingAgent()
+        async with agent:
+            assert (await agent.run())["result"] is True
+        assert agent.calls == ["warmup", "close"]
+
+    def test_async_agent_sync_context_manager(self) -> None:
+        """Test ``with`` on an async agent runs hooks on the background loop."""
+        agent = AsyncTrackingAgent()
+        with agent:
+            assert agent.run_sync()["result"] is True
+        assert agent.calls == ["warmup", "close"]
+
+
+class TestAPIAgentSessions:
+    """Test cases for APIAgent session sharing."""
+
+    def test_same_base_url_shares_session(self) -> None:
+        """Test agents with one base URL share a session until both close."""
+        config = {"base_url": "https://shared.example.com"}
+        first, second = APIAgent(config), APIAgent(config)
+        other = APIAgent({"base_url": "https://other.example.com"})
+        try:
+            assert first.session is second.session
+            assert other.session is not first.session
+            key = first._session_key
+            assert registry.refcount(key) == 2
+
+            first.close()
+            first.close()
+            assert registry.refcount(key) == 1
+        finally:
+            second.close()
+            other.close()
+        assert key not in registry
+
+    @responses.activate
+    def test_close_then_start_reacquires_session(self) -> None:
+        """Test a closed agent gets a live shared session back on start() and on use."""
+        responses.add(responses.HEAD, "https://again.example.com/", status=200)
+        responses.add(
+            responses.GET, "https://again.example.com/items", json={"ok": True}
+        )
+        agent = APIAgent({"base_url": "https://again.example.com/"})
+        key = agent._session_key
+        agent.close()
+        assert agent.session is None
+        assert key not in registry
+
+        agent.start()
+        assert registry.refcount(key) == 1
+        assert agent.run(endpoint="/items")["data"] == {"ok": True}
+        agent.close()
+        assert key not in registry
+
+        assert agent.run(endpoint="/items")["success"] is True
+        assert registry.refcount(key) == 1
+        agent.close()
+
+    @responses.activate
+    def test_warmup_touches_base_url(self) -> None:
+        """Test warmup issues a HEAD to the base URL and tolerates errors."""
+        responses.add(responses.HEAD, "https://warm.example.com/", status=200)
+        with APIAgent({"base_url": "https://warm.example.com/"}) as agent:
+            assert agent.started is True
+        assert responses.calls[0].request.method == "HEAD"
+
+        with APIAgent(
+            {"base_url": "https://cold.example.com/", "max_retries": 0}
+        ) as agent:
+            assert agent.info()["metrics"]["counters"]["warmup_errors"] == 1
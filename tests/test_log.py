@@ -0,0 +1,120 @@
+"""Tests for structured queue-based logging."""
+
+import io
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterator, List
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents import log, tracing
+from agents.social_media_video_agent import SocialMediaVideoAgent
+
+
+class ListHandler(logging.Handler):
+    """Collect formatted records and the thread that wrote them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.setFormatter(log.JSONFormatter())
+        self.lines: List[Dict[str, Any]] = []
+        self.threads: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(json.loads(self.format(record)))
+        self.threads.append(threading.current_thread().name)
+
+
+@pytest.fixture
+def captured() -> Iterator[ListHandler]:
+    """Route smallagents logs into a list for one test."""
+    handler = ListHandler()
+    log.configure(level="DEBUG", handler=handler)
+    yield handler
+    log.shutdown()
+
+
+class TestLogging:
+    """Test cases for agents.log."""
+
+    def test_json_lines_with_fields_and_trace(self) -> None:
+        """Test records become JSON objects carrying fields and trace ids."""
+        stream = io.StringIO()
+        log.configure(stream=stream)
+        logger = log.get_logger("agents.example")
+        tracing.configure([tracing.InMemoryExporter()])
+        try:
+            with tracing.start_span("request") as span:
+                logger.info("Posted %s", "ok", platform="tiktok")
+            logger.debug("hidden at INFO")
+            try:
+                raise ValueError("bad")
+            except ValueError:
+                logger.error("Failed", exc_info=True)
+        finally:
+            tracing.configure([])
+            log.shutdown()
+
+        first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert first["logger"] == "smallagents.example"
+        assert first["msg"] == "Posted ok"
+        assert first["platform"] == "tiktok"
+        assert first["trace_id"] == span.trace_id
+        assert second["level"] == "ERROR" and "ValueError: bad" in second["exc"]
+
+    def test_output_happens_off_the_calling_thread(self, captured: ListHandler) -> None:
+        """Test the handler runs on the listener thread, not the worker."""
+        worker = threading.Thread(
+            target=lambda: log.get_logger("test").info("from worker"), name="worker-1"
+        )
+        worker.start()
+        worker.join()
+        log.shutdown()
+
+        assert captured.lines[0]["thread"] == "worker-1"
+        assert captured.threads[0] != "worker-1"
+
+    def test_sampling_keeps_every_nth_per_message(self) -> None:
+        """Test sampled records are thinned per message; others are kept."""
+        handler = ListHandler()
+        log.configure(handler=handler, sample_rate=0.25)
+        logger = log.get_logger("test")
+        for i in range(8):
+            logger.info("item", i=i, sampled=True)
+            logger.info("always", i=i)
+        log.shutdown()
+
+        assert [line["i"] for line in handler.lines if line["msg"] == "item"] == [0, 4]
+        assert sum(line["msg"] == "always" for line in handler.lines) == 8
+        with pytest.raises(ValueError):
+            log.SamplingFilter(2.0)
+
+    @patch.object(SocialMediaVideoAgent, "post_to_social_platform")
+    @patch.object(SocialMediaVideoAgent, "upload_video_to_blotato")
+    @patch.object(SocialMediaVideoAgent, "generate_video_with_veo3")
+    def test_video_agent_progress(
+        self,
+        mock_video: Mock,
+        mock_upload: Mock,
+        mock_post: Mock,
+        captured: ListHandler,
+        capsys: pytest.CaptureFixture,
+    ) -> None:
+        """Test the video agent reports progress as log records instead of stdout."""
+        mock_video.return_value = None
+        mock_upload.return_value = None
+        mock_post.side_effect = [
+            {"success": True},
+            {"success": False, "error": "rejected"},
+        ]
+
+        SocialMediaVideoAgent().run(topic="cats", platforms=["instagram", "tiktok"])
+        log.shutdown()
+
+        assert capsys.readouterr().out == ""
+        by_msg = {line["msg"]: line for line in captured.lines}
+        assert by_msg["Using demo video URL for testing"]["level"] == "WARNING"
+        assert by_msg["Post failed"]["platform"] == "tiktok"
+        assert by_msg["Workflow completed"]["successful_posts"] == 1
@@ -0,0 +1,180 @@
+"""Tests for Orchestrator and StagePipeline."""
+
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.async_search_agent import AsyncSearchAgent
+from agents.base_agent import BaseAgent
+from agents.orchestrator import Orchestrator, Stage, StagePipeline
+from agents.search_agent import SearchAgent
+
+
+class SleepAgent(BaseAgent):
+    """Sync agent that sleeps and reports its thread."""
+
+    def run(self, delay: float = 0.05, value: Any = None) -> Dict[str, Any]:
+        time.sleep(delay)
+        return {"value": value, "thread": threading.get_ident()}
+
+
+class DoubleAgent(BaseAgent):
+    """Sync agent that doubles a number, failing on negatives."""
+
+    def run(self, n: int = 0) -> Dict[str, Any]:
+        if n < 0:
+            raise ValueError("negative")
+        return {"n": n * 2}
+
+
+class TestOrchestrator:
+    """Test cases for Orchestrator."""
+
+    def test_outputs_feed_downstream_nodes(self) -> None:
+        """Test mixed sync/async nodes run and pass outputs along edges."""
+        orch = Orchestrator()
+        orch.add("sync_search", SearchAgent(), kwargs={"query": "agents"})
+        orch.add("async_search", AsyncSearchAgent(), kwargs={"query": "async"})
+        orch.add(
+            "combine",
+            DoubleAgent(),
+            depends_on=["sync_search", "async_search"],
+            inputs=lambda up: {
+                "n": up["sync_search"]["result_count"]
+                + up["async_search"]["result_count"]
+            },
+        )
+
+        result = orch.run()
+
+        assert result["success"] is True
+        expected = (
+            result["outputs"]["sync_search"]["result_count"]
+            + result["outputs"]["async_search"]["result_count"]
+        ) * 2
+        assert result["outputs"]["combine"]["n"] == expected
+
+    def test_independent_nodes_run_in_parallel(self) -> None:
+        """Test independent sync nodes overlap on the thread pool."""
+        orch = Orchestrator()
+        for i in range(4):
+            orch.add(f"sleep{i}", SleepAgent(), kwargs={"delay": 0.2})
+
+        result = orch.run()
+
+        assert result["success"] is True
+        assert result["execution_time"] < 0.6
+        assert len({out["thread"] for out in result["outputs"].values()}) > 1
+
+    def test_failure_skips_dependents_only(self) -> None:
+        """Test a failing node skips its dependents but not other branches."""
+        orch = Orchestrator()
+        orch.add("bad", DoubleAgent(), kwargs={"n": -1})
+        orch.add(
+            "after_bad",
+            DoubleAgent(),
+            depends_on=["bad"],
+            inputs=lambda up: {"n": up["bad"]["n"]},
+        )
+        orch.add("good", DoubleAgent(), kwargs={"n": 2})
+
+        result = orch.run()
+
+        assert result["success"] is False
+        assert "ValueError" in result["errors"]["bad"]
+        assert result["skipped"] == ["after_bad"]
+        assert result["outputs"]["good"] == {"n": 4}
+
+    def test_process_pool_node(self) -> None:
+        """Test sync agents can run on the process pool."""
+        orch = Orchestrator(max_workers=2)
+        orch.add("double", DoubleAgent(), kwargs={"n": 21}, pool="process")
+        assert orch.run()["outputs"]["double"] == {"n": 42}
+
+    def test_invalid_graphs_rejected(self) -> None:
+        """Test cycles, unknown dependencies and duplicates are rejected."""
+        cyclic = Orchestrator()
+        cyclic.add("a", DoubleAgent(), depends_on=["b"])
+        cyclic.add("b", DoubleAgent(), depends_on=["a"])
+        with pytest.raises(ValueError, match="Cycle"):
+            cyclic.order()
+
+        missing = Orchestrator().add("a", DoubleAgent(), depends_on=["ghost"])
+        with pytest.raises(ValueError, match="unknown node"):
+            missing.order()
+
+        with pytest.raises(ValueError, match="Duplicate"):
+            Orchestrator().add("a", DoubleAgent()).add("a", DoubleAgent())
+        with pytest.raises(ValueError, match="pool"):
+            Orchestrator().add("a", DoubleAgent(), pool="gpu")
+
+
+class TestStagePipeline:
+    """Test cases for StagePipeline."""
+
+    def test_items_flow_through_stages(self) -> None:
+        """Test every item passes through each stage with stage outputs kept."""
+        pipeline = StagePipeline(
+            [
+                Stage(
+                    "first",
+                    DoubleAgent(),
+                    to_kwargs=lambda item: {"n": item},
+                    concurrency=3,
+                ),
+                Stage(
+                    "second",
+                    DoubleAgent(),
+                    to_kwargs=lambda out: {"n": out["n"]},
+                    concurrency=2,
+                ),
+            ],
+            queue_size=2,
+        )
+
+        records = pipeline.run(range(10))
+
+        assert sorted(r["outputs"]["second"]["n"] for r in records) == [
+            i * 4 for i in range(10)
+        ]
+        assert all(r["error"] is None for r in records)
+
+    def test_errors_skip_remaining_stages(self) -> None:
+        """Test a failed item is reported and not processed further."""
+        pipeline = StagePipeline(
+            [
+                Stage("first", DoubleAgent(), to_kwargs=lambda item: {"n": item}),
+                Stage("second", DoubleAgent(), to_kwargs=lambda out: {"n": out["n"]}),
+            ]
+        )
+
+        records = {r["item"]: r for r in pipeline.run([1, -1])}
+
+        assert records[1]["outputs"]["second"] == {"n": 4}
+        assert records[-1]["error"].startswith("first: ValueError")
+        assert records[-1]["outputs"] == {}
+
+    @pytest.mark.asyncio
+    async def test_async_stage_and_streaming(self) -> None:
+        """Test async agents run on the loop and results stream as they finish."""
+        pipeline = StagePipeline(
+            [
+                Stage(
+                    "search",
+                    AsyncSearchAgent(),
+                    to_kwargs=lambda q: {"query": q},
+                    concurrency=4,
+                ),
+            ]
+        )
+        seen: List[str] = []
+        async for record in pipeline.arun(["agents", "async", "python"]):
+            seen.append(record["outputs"]["search"]["query"])
+        assert sorted(seen) == ["agents", "async", "python"]
+
+    def test_requires_stages(self) -> None:
+        """Test an empty pipeline is rejected."""
+        with pytest.raises(ValueError):
+            StagePipeline([])
@@ -0,0 +1,199 @@
+"""Tests for on-demand profiling of agent runs."""
+
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from agents import profiling
+from agents.async_agent import AsyncBaseAgent
+from agents.base_agent import BaseAgent
+
+
+def busy_loop(seconds: float) -> int:
+    """Burn CPU so the sampler has something to see."""
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+class BusyAgent(BaseAgent):
+    """Agent that spins, allocates and optionally runs a nested agent."""
+
+    def run(
+        self, seconds: float = 0.05, nested: bool = False, run_id: Any = None
+    ) -> Dict[str, Any]:
+        data = [str(i) for i in range(10_000)]
+        if nested:
+            BusyAgent().run(seconds=0.001)
+        return {"success": True, "loops": busy_loop(seconds), "items": len(data)}
+
+
+class OverlapAgent(BaseAgent):
+    """Agent whose runs line up on a barrier, optionally finishing after an event."""
+
+    def run(
+        self,
+        started: threading.Barrier,
+        finish_after: Optional[threading.Event] = None,
+        run_id: Any = None,
+    ) -> Dict[str, Any]:
+        started.wait(5)
+        if finish_after is not None:
+            finish_after.wait(5)
+        return {"success": True}
+
+
+class AsyncBusyAgent(AsyncBaseAgent):
+    """Async agent that spins briefly."""
+
+    async def run(self) -> Dict[str, Any]:
+        return {"loops": busy_loop(0.01)}
+
+
+def dumps(directory: Path) -> List[str]:
+    return sorted(os.listdir(directory))
+
+
+class TestProfiling:
+    """Test cases for agents.profiling."""
+
+    def test_per_call_cprofile(self, tmp_path: Path) -> None:
+        """Test a profile() scope writes a pstats file named after agent and run id."""
+        with profiling.profile("cprofile", output_dir=str(tmp_path)):
+            BusyAgent().run(run_id="abc")
+        assert profiling.PROFILING.active is False
+
+        assert dumps(tmp_path) == ["BusyAgent-abc.prof"]
+        stats = pstats.Stats(str(tmp_path / "BusyAgent-abc.prof"))
+        assert any(func[2] == "busy_loop" for func in stats.stats)  # type: ignore[attr-defined]
+
+        BusyAgent().run()  # outside the scope nothing is written
+        assert len(dumps(tmp_path)) == 1
+
+    def test_per_agent_sample_and_tracemalloc(self, tmp_path: Path) -> None:
+        """Test config-enabled profiling samples stacks and snapshots allocations."""
+        agent = BusyAgent(
+            {
+                "profile": {
+                    "modes": "sample,tracemalloc",
+                    "output_dir": str(tmp_path),
+                    "interval": 0.001,
+                }
+            }
+        )
+        agent.run(seconds=0.1, run_id="r1")
+        agent.disable_profiling()
+        assert profiling.PROFILING.active is False
+        assert not tracemalloc.is_tracing()
+
+        assert dumps(tmp_path) == [
+            "BusyAgent-r1.collapsed",
+            "BusyAgent-r1.tracemalloc",
+            "BusyAgent-r1.tracemalloc.txt",
+        ]
+        collapsed = (tmp_path / "BusyAgent-r1.collapsed").read_text()
+        assert "test_profiling.py:busy_loop" in collapsed
+        snapshot = tracemalloc.Snapshot.load(str(tmp_path / "BusyAgent-r1.tracemalloc"))
+        assert snapshot.traces
+        assert (
+            "BusyAgent run r1"
+            in (tmp_path / "BusyAgent-r1.tracemalloc.txt").read_text()
+        )
+
+    def test_nested_runs_share_one_session(self, tmp_path: Path) -> None:
+        """Test agents run inside a profiled run are covered by the outer profile."""
+        profiling.enable_all(
+            profiling.ProfileSettings("cprofile", output_dir=str(tmp_path))
+        )
+        try:
+            BusyAgent().run(seconds=0.001, nested=True, run_id="outer")
+        finally:
+            profiling.disable_all()
+        assert dumps(tmp_path) == ["BusyAgent-outer.prof"]
+
+    def test_overlapping_tracemalloc_runs(self, tmp_path: Path) -> None:
+        """Test a run finishing first keeps tracemalloc on for one still running."""
+        started = threading.Barrier(2)
+        first_done = threading.Event()
+        results: List[Dict[str, Any]] = []
+
+        def first() -> None:
+            results.append(OverlapAgent().run(started, run_id="first"))
+            first_done.set()
+
+        profiling.enable_all(
+            profiling.ProfileSettings("tracemalloc", output_dir=str(tmp_path))
+        )
+        try:
+            thread = threading.Thread(target=first)
+            thread.start()
+            results.append(
+                OverlapAgent().run(started, finish_after=first_done, run_id="second")
+            )
+            thread.join()
+        finally:
+            profiling.disable_all()
+
+        assert results == [{"success": True}, {"success": True}]
+        assert not tracemalloc.is_tracing()
+        assert dumps(tmp_path) == [
+            "OverlapAgent-first.tracemalloc",
+            "OverlapAgent-first.tracemalloc.txt",
+            "OverlapAgent-second.tracemalloc",
+            "OverlapAgent-second.tracemalloc.txt",
+        ]
+
+    def test_dump_errors_do_not_fail_the_run(self, tmp_path: Path) -> None:
+        """Test a profile that cannot be written leaves the run's result alone."""
+        blocked = tmp_path / "not-a-directory"
+        blocked.write_text("")
+        agent = BusyAgent(
+            {"profile": {"modes": "cprofile,tracemalloc", "output_dir": str(blocked)}}
+        )
+        assert agent.run(seconds=0.001)["success"] is True
+        agent.disable_profiling()
+        assert not tracemalloc.is_tracing()
+
+    def test_signal_toggles_process_profiling(self, tmp_path: Path) -> None:
+        """Test SIGUSR1 switches process-wide profiling on and off."""
+        previous = signal.getsignal(signal.SIGUSR1)
+        settings = profiling.ProfileSettings("cprofile", output_dir=str(tmp_path))
+        try:
+            profiling.install_signal_handler(signal.SIGUSR1, settings)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert profiling.PROFILING.global_settings is settings
+            BusyAgent().run(seconds=0.001, run_id="sig")
+            os.kill(os.getpid(), signal.SIGUSR1)
+            assert profiling.PROFILING.active is False
+        finally:
+            profiling.disable_all()
+            signal.signal(signal.SIGUSR1, previous)
+        assert dumps(tmp_path) == ["BusyAgent-sig.prof"]
+
+    @pytest.mark.asyncio
+    async def test_async_agent(self, tmp_path: Path) -> None:
+        """Test async runs are profiled on the event loop thread."""
+        agent = AsyncBusyAgent()
+        agent.enable_profiling("cprofile", output_dir=str(tmp_path))
+        try:
+            await agent.run()
+        finally:
+            agent.disable_profiling()
+        [name] = dumps(tmp_path)
+        assert name.startswith("AsyncBusyAgent-") and name.endswith(".prof")
+
+    def test_invalid_modes(self) -> None:
+        """Test unknown profiler names are rejected."""
+        with pytest.raises(ValueError, match="Profiling modes"):
+            profiling.ProfileSettings("perf")
+        with pytest.raises(ValueError, match="Profiling modes"):
+            BusyAgent({"profile": ""}).enable_profiling("cprofile,gprof")
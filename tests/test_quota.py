@@ -0,0 +1,171 @@
+"""Tests for per-provider quotas and rate limiting."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents import deadline
+from agents.job_queue import JobQueue, JobRunner
+from agents.quota import (
+    ProviderQuota,
+    QuotaExceededError,
+    QuotaManager,
+    RateLimitedError,
+    TokenBucket,
+    parse_retry_after,
+)
+from agents.social_media_video_agent import SocialMediaVideoAgent
+
+
+def make_response(
+    status_code: int, json_data: object = None, headers: object = None
+) -> Mock:
+    """Build a mock requests.Response."""
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = json_data or {}
+    response.headers = headers or {}
+    return response
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    def test_burst_then_wait(self) -> None:
+        """Test the burst is free and further tokens are spaced by the rate."""
+        bucket = TokenBucket(rate=10, capacity=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+    def test_pause_delays_callers(self) -> None:
+        """Test pausing holds back reservations even with tokens left."""
+        bucket = TokenBucket(rate=10, capacity=5)
+        bucket.pause(3)
+        assert bucket.reserve() == pytest.approx(3, abs=0.05)
+
+    def test_acquire_respects_deadline(self) -> None:
+        """Test a wait longer than the deadline fails at once and returns its tokens."""
+        bucket = TokenBucket(rate=1, capacity=1)
+        bucket.reserve()
+        with deadline.scope(0.5):
+            with pytest.raises(deadline.DeadlineExceeded):
+                bucket.acquire()
+        assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+
+    def test_rejects_non_positive_rate(self) -> None:
+        """Test a zero rate is rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestProviderQuota:
+    """Test cases for ProviderQuota and QuotaManager."""
+
+    def test_counters(self) -> None:
+        """Test requests, tokens, render seconds and 429s are counted."""
+        quota = ProviderQuota("openai")
+        quota.acquire()
+        quota.record_llm_tokens(120)
+        quota.record_render_seconds(4.5)
+        quota.throttle(1.0)
+
+        usage = quota.snapshot()["usage"]
+        assert usage["requests"] == 1
+        assert usage["llm_tokens"] == 120
+        assert usage["render_seconds"] == 4.5
+        assert usage["throttled"] == 1
+
+    def test_budget_exhaustion(self) -> None:
+        """Test a spend budget raises once used up."""
+        quota = ProviderQuota("fal", max_requests=1)
+        quota.acquire()
+        with pytest.raises(QuotaExceededError):
+            quota.acquire()
+
+    def test_llm_token_debt_delays_next_request(self) -> None:
+        """Test LLM tokens over the per-minute limit hold back the next request."""
+        quota = ProviderQuota("openai", tokens_per_minute=600)
+        quota.record_llm_tokens(610)  # 10 tokens of debt at 10 tokens/s
+        with patch("agents.quota.time.sleep") as mock_sleep:
+            quota.acquire()
+        assert mock_sleep.call_args.args[0] == pytest.approx(1.0, abs=0.05)
+
+    def test_manager_builds_providers_from_config(self) -> None:
+        """Test providers are configured from the mapping and created lazily."""
+        manager = QuotaManager({"openai": {"requests_per_second": 2, "burst": 4}})
+        assert manager.provider("openai").request_bucket is not None
+        assert manager.provider("blotato").request_bucket is None
+        assert set(manager.snapshot()) == {"openai", "blotato"}
+
+    def test_parse_retry_after(self) -> None:
+        """Test Retry-After parsing falls back on missing or HTTP-date values."""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None, default=2.0) == 2.0
+        assert parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT") == 1.0
+
+
+class TestSocialMediaVideoAgentQuotas:
+    """Test rate-aware requests in SocialMediaVideoAgent."""
+
+    @patch("agents.social_media_video_agent.time.sleep")
+    @patch("agents.social_media_video_agent.requests.post")
+    def test_retries_429_then_succeeds(self, mock_post: Mock, mock_sleep: Mock) -> None:
+        """Test a 429 is waited out and retried instead of failing."""
+        mock_post.side_effect = [
+            make_response(429, headers={"Retry-After": "2"}),
+            make_response(200, {"url": "https://blotato.com/video.mp4"}),
+        ]
+        agent = SocialMediaVideoAgent({"blotato_api_key": "test-key"})
+
+        assert (
+            agent.upload_video_to_blotato("https://example.com/video.mp4")
+            == "https://blotato.com/video.mp4"
+        )
+        mock_sleep.assert_called_once_with(2.0)
+        usage = agent.quota_usage()["blotato"]["usage"]
+        assert usage["requests"] == 2
+        assert usage["throttled"] == 1
+
+    @patch("agents.social_media_video_agent.time.sleep")
+    @patch("agents.social_media_video_agent.requests.post")
+    def test_persistent_429_raises_rate_limited(
+        self, mock_post: Mock, mock_sleep: Mock
+    ) -> None:
+        """Test persistent throttling surfaces as RateLimitedError, not a fallback."""
+        mock_post.return_value = make_response(429, headers={"Retry-After": "7"})
+        agent = SocialMediaVideoAgent({"max_retries": 1})
+
+        with pytest.raises(RateLimitedError) as excinfo:
+            agent.generate_video_concept("topic")
+        assert excinfo.value.provider == "openai"
+        assert excinfo.value.delay == 7.0
+
+    @patch("agents.social_media_video_agent.requests.post")
+    def test_records_llm_tokens(self, mock_post: Mock) -> None:
+        """Test OpenAI token usage is counted against the provider."""
+        mock_post.return_value = make_response(
+            200,
+            {
+                "choices": [{"message": {"content": "A prompt"}}],
+                "usage": {"total_tokens": 321},
+            },
+        )
+        agent = SocialMediaVideoAgent()
+        agent.create_veo3_prompt("idea", "environment")
+        assert agent.quota_usage()["openai"]["usage"]["llm_tokens"] == 321
+
+    def test_rate_limited_job_is_requeued_without_using_an_attempt(self) -> None:
+        """Test the job runner defers rate-limited jobs instead of failing them."""
+        queue = JobQueue()
+        handler = Mock(side_effect=RateLimitedError("fal", 30))
+        runner = JobRunner(queue, [("render", handler)])
+        job_id = queue.enqueue("render", {}, max_attempts=1)
+
+        assert runner.process_one("render") is True
+        state = queue.get(job_id)
+        assert state is not None
+        assert state["status"] == "queued"
+        assert state["attempts"] == 0
+        assert queue.claim("render") is None  # deferred by Retry-After
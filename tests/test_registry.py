@@ -0,0 +1,97 @@
+"""Tests for the lazy agent registry and entry point discovery."""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from agents import registry
+
+PLUGIN_SOURCE = '''
+from agents.base_agent import BaseAgent
+
+
+class EchoPlugin(BaseAgent):
+    """Third-party agent used by the registry tests."""
+
+    def run(self, query: str = "") -> dict:
+        return {"echo": query, "prefix": self.config.get("prefix", "")}
+'''
+
+
+@pytest.fixture
+def plugin_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[List[int]]:
+    """Provide a fake installed plugin, an isolated cache and a clean registry."""
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "echo_plugin.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.setenv("SMALLAGENTS_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(registry, "_REGISTRY", dict(registry._REGISTRY))
+    monkeypatch.setattr(registry, "_discovered", False)
+
+    scans: List[int] = []
+
+    def fake_scan() -> List[Dict[str, Any]]:
+        scans.append(1)
+        return [
+            {
+                "name": "echo",
+                "target": "echo_plugin:EchoPlugin",
+                "distribution": "echo-plugin",
+            },
+            {
+                "name": "search",
+                "target": "echo_plugin:EchoPlugin",
+                "distribution": "echo-plugin",
+            },
+            {"name": "broken", "target": "no-colon", "distribution": "echo-plugin"},
+        ]
+
+    monkeypatch.setattr(registry, "_scan_entry_points", fake_scan)
+    yield scans
+    sys.modules.pop("echo_plugin", None)
+
+
+class TestRegistry:
+    """Test cases for agents.registry."""
+
+    def test_builtins_resolve_lazily(self) -> None:
+        """Test built-in specs create configured agents from a full config."""
+        agent = registry.create("search", {"agents": {"search": {"corpus": ["a b"]}}})
+        assert agent.corpus == ["a b"]
+        assert registry.get_spec("api").input_field == "endpoint"
+        with pytest.raises(ValueError, match="Unknown agent"):
+            registry.get_spec("ghost")
+
+    def test_plugins_discovered_without_import(self, plugin_env: List[int]) -> None:
+        """Test entry points register agents that import only when selected."""
+        assert "echo" in registry.available()
+        assert "broken" not in registry.available()
+        assert "echo_plugin" not in sys.modules
+
+        meta = {m["name"]: m for m in registry.describe()}
+        assert meta["echo"]["distribution"] == "echo-plugin"
+        assert meta["search"]["distribution"] is None  # built-ins win name clashes
+        assert "echo_plugin" not in sys.modules
+
+        agent = registry.create("echo", {"agents": {"echo": {"prefix": ">"}}})
+        assert agent.run(query="hi") == {"echo": "hi", "prefix": ">"}
+        assert registry.load("echo") is type(agent)
+
+    def test_entry_points_cached_on_disk(
+        self, plugin_env: List[int], tmp_path: Path
+    ) -> None:
+        """Test the scan runs once until sys.path directories change."""
+        registry.discover()
+        registry.discover()
+        assert len(plugin_env) == 1
+        assert (tmp_path / "cache" / "entry_points.json").exists()
+
+        (tmp_path / "site" / "newly_installed.py").write_text("")
+        registry.discover()
+        assert len(plugin_env) == 2
+
+        registry.discover(refresh=True)
+        assert len(plugin_env) == 3
@@ -94,3 +94,75 @@ class TestSearchAgent:
         # Test with whitespace-only query
         whitespace_results = agent._search("   ")
         assert whitespace_results == []
+
+
+class TestSearchAgentProcessMode:
+    """Test cases for SearchAgent's process-pool execution mode."""
+
+    CORPUS = [
+        f"doc {i} {'agents' if i % 3 == 0 else 'other'} python" for i in range(300)
+    ]
+
+    def make_agent(self) -> SearchAgent:
+        """Create a process-mode agent that shards even a small corpus."""
+        return SearchAgent(
+            {
+                "corpus": self.CORPUS,
+                "execution": {"mode": "process", "workers": 2, "min_shard_size": 1},
+            }
+        )
+
+    def test_process_mode_matches_inline(self) -> None:
+        """Test sharded results equal inline results, in corpus order."""
+        agent = self.make_agent()
+        inline = SearchAgent({"corpus": self.CORPUS})
+        try:
+            agent.warmup()
+            for query in ["agents", "python doc", "missing", ""]:
+                assert agent.run(query=query) == inline.run(query=query)
+        finally:
+            agent.close()
+
+    def test_run_stream_matches_run(self) -> None:
+        """Test streamed hits arrive in corpus order in both execution modes."""
+        agent = self.make_agent()
+        inline = SearchAgent({"corpus": self.CORPUS})
+        try:
+            for searcher in (inline, agent):
+                events = list(searcher.run_stream(query="agents"))
+                hits = [e["text"] for e in events if e["event"] == "hit"]
+                assert hits == inline.run(query="agents")["results"]
+                assert events[-1] == {
+                    "event": "done",
+                    "result": {"query": "agents", "result_count": 100},
+                }
+            first = next(agent.run_stream(query="doc"))
+            assert first == {"event": "hit", "index": 0, "text": self.CORPUS[0]}
+        finally:
+            agent.close()
+        assert list(inline.run_stream(query="")) == [
+            {"event": "done", "result": {"query": "", "result_count": 0}}
+        ]
+
+    def test_run_many(self) -> None:
+        """Test batched queries spread across workers keep their order."""
+        agent = self.make_agent()
+        queries = ["agents", "other", "doc 7", "", "missing"] * 3
+        try:
+            results = agent.run_many(queries)
+        finally:
+            agent.close()
+        inline = SearchAgent({"corpus": self.CORPUS})
+        assert results == [inline.run(query=q) for q in queries]
+        assert inline.run_many(["agents"]) == [inline.run(query="agents")]
+
+    def test_small_corpus_stays_inline(self) -> None:
+        """Test corpora below min_shard_size never start a pool."""
+        agent = SearchAgent({"execution": {"mode": "process"}})
+        agent.run(query="agents")
+        assert agent._pool is None
+
+    def test_invalid_mode(self) -> None:
+        """Test unknown execution modes are rejected."""
+        with pytest.raises(ValueError, match="execution.mode"):
+            SearchAgent({"execution": {"mode": "gpu"}})
@@ -0,0 +1,180 @@
+"""Tests for the agent HTTP server."""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+from agents.async_search_agent import AsyncSearchAgent
+from agents.base_agent import BaseAgent
+from agents.search_agent import SearchAgent
+from agents.server import AgentServer, build_agents
+
+
+class SlowAgent(BaseAgent):
+    """Sync agent that blocks until released."""
+
+    def __init__(self, config: Any = None) -> None:
+        super().__init__(config)
+        self.started_calls = 0
+
+    def warmup(self) -> None:
+        self.started_calls += 1
+
+    def run(self, delay: float = 0.2) -> Dict[str, Any]:
+        time.sleep(delay)
+        return {"result": "done"}
+
+
+async def make_client(server: AgentServer) -> TestClient:
+    """Start a test client for ``server``."""
+    client = TestClient(TestServer(server.build_app()))
+    await client.start_server()
+    return client
+
+
+@pytest_asyncio.fixture
+async def client() -> AsyncIterator[TestClient]:
+    """Serve a sync and an async search agent."""
+    server = AgentServer(
+        {"search": SearchAgent(), "async-search": AsyncSearchAgent()}, batch_window=0.01
+    )
+    client = await make_client(server)
+    client.agent_server = server  # type: ignore[attr-defined]
+    yield client
+    await client.close()
+
+
+class TestAgentServer:
+    """Test cases for AgentServer routes."""
+
+    @pytest.mark.asyncio
+    async def test_run_sync_and_async_agents(self, client: TestClient) -> None:
+        """Test /agents/<name>/run dispatches to sync and async agents."""
+        response = await client.post("/agents/search/run", json={"query": "agents"})
+        assert response.status == 200
+        assert (await response.json()) == SearchAgent().run(query="agents")
+
+        response = await client.post(
+            "/agents/async-search/run", json={"query": "async"}
+        )
+        assert (await response.json())["query"] == "async"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_are_batched(self, client: TestClient) -> None:
+        """Test concurrent single queries are coalesced into run_many calls."""
+        queries = ["agents", "testing", "orchestration", "nothing"] * 5
+        responses = await asyncio.gather(
+            *(client.post("/agents/search/run", json={"query": q}) for q in queries)
+        )
+        bodies = [await r.json() for r in responses]
+        assert [b["query"] for b in bodies] == queries
+        counters = client.agent_server.metrics.snapshot()["counters"]  # type: ignore[attr-defined]
+        assert counters["batched_requests"] == len(queries)
+        assert counters["batches"] < len(queries)
+
+    @pytest.mark.asyncio
+    async def test_batch_endpoint_and_errors(self, client: TestClient) -> None:
+        """Test /batch returns per-request statuses and bad input maps to 400/404."""
+        response = await client.post(
+            "/agents/search/batch",
+            json={"requests": [{"query": "agents"}, {"query": 1}, [1]]},
+        )
+        results = (await response.json())["results"]
+        assert [r["status"] for r in results] == [200, 400, 400]
+
+        assert (await client.post("/agents/ghost/run", json={})).status == 404
+        assert (await client.post("/agents/search/run", data="{bad")).status == 400
+        assert (await client.post("/agents/search/batch", json={})).status == 400
+
+    @pytest.mark.asyncio
+    async def test_stream_endpoint(self, client: TestClient) -> None:
+        """Test /stream answers with one JSON line per event for sync and async agents."""
+        for name in ("search", "async-search"):
+            response = await client.post(
+                f"/agents/{name}/stream", json={"query": "agents", "deadline": 5}
+            )
+            assert response.status == 200
+            assert response.content_type == "application/x-ndjson"
+            events = [json.loads(line) for line in (await response.text()).splitlines()]
+            assert {e["event"] for e in events[:-1]} == {"hit"}
+            assert events[-1]["result"]["result_count"] == len(events) - 1 > 0
+
+        assert (
+            await client.post("/agents/search/stream", json={"query": 1})
+        ).status == 400
+
+    @pytest.mark.asyncio
+    async def test_health_agents_and_metrics(self, client: TestClient) -> None:
+        """Test the health, metadata and Prometheus endpoints."""
+        await client.post("/agents/search/run", json={"query": "agents"})
+        assert (await (await client.get("/health")).json())["agents"] == [
+            "async-search",
+            "search",
+        ]
+        assert (await (await client.get("/agents")).json())["async-search"][
+            "async"
+        ] is True
+        text = await (await client.get("/metrics")).text()
+        assert (
+            'smallagents_step_duration_seconds_count{agent="AgentServer",step="run"}'
+            in text
+        )
+        assert 'agent="SearchAgent"' in text
+
+    @pytest.mark.asyncio
+    async def test_agents_endpoint_redacts_credentials(self) -> None:
+        """Test /agents never serves API keys or tokens from agent configs."""
+        secrets = {
+            "openai_api_key": "sk-one",
+            "fal_key": "fal-two",
+            "auth_token": "tok-three",
+        }
+        config = dict(
+            secrets, model="gpt-4", providers={"blotato": {"api_key": "bl-four"}}
+        )
+        client = await make_client(AgentServer({"slow": SlowAgent(config)}))
+        try:
+            body = await (await client.get("/agents")).text()
+        finally:
+            await client.close()
+        for value in [*secrets.values(), "bl-four"]:
+            assert value not in body
+        info = json.loads(body)["slow"]
+        assert info["config"]["openai_api_key"] == "***"
+        assert info["config"]["model"] == "gpt-4"
+
+    @pytest.mark.asyncio
+    async def test_overload_returns_503(self) -> None:
+        """Test requests beyond concurrency plus queue depth are rejected."""
+        agent = SlowAgent()
+        client = await make_client(
+            AgentServer({"slow": agent}, max_concurrency=1, max_pending=1)
+        )
+        try:
+            assert agent.started_calls == 1
+            responses = await asyncio.gather(
+                *(
+                    client.post("/agents/slow/run", json={"delay": 0.2})
+                    for _ in range(4)
+                )
+            )
+            statuses = sorted(r.status for r in responses)
+            assert statuses == [200, 200, 503, 503]
+            rejected = [r for r in responses if r.status == 503]
+            assert rejected[0].headers["Retry-After"] == "1"
+        finally:
+            await client.close()
+        assert agent.started is False
+
+
+def test_build_agents() -> None:
+    """Test agents are built from their config.yaml sections."""
+    agents = build_agents(["search"], {"agents": {"search": {"corpus": ["x y"]}}})
+    assert agents["search"].corpus == ["x y"]
+    with pytest.raises(ValueError):
+        build_agents(["ghost"], {})
@@ -0,0 +1,153 @@
+"""Tests for scatter-gather search over shard servers."""
+
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+
+from agents.bridge import get_background_loop
+from agents.search_agent import SearchAgent
+from agents.sharded_search import ShardedSearchAgent, ShardsUnavailable
+
+CORPUS = [
+    f"doc {i} {topic}"
+    for i in range(60)
+    for topic in ("agent python", "video pipeline", "vector index")
+]
+
+
+@pytest.fixture(scope="module")
+def sharded() -> Iterator[ShardedSearchAgent]:
+    """Coordinator over three local shard processes."""
+    agent = ShardedSearchAgent({"corpus": CORPUS, "local_shards": 3})
+    with agent:
+        yield agent
+
+
+@pytest.fixture
+def slow_url() -> Iterator[str]:
+    """A shard that takes two seconds to answer."""
+
+    class Slow(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            time.sleep(2.0)
+            try:
+                self.send_response(200)
+                self.end_headers()
+            except OSError:
+                pass
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Slow)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def closed_port_url() -> str:
+    """URL of a local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+class TestShardedSearchAgent:
+    """Test cases for ShardedSearchAgent."""
+
+    def test_merged_results_match_single_process(
+        self, sharded: ShardedSearchAgent
+    ) -> None:
+        """Test keyword matches from all shards come back in corpus order."""
+        result = sharded.run_sync(query="video pipeline")
+        expected = SearchAgent({"corpus": CORPUS}).run(query="video pipeline")
+
+        assert result["results"] == expected["results"]
+        assert result["result_count"] == 60
+        assert result["partial"] is False
+        assert result["shards"] == {"total": 3, "answered": 3, "failed": {}}
+
+    def test_run_many_batches_per_shard(self, sharded: ShardedSearchAgent) -> None:
+        """Test a batch gives the same answers as single queries."""
+        queries = ["agent", "vector index", "nomatch"]
+        results = get_background_loop().run(sharded.run_many(queries))
+        assert [r["results"] for r in results] == [
+            sharded.run_sync(query=q)["results"] for q in queries
+        ]
+
+    def test_stragglers_and_failures_give_partial_results(
+        self, sharded: ShardedSearchAgent, slow_url: str
+    ) -> None:
+        """Test slow and unreachable shards are reported while answered ones are merged."""
+        live = sharded.urls[0]
+        dead = closed_port_url()
+        agent = ShardedSearchAgent(
+            {"shards": [live, slow_url, dead], "shard_timeout": 0.3}
+        )
+
+        t0 = time.perf_counter()
+        result = agent.run_sync(query="agent")
+        elapsed = time.perf_counter() - t0
+
+        async def unfinished_requests() -> List[asyncio.Task]:
+            await agent._scatter("run", {"query": "agent"})
+            return [
+                t
+                for t in asyncio.all_tasks()
+                if getattr(t.get_coro(), "__qualname__", "")
+                == "ShardedSearchAgent._post"
+            ]
+
+        assert get_background_loop().run(unfinished_requests()) == []
+        get_background_loop().run(agent.close())
+
+        assert elapsed < 1.5
+        assert result["partial"] is True
+        assert result["shards"]["answered"] == 1
+        assert result["shards"]["failed"][slow_url].startswith("timed out")
+        assert dead in result["shards"]["failed"]
+        assert result["results"] == [text for text in CORPUS[:60] if "agent" in text]
+
+    def test_no_shard_answering_raises(self) -> None:
+        """Test a query fails outright when every shard is down."""
+        agent = ShardedSearchAgent({"shards": [closed_port_url()]})
+        with pytest.raises(ShardsUnavailable):
+            agent.run_sync(query="agent")
+        get_background_loop().run(agent.close())
+
+    def test_dense_shards_merge_by_score(self, tmp_path: Path) -> None:
+        """Test dense hits are merged across shards and each shard caches its own vectors."""
+        pytest.importorskip("numpy")
+        retrieval = {"mode": "dense", "top_k": 4}
+        cached = dict(retrieval, cache_path=str(tmp_path / "vectors.npy"))
+        with ShardedSearchAgent(
+            {"corpus": CORPUS, "local_shards": 2, "retrieval": cached}
+        ) as agent:
+            result = agent.run_sync(query="vector indexes")
+        expected = SearchAgent({"corpus": CORPUS, "retrieval": retrieval}).run(
+            query="vector indexes"
+        )
+        assert result["scores"] == pytest.approx(expected["scores"])
+        assert sorted(p.name for p in tmp_path.glob("*.npy")) == [
+            "vectors.shard0.npy",
+            "vectors.shard1.npy",
+        ]
+
+    def test_search_agent_shard_config_and_validation(self) -> None:
+        """Test SearchAgent keeps only its partition and the coordinator needs shards."""
+        assert (
+            SearchAgent({"shard": {"index": 1, "count": 2}}).corpus
+            == SearchAgent.CORPUS[2:]
+        )
+        with pytest.raises(ValueError, match="shard.index"):
+            SearchAgent({"shard": {"index": 2, "count": 2}})
+        with pytest.raises(ValueError, match="local_shards"):
+            ShardedSearchAgent({})
@@ -1,4 +1,6 @@
 """Tests for SocialMediaVideoAgent."""
+from pathlib import Path
+
 import pytest
 from unittest.mock import Mock, patch
 
@@ -191,6 +193,120 @@ class TestSocialMediaVideoAgent:
         assert "steps" in result
         assert "social_posts" in result
 
+    @patch.object(SocialMediaVideoAgent, 'post_to_social_platform')
+    @patch.object(SocialMediaVideoAgent, 'upload_video_to_blotato')
+    @patch.object(SocialMediaVideoAgent, 'generate_video_with_veo3')
+    @patch.object(SocialMediaVideoAgent, 'create_veo3_prompt')
+    @patch.object(SocialMediaVideoAgent, 'generate_video_concept')
+    def test_run_stream_yields_steps_and_posts(self, mock_concept: Mock, mock_prompt: Mock,
+                                               mock_video: Mock, mock_upload: Mock, mock_post: Mock) -> None:
+        """Test run_stream reports each step and post before the run finishes."""
+        mock_concept.return_value = {"Caption": "Wow #viral", "Idea": "Idea", "Environment": "Env"}
+        mock_prompt.return_value = "Test VEO3 prompt"
+        mock_video.return_value = "https://example.com/video.mp4"
+        mock_upload.return_value = "https://blotato.com/video.mp4"
+        mock_post.side_effect = lambda platform, **kwargs: {"success": True, "platform": platform}
+
+        agent = SocialMediaVideoAgent()
+        stream = agent.run_stream(topic="test topic", platforms=["instagram", "tiktok"])
+        assert next(stream)["event"] == "start"
+        concept = next(stream)
+        assert concept == {"event": "step", "step": "concept", "value": mock_concept.return_value}
+        mock_prompt.assert_not_called()  # nothing runs ahead of the consumer
+
+        events = list(stream)
+        assert [(e["event"], e.get("step") or e.get("platform")) for e in events] == [
+            ("step", "veo3_prompt"),
+            ("step", "video_url"),
+            ("step", "blotato_media_url"),
+            ("post", "instagram"),
+            ("post", "tiktok"),
+            ("done", None),
+        ]
+        assert events[-1]["result"]["successful_posts"] == 2
+
+    @patch.object(SocialMediaVideoAgent, 'post_to_social_platform')
+    @patch.object(SocialMediaVideoAgent, 'upload_video_to_blotato')
+    @patch.object(SocialMediaVideoAgent, 'generate_video_with_veo3')
+    @patch.object(SocialMediaVideoAgent, 'create_veo3_prompt')
+    @patch.object(SocialMediaVideoAgent, 'generate_video_concept')
+    def test_run_resumes_from_checkpoint(self, mock_concept: Mock, mock_prompt: Mock,
+                                         mock_video: Mock, mock_upload: Mock, mock_post: Mock) -> None:
+        """Test a rerun reuses completed steps and only retries failed platforms."""
+        mock_concept.return_value = {"Caption": "Wow #viral", "Idea": "Idea", "Environment": "Env"}
+        mock_prompt.return_value = "Test VEO3 prompt"
+        mock_video.return_value = "https://example.com/video.mp4"
+        mock_upload.return_value = "https://blotato.com/video.mp4"
+        mock_post.side_effect = [
+            {"success": True, "platform": "instagram"},
+            {"success": False, "platform": "youtube", "error": "boom"},
+            {"success": True, "platform": "youtube"},
+        ]
+
+        agent = SocialMediaVideoAgent({"checkpoint_path": ":memory:"})
+        first = agent.run(topic="test topic", platforms=["instagram", "youtube"])
+        assert first["successful_posts"] == 1
+
+        second = agent.run(topic="test topic", platforms=["instagram", "youtube"], run_id=first["run_id"])
+
+        assert second["successful_posts"] == 2
+        assert second["resumed_steps"] == ["blotato_media_url", "concept", "veo3_prompt", "video_url"]
+        assert mock_concept.call_count == 1
+        assert mock_prompt.call_count == 1
+        assert mock_video.call_count == 1
+        assert mock_upload.call_count == 1
+        assert mock_post.call_args.kwargs["platform"] == "youtube"
+
+    @patch.object(SocialMediaVideoAgent, 'generate_video_with_veo3')
+    @patch.object(SocialMediaVideoAgent, 'create_veo3_prompt')
+    @patch.object(SocialMediaVideoAgent, 'generate_video_concept')
+    def test_fallback_concept_is_not_checkpointed(self, mock_concept: Mock, mock_prompt: Mock,
+                                                  mock_video: Mock) -> None:
+        """Test a resumed run retries the LLM after a failed concept step."""
+        mock_concept.return_value = {"error": "boom", "Caption": "c", "Idea": "i", "Environment": "e"}
+        mock_prompt.return_value = "prompt from fallback concept"
+        mock_video.return_value = None
+
+        agent = SocialMediaVideoAgent({"checkpoint_path": ":memory:"})
+        first = agent.run(topic="test topic")
+        second = agent.run(topic="test topic", run_id=first["run_id"])
+
+        assert second["resumed_steps"] == []
+        assert mock_concept.call_count == 2
+        assert mock_prompt.call_count == 2
+
+    def test_checkpoints_reopen_after_close(self, tmp_path: Path) -> None:
+        """Test a closed agent keeps checkpointing when it is used again."""
+        agent = SocialMediaVideoAgent({"checkpoint_path": str(tmp_path / "runs.db")})
+        agent._checkpoint_step("run-1", "concept", {"Idea": "i"})
+        agent.close()
+
+        agent._checkpoint_step("run-1", "veo3_prompt", "prompt")
+        assert agent._load_checkpoint("run-1")["steps"] == {"concept": {"Idea": "i"}, "veo3_prompt": "prompt"}
+        agent.close()
+
+    @patch('agents.social_media_video_agent.time.sleep')
+    @patch('agents.social_media_video_agent.requests.get')
+    @patch('agents.social_media_video_agent.requests.post')
+    def test_generate_video_with_veo3_resumes_pending_render(self, mock_post: Mock, mock_get: Mock, mock_sleep: Mock) -> None:
+        """Test a checkpointed render request is polled instead of resubmitted."""
+        mock_post_response = Mock()
+        mock_post_response.json.return_value = {"request_id": "req-1"}
+        mock_post.return_value = mock_post_response
+
+        pending = Mock()
+        pending.json.return_value = {"status": "IN_PROGRESS"}
+        done = Mock()
+        done.json.return_value = {"status": "completed", "video": {"url": "https://example.com/video.mp4"}}
+        mock_get.side_effect = [pending, done]
+
+        agent = SocialMediaVideoAgent({"checkpoint_path": ":memory:", "video_wait_time": 0})
+        assert agent.generate_video_with_veo3("prompt", run_id="run-1") is None
+        assert agent.generate_video_with_veo3("prompt", run_id="run-1") == "https://example.com/video.mp4"
+
+        assert mock_post.call_count == 1
+        assert mock_get.call_args.args[0].endswith("/requests/req-1")
+
     def test_create_social_media_config(self) -> None:
         """Test configuration creation function."""
         config = create_social_media_config()
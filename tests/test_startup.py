@@ -0,0 +1,92 @@
+"""Import-time budget tests for short-lived CLI invocations."""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Target for everything main.py imports on the search path, excluding the
+# interpreter's own startup (site, encodings, ...)
+SEARCH_IMPORT_BUDGET_MS = 50.0
+
+HEAVY_MODULES = [
+    "requests",
+    "urllib3",
+    "asyncio",
+    "aiohttp",
+    "multiprocessing",
+    "numpy",
+]
+
+
+def top_level_imports(args: List[str]) -> Dict[str, int]:
+    """Run Python with ``-X importtime`` and return top-level cumulative times (us)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not name.startswith("  "):  # nested imports are indented
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded_modules(code: str) -> List[str]:
+    """Return ``sys.modules`` after running ``code`` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys; print('\\n'.join(sys.modules))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return proc.stdout.split()
+
+
+class TestStartup:
+    """Test cases for lazy imports on the CLI search path."""
+
+    def test_search_path_skips_heavy_dependencies(self) -> None:
+        """Test importing the package and SearchAgent loads no HTTP or asyncio stack."""
+        modules = loaded_modules("import agents, agents.registry, agents.search_agent")
+        for heavy in HEAVY_MODULES:
+            assert heavy not in modules, f"{heavy} imported on the search path"
+        assert "agents.api_agent" not in modules
+
+    def test_package_attributes_still_resolve(self) -> None:
+        """Test lazily exported classes resolve on first access."""
+        import agents
+        from agents.api_agent import APIAgent
+
+        assert agents.APIAgent is APIAgent
+        assert "SearchAgent" in dir(agents)
+
+    def test_main_search_import_budget(self) -> None:
+        """Test ``main.py --agent search`` spends under the budget importing modules."""
+        # Measure imports, not byte-compilation, even where bytecode writing is off
+        subprocess.run(
+            [sys.executable, "-m", "compileall", "-q", "agents", "main.py"],
+            cwd=ROOT,
+            check=True,
+        )
+        baseline = set(top_level_imports(["-c", "pass"]))
+        samples = []
+        for _ in range(3):
+            times = top_level_imports(
+                ["main.py", "--agent", "search", "--query", "agents"]
+            )
+            samples.append(
+                sum(us for name, us in times.items() if name not in baseline) / 1000
+            )
+        assert min(samples) < SEARCH_IMPORT_BUDGET_MS, (
+            f"imports took {min(samples):.1f} ms"
+        )
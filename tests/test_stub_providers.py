@@ -0,0 +1,105 @@
+"""Tests for the local OpenAI/fal/Blotato stub server."""
+
+import time
+from typing import Any, Dict, Iterator
+
+import pytest
+import requests
+
+from agents.social_media_video_agent import SocialMediaVideoAgent
+from agents.stub_providers import StubProviderServer
+
+PLATFORMS = ["instagram", "tiktok"]
+
+
+def video_agent(stub: StubProviderServer, **config: Any) -> SocialMediaVideoAgent:
+    """Create a video agent whose providers are the stub."""
+    return SocialMediaVideoAgent(
+        {
+            **stub.agent_config(),
+            "social_accounts": {f"{p}_id": p for p in PLATFORMS},
+            "video_wait_time": 0,
+            **config,
+        }
+    )
+
+
+@pytest.fixture
+def stub() -> Iterator[StubProviderServer]:
+    """Run a zero-latency stub with 50 ms renders."""
+    with StubProviderServer({"fal": {"render_seconds": 0.05}}, seed=1) as server:
+        yield server
+
+
+class TestStubProviders:
+    """Test cases for StubProviderServer."""
+
+    def test_pipeline_against_stub_with_webhooks(
+        self, stub: StubProviderServer
+    ) -> None:
+        """Test a full run completes through the stub, render finished by webhook."""
+        agent = video_agent(stub, use_webhooks=True, video_wait_time=5)
+        result = agent.run(topic="robots", platforms=PLATFORMS)
+        agent.close()
+
+        assert result["success"] is True
+        assert result["steps"]["concept"]["Idea"] == "Robot chef flips pancakes mid-air"
+        assert result["steps"]["video_url"].startswith(f"{stub.base_url}/media/req-")
+        stats: Dict[str, Dict[str, int]] = requests.get(
+            f"{stub.base_url}/stub/stats"
+        ).json()
+        assert stats["POST /v1/chat/completions"] == {"200": 2}
+        assert stats["POST /v2/posts"] == {"201": 2}
+        assert (
+            "GET /fal-ai/veo3/requests/{request_id}" not in stats
+        )  # no polling needed
+
+    def test_render_status_follows_render_duration(
+        self, stub: StubProviderServer
+    ) -> None:
+        """Test the fal status endpoint reports progress until the render is done."""
+        request_id = requests.post(
+            f"{stub.base_url}/fal-ai/veo3", json={"prompt": "x"}
+        ).json()["request_id"]
+        status_url = f"{stub.base_url}/fal-ai/veo3/requests/{request_id}"
+        assert requests.get(status_url).json()["status"] == "IN_PROGRESS"
+        time.sleep(0.06)
+        done = requests.get(status_url).json()
+        assert done["status"] == "completed" and done["video"]["url"].endswith(
+            f"{request_id}.mp4"
+        )
+        assert (
+            requests.get(f"{stub.base_url}/fal-ai/veo3/requests/missing").status_code
+            == 404
+        )
+
+    def test_failures_and_rate_limits(self) -> None:
+        """Test configured 500s and 429s reach the agent's error handling."""
+        config = {
+            "openai": {"rate_limit_rate": 1.0, "retry_after": 0},
+            "blotato": {"failure_rate": 1.0},
+        }
+        with StubProviderServer(config, seed=1) as stub:
+            agent = video_agent(stub, max_retries=1)
+            posted = agent.post_to_social_platform(
+                "instagram", "https://x/video.mp4", "caption"
+            )
+            result = agent.run(topic="robots", platforms=PLATFORMS)
+            stats = requests.get(f"{stub.base_url}/stub/stats").json()
+
+        assert posted["success"] is False and "500" in posted["error"]
+        assert "rate limit hit" in result["error"]
+        assert stats["POST /v1/chat/completions"] == {"429": 2}
+
+    def test_latency_and_max_rps(self) -> None:
+        """Test fixed latency delays responses and max_rps answers 429 beyond it."""
+        with StubProviderServer({"blotato": {"latency": 0.05, "max_rps": 2}}) as stub:
+            url = f"{stub.base_url}/v2/media"
+            t0 = time.perf_counter()
+            statuses = [
+                requests.post(url, data={"url": "x"}).status_code for _ in range(3)
+            ]
+            elapsed = time.perf_counter() - t0
+
+        assert elapsed >= 0.15
+        assert statuses == [200, 200, 429]
@@ -0,0 +1,244 @@
+"""Tests for tracing spans, context propagation and exporters."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+from unittest.mock import Mock, patch
+
+import pytest
+import responses
+
+from agents import tracing
+from agents.api_agent import APIAgent
+from agents.base_agent import BaseAgent
+from agents.orchestrator import Orchestrator
+from agents.search_agent import SearchAgent
+from agents.social_media_video_agent import SocialMediaVideoAgent
+
+
+class StepAgent(BaseAgent):
+    """Agent with two named steps, optionally failing."""
+
+    def run(self, fail: bool = False) -> Dict[str, Any]:
+        with self.step("first"):
+            pass
+        with self.step("second"):
+            if fail:
+                raise RuntimeError("boom")
+        return {"result": threading.get_ident()}
+
+
+@pytest.fixture
+def exporter() -> Iterator[tracing.InMemoryExporter]:
+    """Enable tracing into memory for one test."""
+    memory = tracing.InMemoryExporter()
+    tracing.configure([memory])
+    yield memory
+    tracing.configure([])
+
+
+def finished(exporter: tracing.InMemoryExporter) -> Dict[str, tracing.Span]:
+    """Flush and index exported spans by name."""
+    tracing.TRACER.flush()
+    return {span.name: span for span in exporter.spans}
+
+
+class TestSpans:
+    """Test cases for run and step spans."""
+
+    def test_run_is_root_with_step_children(
+        self, exporter: tracing.InMemoryExporter
+    ) -> None:
+        """Test run() opens a root span and steps open children."""
+        StepAgent().run()
+        spans = finished(exporter)
+
+        root = spans["StepAgent.run"]
+        assert root.parent_id is None
+        assert spans["first"].parent_id == root.span_id
+        assert spans["second"].trace_id == root.trace_id
+        assert (
+            root.start_ns
+            <= spans["first"].start_ns
+            <= spans["second"].end_ns
+            <= root.end_ns
+        )
+
+    def test_errors_mark_spans(self, exporter: tracing.InMemoryExporter) -> None:
+        """Test exceptions and success=False results set ERROR status."""
+        with pytest.raises(RuntimeError):
+            StepAgent().run(fail=True)
+        APIAgent({"max_retries": 0}).run(endpoint="http://127.0.0.1:9/unreachable")
+        spans = finished(exporter)
+
+        assert spans["second"].status == "ERROR"
+        assert spans["StepAgent.run"].error == "RuntimeError: boom"
+        assert spans["APIAgent.run"].status == "ERROR"
+
+    def test_disabled_records_nothing(self) -> None:
+        """Test no spans are produced without exporters."""
+        assert tracing.TRACER.enabled is False
+        with tracing.start_span("noop") as span:
+            assert span is None
+        assert StepAgent({"instrumentation": False}).run()["result"]
+
+
+class TestPropagation:
+    """Test context propagation across threads and asyncio tasks."""
+
+    @pytest.mark.asyncio
+    async def test_arun_and_tasks_inherit_parent(
+        self, exporter: tracing.InMemoryExporter
+    ) -> None:
+        """Test arun() on worker threads and gathered tasks stay in the caller's trace."""
+        with tracing.start_span("request") as parent:
+            results = await asyncio.gather(StepAgent().arun(), StepAgent().arun())
+        tracing.TRACER.flush()
+
+        assert results[0]["result"] != threading.get_ident()
+        runs = [s for s in exporter.spans if s.name == "StepAgent.run"]
+        assert len(runs) == 2
+        assert all(s.parent_id == parent.span_id for s in runs)
+        assert runs[0].span_id != runs[1].span_id
+
+    def test_orchestrator_nodes_are_children(
+        self, exporter: tracing.InMemoryExporter
+    ) -> None:
+        """Test orchestrator node spans nest under one graph span."""
+        orch = Orchestrator()
+        orch.add("a", SearchAgent(), kwargs={"query": "agents"})
+        orch.add("b", StepAgent(), depends_on=["a"])
+        orch.run()
+        spans = finished(exporter)
+
+        graph = spans["Orchestrator.run"]
+        assert spans["node a"].parent_id == graph.span_id
+        assert spans["SearchAgent.run"].parent_id == spans["node a"].span_id
+        assert spans["StepAgent.run"].parent_id == spans["node b"].span_id
+
+    def test_traceparent_round_trip(self, exporter: tracing.InMemoryExporter) -> None:
+        """Test inject/extract carry trace and span ids."""
+        with tracing.start_span("client") as span:
+            headers = tracing.inject({})
+        remote = tracing.extract(headers)
+        assert remote is not None
+        assert (remote.trace_id, remote.span_id) == (span.trace_id, span.span_id)
+        assert tracing.extract({"traceparent": "garbage"}) is None
+
+
+class TestHTTPSpans:
+    """Test spans around outbound HTTP calls."""
+
+    @responses.activate
+    def test_api_agent_http_span(self, exporter: tracing.InMemoryExporter) -> None:
+        """Test APIAgent records http attributes and sends traceparent."""
+        responses.add(
+            responses.GET, "https://api.example.com/posts/1", json={}, status=200
+        )
+        APIAgent({"base_url": "https://api.example.com"}).run(endpoint="/posts/1")
+        spans = finished(exporter)
+
+        http = spans["http_get"]
+        assert http.attributes["http.status_code"] == 200
+        assert http.attributes["http.url"] == "https://api.example.com/posts/1"
+        sent = responses.calls[0].request.headers["traceparent"]
+        assert sent == f"00-{http.trace_id}-{http.span_id}-01"
+
+    def test_video_agent_http_and_stage_spans(
+        self, exporter: tracing.InMemoryExporter
+    ) -> None:
+        """Test the video agent's provider calls are spans under their stage."""
+        agent = SocialMediaVideoAgent({"openai_api_key": "k"})
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            "choices": [
+                {
+                    "message": {
+                        "content": json.dumps(
+                            {"Idea": "x", "Caption": "y", "Environment": "z"}
+                        )
+                    }
+                }
+            ]
+        }
+        with patch(
+            "agents.social_media_video_agent.requests.post", return_value=response
+        ) as post:
+            state = agent.new_run_state("cats", [])
+            agent.run_stage("concept", state)
+        spans = finished(exporter)
+
+        http = spans["http_openai"]
+        assert http.parent_id == spans["concept"].span_id
+        assert http.attributes["http.method"] == "POST"
+        assert (
+            post.call_args.kwargs["headers"]["traceparent"].split("-")[2]
+            == http.span_id
+        )
+
+
+class TestExporters:
+    """Test the JSON file and OTLP exporters and offline analysis."""
+
+    def test_json_file_and_analysis(
+        self, tmp_path: Path, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test spans written to a file yield summaries and the critical path."""
+        path = tmp_path / "trace.jsonl"
+        tracing.configure([tracing.JSONFileExporter(str(path))])
+        try:
+            StepAgent().run()
+        finally:
+            tracing.configure([])
+
+        spans = tracing.load_spans(str(path))
+        root = next(s for s in spans if s["parent_id"] is None)
+        names = [s["name"] for s in tracing.critical_path(spans, root["trace_id"])]
+        assert names == ["StepAgent.run", "second"]
+        assert tracing.summarize(spans)["first"]["count"] == 1
+
+        assert tracing.main([str(path)]) == 0
+        assert "Critical path of StepAgent.run" in capsys.readouterr().out
+
+    def test_otlp_http_exporter(self) -> None:
+        """Test spans are posted as OTLP/JSON to a collector endpoint."""
+        received: List[Dict[str, Any]] = []
+
+        class Collector(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                received.append(
+                    json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                )
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Collector)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/traces"
+        tracing.configure(
+            [tracing.OTLPHTTPExporter(endpoint)], service_name="test-service"
+        )
+        try:
+            with pytest.raises(RuntimeError):
+                StepAgent().run(fail=True)
+            tracing.TRACER.flush()
+        finally:
+            tracing.configure([])
+            server.shutdown()
+
+        resource = received[0]["resourceSpans"][0]
+        assert (
+            resource["resource"]["attributes"][0]["value"]["stringValue"]
+            == "test-service"
+        )
+        spans = {s["name"]: s for s in resource["scopeSpans"][0]["spans"]}
+        assert spans["StepAgent.run"]["status"]["code"] == 2
+        assert spans["first"]["parentSpanId"] == spans["StepAgent.run"]["spanId"]
+        assert len(spans["StepAgent.run"]["traceId"]) == 32
@@ -0,0 +1,75 @@
+"""Tests for UploadCache."""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from agents.social_media_video_agent import SocialMediaVideoAgent
+from agents.upload_cache import UploadCache
+
+
+class TestUploadCache:
+    """Test cases for UploadCache."""
+
+    def test_put_and_get(self) -> None:
+        """Test a stored upload is returned for the same source."""
+        cache = UploadCache()
+        cache.put("https://example.com/video.mp4", "https://blotato.com/a.mp4")
+
+        assert cache.get("https://example.com/video.mp4") == "https://blotato.com/a.mp4"
+        assert cache.get("https://example.com/other.mp4") is None
+
+    def test_entries_expire(self) -> None:
+        """Test entries older than the TTL are ignored."""
+        cache = UploadCache(ttl=10)
+        with patch("agents.upload_cache.time.time", return_value=1000.0):
+            cache.put("https://example.com/video.mp4", "https://blotato.com/a.mp4")
+        with patch("agents.upload_cache.time.time", return_value=1011.0):
+            assert cache.get("https://example.com/video.mp4") is None
+
+    def test_local_files_keyed_by_content(self, tmp_path: Path) -> None:
+        """Test local files with identical bytes share one cache entry."""
+        first = tmp_path / "a.mp4"
+        second = tmp_path / "b.mp4"
+        first.write_bytes(b"same bytes")
+        second.write_bytes(b"same bytes")
+
+        assert UploadCache.key_for(str(first)) == UploadCache.key_for(str(second))
+        assert UploadCache.key_for(str(first)).startswith("sha256:")
+
+    def test_persists_to_disk(self, tmp_path: Path) -> None:
+        """Test entries survive reopening and invalidation is persisted."""
+        path = str(tmp_path / "uploads.json")
+        UploadCache(path).put(
+            "https://example.com/video.mp4", "https://blotato.com/a.mp4"
+        )
+
+        reopened = UploadCache(path)
+        assert (
+            reopened.get("https://example.com/video.mp4") == "https://blotato.com/a.mp4"
+        )
+
+        reopened.invalidate("https://example.com/video.mp4")
+        assert UploadCache(path).get("https://example.com/video.mp4") is None
+        assert [p.name for p in tmp_path.iterdir()] == ["uploads.json"]
+
+    def test_corrupt_file_is_ignored(self, tmp_path: Path) -> None:
+        """Test an unreadable cache file starts an empty cache."""
+        path = tmp_path / "uploads.json"
+        path.write_text("not json")
+        assert len(UploadCache(str(path))) == 0
+
+    @patch("agents.social_media_video_agent.requests.post")
+    def test_agent_skips_duplicate_uploads(self, mock_post: Mock) -> None:
+        """Test SocialMediaVideoAgent uploads each source only once."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "url": "https://blotato.com/uploaded-video.mp4"
+        }
+        mock_post.return_value = mock_response
+
+        agent = SocialMediaVideoAgent({"blotato_api_key": "test-key"})
+        first = agent.upload_video_to_blotato("https://example.com/video.mp4")
+        second = agent.upload_video_to_blotato("https://example.com/video.mp4")
+
+        assert first == second == "https://blotato.com/uploaded-video.mp4"
+        assert mock_post.call_count == 1
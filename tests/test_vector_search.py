@@ -0,0 +1,157 @@
+"""Tests for dense and hybrid retrieval."""
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents import vector_search  # noqa: E402
+from agents.search_agent import SearchAgent  # noqa: E402
+from agents.vector_search import (  # noqa: E402
+    DenseIndex,
+    DenseRetriever,
+    HashingEmbedder,
+    load_embedder,
+)
+
+CORPUS = [
+    "vector index for semantic search",
+    "video rendering pipeline",
+    "agent orchestration patterns",
+    "indexing vectors with numpy",
+    "cooking pasta at home",
+]
+
+
+class WordCountEmbedder:
+    """Tiny custom embedder: one column per known word."""
+
+    name = "word-count"
+    VOCAB = ["vector", "video", "agent", "pasta"]
+
+    def __init__(self) -> None:
+        self.dim = len(self.VOCAB)
+
+    def embed(self, texts):  # type: ignore[no-untyped-def]
+        rows = [[float(word in text.lower()) for word in self.VOCAB] for text in texts]
+        return vector_search.normalize(np.asarray(rows, dtype=np.float32))
+
+
+class TestVectorSearch:
+    """Test cases for the vector index and embedders."""
+
+    def test_hashing_embedder_rows_are_unit_and_stable(self) -> None:
+        """Test embeddings are normalised float32 rows, identical across instances."""
+        vectors = HashingEmbedder(64).embed(["vector search", ""])
+        assert vectors.shape == (2, 64) and vectors.dtype == np.float32
+        assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+        assert not vectors[1].any()
+        assert np.array_equal(vectors, HashingEmbedder(64).embed(["vector search", ""]))
+
+    def test_index_matches_brute_force_across_blocks(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test blocked top-k equals a full sort of the scores."""
+        monkeypatch.setattr(vector_search, "BLOCK_ROWS", 7)
+        rng = np.random.default_rng(0)
+        index = DenseIndex(
+            vector_search.normalize(rng.standard_normal((50, 16)).astype(np.float32))
+        )
+        queries = rng.standard_normal((3, 16)).astype(np.float32)
+
+        scores, ids = index.search(queries, 5)
+
+        expected = np.argsort(-(queries @ index.vectors.T), axis=1)[:, :5]
+        assert np.array_equal(ids, expected)
+        assert np.all(np.diff(scores, axis=1) <= 0)
+
+    def test_cache_is_memory_mapped_and_rebuilt_on_change(self, tmp_path: Path) -> None:
+        """Test the cached matrix is reused for the same corpus and rebuilt for another."""
+        cache = str(tmp_path / "vectors.npy")
+        first = DenseRetriever(CORPUS, {"cache_path": cache})
+        second = DenseRetriever(CORPUS, {"cache_path": cache})
+        assert isinstance(second.index.vectors, np.memmap)
+        assert np.array_equal(first.index.vectors, second.index.vectors)
+
+        changed = DenseRetriever(CORPUS[:3], {"cache_path": cache})
+        assert len(changed.index) == 3
+        # Rebuilt into a new file: open maps keep the old matrix, nothing is left behind
+        assert np.array_equal(first.index.vectors, second.index.vectors)
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "vectors.npy",
+            "vectors.npy.json",
+        ]
+        assert len(DenseRetriever(CORPUS[:3], {"cache_path": cache}).index) == 3
+
+    def test_load_embedder_specs(self) -> None:
+        """Test embedders from names, dicts, import paths and objects."""
+        assert load_embedder(None, dim=32).dim == 32
+        assert load_embedder({"type": "hashing", "dim": 16, "ngram": 0}).ngram == 0
+        custom = WordCountEmbedder()
+        assert load_embedder(custom) is custom
+        assert isinstance(
+            load_embedder(f"{__name__}:WordCountEmbedder"), WordCountEmbedder
+        )
+        with pytest.raises(ValueError):
+            load_embedder("no_colon_here")
+        with pytest.raises(TypeError):
+            load_embedder(42)
+
+
+class TestSearchAgentDense:
+    """Test cases for SearchAgent's dense and hybrid modes."""
+
+    def test_dense_ranks_related_documents_first(self) -> None:
+        """Test word-form overlap ranks both vector documents above the rest."""
+        agent = SearchAgent(
+            {"corpus": CORPUS, "retrieval": {"mode": "dense", "top_k": 2}}
+        )
+        result = agent.run(query="vectors index")
+
+        assert set(result["results"]) == {CORPUS[0], CORPUS[3]}
+        assert result["result_count"] == 2
+        assert result["scores"] == sorted(result["scores"], reverse=True)
+
+    def test_hybrid_boosts_exact_keyword_matches(self) -> None:
+        """Test the keyword score lifts documents containing the query words."""
+        agent = SearchAgent(
+            {"corpus": CORPUS, "retrieval": {"mode": "hybrid", "keyword_weight": 0.9}}
+        )
+        assert agent.run(query="numpy")["results"][0] == CORPUS[3]
+        assert agent.run(query="")["results"] == []
+
+    def test_run_many_and_stream_agree_with_run(self) -> None:
+        """Test the batched and streaming paths return the same ranking."""
+        agent = SearchAgent(
+            {
+                "corpus": CORPUS,
+                "retrieval": {"mode": "dense", "embedder": WordCountEmbedder()},
+            }
+        )
+        queries = ["video", "pasta agent"]
+
+        batched = agent.run_many(queries)
+        assert batched == [agent.run(query=q) for q in queries]
+        assert batched[0]["results"] == [CORPUS[1]]
+
+        events = list(agent.run_stream("video"))
+        assert events[0]["index"] == 1 and events[0]["score"] == pytest.approx(1.0)
+        assert events[-1]["result"]["result_count"] == 1
+
+    def test_retriever_dropped_on_pickle_and_close(self) -> None:
+        """Test the index is rebuilt lazily after pickling or close()."""
+        agent = SearchAgent({"corpus": CORPUS, "retrieval": {"mode": "dense"}})
+        agent.warmup()
+        assert agent._retriever is not None
+        clone = pickle.loads(pickle.dumps(agent))
+        assert clone._retriever is None
+        assert clone.run(query="video")["results"][0] == CORPUS[1]
+        agent.close()
+        assert agent._retriever is None
+
+    def test_invalid_mode_rejected(self) -> None:
+        """Test an unknown retrieval mode fails at construction."""
+        with pytest.raises(ValueError, match="retrieval.mode"):
+            SearchAgent({"retrieval": {"mode": "fuzzy"}})
@@ -0,0 +1,137 @@
+"""Tests for RenderCallbackServer."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents.social_media_video_agent import SocialMediaVideoAgent
+from agents.webhook import RenderCallbackServer, render_video_url
+
+
+def deliver(url: str, body: Dict[str, Any]) -> int:
+    """POST a webhook body to the listener like the provider would."""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return int(response.status)
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+@pytest.fixture
+def server() -> Iterator[RenderCallbackServer]:
+    """Run a callback listener on an ephemeral localhost port."""
+    srv = RenderCallbackServer().start()
+    yield srv
+    srv.close()
+
+
+class TestRenderCallbackServer:
+    """Test cases for RenderCallbackServer."""
+
+    def test_callback_url(self, server: RenderCallbackServer) -> None:
+        """Test the callback URL points at the bound listener."""
+        assert server.callback_url.startswith("http://127.0.0.1:")
+        assert server.callback_url.endswith("/callbacks/veo3")
+
+        public = RenderCallbackServer(public_url="https://hooks.example.com/")
+        assert public.callback_url == "https://hooks.example.com/callbacks/veo3"
+        public.close()
+
+    def test_waiter_resolved_by_webhook(self, server: RenderCallbackServer) -> None:
+        """Test a waiting future is resolved when the webhook arrives."""
+        future = server.expect("req-1")
+        assert server.pending() == 1
+
+        body = {
+            "request_id": "req-1",
+            "status": "OK",
+            "payload": {"video": {"url": "https://v/1.mp4"}},
+        }
+        threading.Thread(target=deliver, args=(server.callback_url, body)).start()
+
+        assert future.result(timeout=5) == body
+        assert server.pending() == 0
+
+    def test_early_webhook_is_buffered(self, server: RenderCallbackServer) -> None:
+        """Test a completion arriving before anyone waits is not lost."""
+        assert (
+            deliver(server.callback_url, {"request_id": "req-2", "status": "OK"}) == 200
+        )
+        assert server.wait_for("req-2", timeout=1) == {
+            "request_id": "req-2",
+            "status": "OK",
+        }
+
+    def test_wait_for_times_out(self, server: RenderCallbackServer) -> None:
+        """Test waiting returns None when no completion arrives."""
+        assert server.wait_for("never", timeout=0.01) is None
+        assert server._futures == {}
+
+    def test_unclaimed_webhooks_are_bounded(self) -> None:
+        """Test unknown or late completions expire and are capped."""
+        srv = RenderCallbackServer(buffer_ttl=0.0, max_buffered=2).start()
+        try:
+            for i in range(5):
+                assert deliver(srv.callback_url, {"request_id": f"late-{i}"}) == 200
+            assert srv.buffered() <= 2
+            assert srv.pending() == 0 and srv._futures == {}
+        finally:
+            srv.close()
+
+    def test_rejects_bad_requests(self, server: RenderCallbackServer) -> None:
+        """Test malformed webhooks and unknown paths are rejected."""
+        assert deliver(server.callback_url, {"status": "OK"}) == 400
+        assert deliver(server.address + "/elsewhere", {"request_id": "x"}) == 404
+
+    def test_render_video_url(self) -> None:
+        """Test extracting the video URL from webhook bodies."""
+        ok = {"status": "OK", "payload": {"video": {"url": "https://v/1.mp4"}}}
+        assert render_video_url(ok) == "https://v/1.mp4"
+        assert render_video_url({"status": "ERROR", "error": "failed"}) is None
+
+
+class TestSocialMediaVideoAgentWebhooks:
+    """Test webhook-driven render completion in SocialMediaVideoAgent."""
+
+    @patch("agents.social_media_video_agent.time.sleep")
+    @patch("agents.social_media_video_agent.requests.get")
+    @patch("agents.social_media_video_agent.requests.post")
+    def test_generate_video_waits_on_webhook(
+        self, mock_post: Mock, mock_get: Mock, mock_sleep: Mock
+    ) -> None:
+        """Test renders are submitted with a webhook and resolved without polling."""
+        agent = SocialMediaVideoAgent(
+            {"veo3_api_key": "test-key", "use_webhooks": True, "video_wait_time": 5}
+        )
+
+        def submit(url: str, **kwargs: Any) -> Mock:
+            callback_url = kwargs["params"]["fal_webhook"]
+            body = {
+                "request_id": "req-9",
+                "status": "OK",
+                "payload": {"video": {"url": "https://v/9.mp4"}},
+            }
+            threading.Thread(target=deliver, args=(callback_url, body)).start()
+            response = Mock()
+            response.json.return_value = {"request_id": "req-9"}
+            return response
+
+        mock_post.side_effect = submit
+        try:
+            assert agent.generate_video_with_veo3("prompt") == "https://v/9.mp4"
+        finally:
+            agent.close()
+
+        mock_get.assert_not_called()
+        mock_sleep.assert_not_called()